@@ -1,52 +1,192 @@
-import random
 import re
-from typing import List, Optional, Union
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from solc_ast_parser.ids import id_allocator, new_id
 from solc_ast_parser.models import ast_models
 from solc_ast_parser.models.ast_models import SourceUnit
-from solc_ast_parser.models.base_ast_models import Comment, MultilineComment, NodeType, YulNodeType
-from solc_ast_parser.utils import replace_node, traverse_ast
+from solc_ast_parser.models.base_ast_models import (
+    Comment,
+    IdAllocator,
+    MultilineComment,
+    NodeType,
+    YulBase,
+)
+from solc_ast_parser.spans import SourceIndex, parse_src
+from solc_ast_parser.utils import invalidate_node_cache
 
 
-def find_comments(source: str) -> List[Union[Comment, MultilineComment]]:
-    comments = []
+# What ends the current run of text in each scanner state.
+_CODE_STOP = re.compile(r"[\"'\n]|//|/\*")
+_STRING_STOP = {'"': re.compile(r'["\\\n]'), "'": re.compile(r"['\\\n]")}
 
-    for match in re.finditer(r"(.*)(\/\/.*?(?=\n|$))", source):
-        comments.append(
-            create_comment_node(
-                match.start() + len(match.group(1)) - 2,
-                match.group(2).strip("/ "),
-                False,
-                match.group(1).strip() == "",
-            )
+_CODE, _STRING, _LINE_COMMENT, _BLOCK_COMMENT = range(4)
+
+
+class CommentScanner:
+    # Splits Solidity source into code, string literals and comments in one
+    # pass. Text can be fed in chunks, comments are returned once complete.
+    def __init__(self, ids: Optional[IdAllocator] = None):
+        self.ids = ids
+        self._buffer = ""
+        self._offset = 0  # offset of the buffer start in the whole source
+        self._state = _CODE
+        self._quote = ""
+        self._line_blank = True  # only whitespace so far on the current line
+        self._comment_start = 0
+        self._comment_pure = False
+        self._comment_parts: List[str] = []
+
+    def feed(self, text: str) -> List[Union[Comment, MultilineComment]]:
+        self._buffer += text
+        return self._scan(final=False)
+
+    def close(self) -> List[Union[Comment, MultilineComment]]:
+        comments = self._scan(final=True)
+        if self._state == _LINE_COMMENT:
+            comments.append(self._line_comment())
+        # An unterminated block comment is not a comment.
+        self._state = _CODE
+        self._comment_parts = []
+        return comments
+
+    def _skip_code(self, text: str) -> None:
+        newline = text.rfind("\n")
+        if newline >= 0:
+            self._line_blank = not text[newline + 1 :].strip()
+        elif self._line_blank and text.strip():
+            self._line_blank = False
+
+    def _line_comment(self) -> Comment:
+        # Offsets are counted from the last "//" of the leading slashes, two
+        # characters early, as placement in insert_nodes_into_ast expects.
+        text = "".join(self._comment_parts)
+        slashes = len(text) - len(text.lstrip("/"))
+        return create_comment_node(
+            self._comment_start + slashes - 4,
+            text.strip("/ "),
+            False,
+            self._comment_pure,
+            ids=self.ids,
         )
 
-    for match in re.finditer(r"/\*.*?\*/", source, re.DOTALL):
-        comments.append(create_comment_node(match.start(), match.group(), True))
+    def _scan(self, final: bool) -> List[Union[Comment, MultilineComment]]:
+        comments = []
+        buffer = self._buffer
+        i = 0
+        size = len(buffer)
+        while i < size:
+            if self._state == _CODE:
+                match = _CODE_STOP.search(buffer, i)
+                if match is None:
+                    # A trailing "/" may start a comment in the next chunk.
+                    end = size if final or buffer[-1] != "/" else size - 1
+                    self._skip_code(buffer[i:end])
+                    i = end
+                    break
+                self._skip_code(buffer[i : match.start()])
+                token = match.group()
+                i = match.end()
+                if token == "\n":
+                    self._line_blank = True
+                elif token in ("//", "/*"):
+                    self._state = _LINE_COMMENT if token == "//" else _BLOCK_COMMENT
+                    self._comment_start = self._offset + match.start()
+                    self._comment_pure = self._line_blank
+                    self._comment_parts = [token]
+                    self._line_blank = False
+                else:
+                    self._state = _STRING
+                    self._quote = token
+                    self._line_blank = False
+            elif self._state == _STRING:
+                match = _STRING_STOP[self._quote].search(buffer, i)
+                if match is None:
+                    i = size
+                    break
+                token = match.group()
+                if token == "\\":
+                    if match.end() == size and not final:
+                        i = match.start()
+                        break
+                    i = match.end() + 1
+                else:
+                    # Strings end at their quote, or at a newline if unterminated.
+                    self._state = _CODE
+                    i = match.end() if token != "\n" else match.start()
+            elif self._state == _LINE_COMMENT:
+                end = buffer.find("\n", i)
+                if end < 0:
+                    self._comment_parts.append(buffer[i:])
+                    i = size
+                    break
+                self._comment_parts.append(buffer[i:end])
+                comments.append(self._line_comment())
+                self._state = _CODE
+                i = end
+            else:
+                end = buffer.find("*/", i)
+                if end < 0:
+                    # A trailing "*" may close the comment in the next chunk.
+                    stop = size if final or buffer[-1] != "*" else size - 1
+                    self._comment_parts.append(buffer[i:stop])
+                    i = stop
+                    break
+                self._comment_parts.append(buffer[i : end + 2])
+                comments.append(
+                    create_comment_node(
+                        self._comment_start,
+                        "".join(self._comment_parts),
+                        True,
+                        ids=self.ids,
+                    )
+                )
+                self._state = _CODE
+                i = end + 2
+
+        self._buffer = buffer[i:]
+        self._offset += i
+        return comments
+
 
-    return sorted(comments, key=lambda x: x.src.split(":")[0])
+def scan_comments(
+    chunks: Iterable[str], ids: Optional[IdAllocator] = None
+) -> Iterator[Union[Comment, MultilineComment]]:
+    scanner = CommentScanner(ids)
+    for chunk in chunks:
+        yield from scanner.feed(chunk)
+    yield from scanner.close()
+
+
+def find_comments(
+    source: str, ids: Optional[IdAllocator] = None
+) -> List[Union[Comment, MultilineComment]]:
+    return sorted(scan_comments([source], ids), key=lambda x: parse_src(x.src)[0])
 
 
 def create_comment_node(
-    start: int, text: str, is_multiline: bool = False, is_pure: bool = True
+    start: int,
+    text: str,
+    is_multiline: bool = False,
+    is_pure: bool = True,
+    ids: Optional[IdAllocator] = None,
 ) -> Comment:
     if is_multiline:
         return MultilineComment(
             src=f"{start}:{len(text)}:0",
             text=text,
-            id=random.randint(0, 1000000),
+            id=new_id(ids),
             nodeType=NodeType.MULTILINE_COMMENT,
         )
     return Comment(
         src=f"{start}:{len(text)}:0",
         text=text,
-        id=random.randint(0, 1000000),
+        id=new_id(ids),
         nodeType=NodeType.MULTILINE_COMMENT if is_multiline else NodeType.COMMENT,
         isPure=is_pure,
     )
 
 
 def insert_comments_into_ast(source_code: str, ast: SourceUnit) -> SourceUnit:
-    comments = find_comments(source_code)
+    comments = find_comments(source_code, id_allocator(ast))
     return insert_nodes_into_ast(ast, comments)
 
 
@@ -55,12 +195,13 @@ def insert_node_into_node(
     parent_node: ast_models.ASTNode,
     new_node: ast_models.ASTNode,
 ) -> ast_models.ASTNode:
-    if node == new_node:
+    if node is new_node:
         return parent_node
 
     if not parent_node:
         if node.node_type == NodeType.SOURCE_UNIT:
             node.nodes.insert(0, new_node)
+            invalidate_node_cache(node)
         return node
 
     if new_node.node_type == NodeType.COMMENT and not new_node.is_pure:
@@ -71,39 +212,101 @@ def insert_node_into_node(
         return node
 
     if parent_node.node_type in (NodeType.SOURCE_UNIT, NodeType.CONTRACT_DEFINITION):
-        parent_node.nodes.insert(parent_node.nodes.index(node), new_node)
+        parent_node.nodes.insert(_index_of(parent_node.nodes, node), new_node)
     elif parent_node.node_type in [NodeType.BLOCK, NodeType.UNCHECKED_BLOCK]:
-        parent_node.statements.insert(parent_node.statements.index(node), new_node)
+        parent_node.statements.insert(_index_of(parent_node.statements, node), new_node)
     else:
         parent_node.comment = new_node
 
     return parent_node
 
 
+def _index_of(items: List[ast_models.ASTNode], node: ast_models.ASTNode) -> int:
+    # Identity lookup, list.index() would deep-compare every sibling model.
+    for i, item in enumerate(items):
+        if item is node:
+            return i
+    raise ValueError("node is not in list")
+
+
 def insert_nodes_into_ast(ast: SourceUnit, nodes: List[Comment]) -> SourceUnit:
-    for node in nodes:
-        min_distance = float("inf")
-        closest_node = None
-        parent_node = None
-
-        def find_closest_node(
-            current_node: ast_models.ASTNode, parent: Optional[ast_models.ASTNode]
-        ) -> None:
-            nonlocal min_distance, closest_node, parent_node
-            start = int(current_node.src.split(":")[0])
-            if isinstance(node, Comment) and not node.is_pure:
-                start = int(current_node.src.split(":")[0]) + int(
-                    current_node.src.split(":")[1]
-                )
-            distance = start - int(node.src.split(":")[0])
-            if 0 <= distance < min_distance and current_node.node_type not in [item.value for item in YulNodeType]:
-                min_distance = distance
-                closest_node = current_node
-                parent_node = parent
+    index = SourceIndex(ast, node_filter=lambda n: not isinstance(n, YulBase))
+    placed = sorted(
+        ((parse_src(node.src)[0], node) for node in nodes), key=lambda item: item[0]
+    )
+
+    # Pure comments go before the first node starting after them, trailing
+    # ones attach to the first node ending after them. Comments don't overlap,
+    # so placing one never changes where a later one goes: both lookups are a
+    # single merge of the sorted comments with the sorted spans.
+    trailing = [isinstance(node, Comment) and not node.is_pure for _, node in placed]
+    closest = iter(
+        index.next_nodes(
+            start for (start, _), by_end in zip(placed, trailing) if not by_end
+        )
+    )
+    closest_by_end = iter(
+        index.next_nodes(
+            (start for (start, _), by_end in zip(placed, trailing) if by_end),
+            by_end=True,
+        )
+    )
+
+    # Insertions into member lists are collected per list and applied in one
+    # pass, keyed by the member they go before (None for the list start).
+    insertions: Dict[int, Tuple[list, Dict[Optional[int], list]]] = {}
+    holders: List[ast_models.ASTNode] = []
+
+    def insert(items: list, anchor: Optional[ast_models.ASTNode], node) -> None:
+        pending = insertions.setdefault(id(items), (items, {}))[1]
+        pending.setdefault(None if anchor is None else id(anchor), []).append(node)
+
+    for (_, node), by_end in zip(placed, trailing):
+        closest_node = next(closest_by_end if by_end else closest)
+        if closest_node is None:
+            continue
+        parent_node = index.parent(closest_node)
+
+        if parent_node is None:
+            if closest_node.node_type == NodeType.SOURCE_UNIT:
+                insert(closest_node.nodes, None, node)
+            holder = closest_node
+        elif by_end:
+            holder = (
+                parent_node
+                if parent_node.node_type == NodeType.VARIABLE_DECLARATION
+                else closest_node
+            )
+            holder.comment = node
+        elif parent_node.node_type in (
+            NodeType.SOURCE_UNIT,
+            NodeType.CONTRACT_DEFINITION,
+        ):
+            insert(parent_node.nodes, closest_node, node)
+            holder = parent_node
+        elif parent_node.node_type in (NodeType.BLOCK, NodeType.UNCHECKED_BLOCK):
+            insert(parent_node.statements, closest_node, node)
+            holder = parent_node
+        else:
+            parent_node.comment = node
+            holder = parent_node
+        holders.append(holder)
 
-        traverse_ast(ast, find_closest_node)
+    for items, pending in insertions.values():
+        # Comments at the list start were each inserted at index 0.
+        merged = list(reversed(pending.pop(None, [])))
+        for item in items:
+            merged.extend(pending.pop(id(item), ()))
+            merged.append(item)
+        if pending:
+            raise ValueError("node is not in list")
+        items[:] = merged
 
-        if closest_node is not None:
-            parent_node = insert_node_into_node(closest_node, parent_node, node)
-            replace_node(ast, parent_node.id, parent_node)
+    invalidated = set()
+    for holder in holders:
+        # Stops at the first ancestor already cleared with its own ancestors.
+        while holder is not None and id(holder) not in invalidated:
+            invalidated.add(id(holder))
+            invalidate_node_cache(holder)
+            holder = index.parent(holder)
     return ast
@@ -0,0 +1,208 @@
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from solc_ast_parser.models import ast_models
+from solc_ast_parser.utils import invalidate_node_cache, iter_child_nodes
+
+PathStep = Tuple[str, Optional[int]]
+
+
+class ParentMap:
+    def __init__(self, root: ast_models.ASTNode):
+        self.root = root
+        # id(node) -> (node, parent, field_name, list_index)
+        self._links: Dict[int, Tuple] = {}
+        self._by_id: Dict[int, ast_models.ASTNode] = {}
+        self._index(root, None, None, None)
+
+    def _index(
+        self,
+        node: ast_models.ASTNode,
+        parent: Optional[ast_models.ASTNode],
+        field_name: Optional[str],
+        list_index: Optional[int],
+    ) -> None:
+        stack = [(node, parent, field_name, list_index)]
+        while stack:
+            entry = stack.pop()
+            current = entry[0]
+            self._links[id(current)] = entry
+            node_id = getattr(current, "id", None)
+            if node_id is not None:
+                self._by_id.setdefault(node_id, current)
+            for child_field, child_index, child in iter_child_nodes(current):
+                stack.append((child, current, child_field, child_index))
+
+    def _unindex(self, node: ast_models.ASTNode) -> None:
+        # Drops a detached subtree, so none of its nodes resolve any more.
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            if self._link(current) is not None:
+                del self._links[id(current)]
+            node_id = getattr(current, "id", None)
+            if node_id is not None and self._by_id.get(node_id) is current:
+                del self._by_id[node_id]
+            stack.extend(child for _, _, child in iter_child_nodes(current))
+
+    def _link(self, node: ast_models.ASTNode) -> Optional[Tuple]:
+        link = self._links.get(id(node))
+        if link is None or link[0] is not node:
+            return None
+        return link
+
+    def __contains__(self, node: ast_models.ASTNode) -> bool:
+        return self._link(node) is not None
+
+    def __len__(self) -> int:
+        return len(self._links)
+
+    def get(self, node_id: int) -> Optional[ast_models.ASTNode]:
+        return self._by_id.get(node_id)
+
+    def parent(self, node: ast_models.ASTNode) -> Optional[ast_models.ASTNode]:
+        link = self._link(node)
+        return link[1] if link else None
+
+    def location(
+        self, node: ast_models.ASTNode
+    ) -> Optional[Tuple[ast_models.ASTNode, str, Optional[int]]]:
+        link = self._link(node)
+        if link is None or link[1] is None:
+            return None
+        parent, field_name, list_index = link[1], link[2], link[3]
+        if list_index is not None:
+            container = getattr(parent, field_name)
+            if list_index >= len(container) or container[list_index] is not node:
+                # The list was edited behind our back, re-resolve the slot.
+                list_index = next(
+                    (i for i, item in enumerate(container) if item is node), None
+                )
+                if list_index is None:
+                    return None
+                self._links[id(node)] = (node, parent, field_name, list_index)
+        return parent, field_name, list_index
+
+    def ancestors(self, node: ast_models.ASTNode) -> Iterator[ast_models.ASTNode]:
+        parent = self.parent(node)
+        while parent is not None:
+            yield parent
+            parent = self.parent(parent)
+
+    def path(self, node: ast_models.ASTNode) -> Tuple[PathStep, ...]:
+        steps = []
+        current = node
+        while True:
+            location = self.location(current)
+            if location is None:
+                break
+            parent, field_name, list_index = location
+            steps.append((field_name, list_index))
+            current = parent
+        return tuple(reversed(steps))
+
+    def replace(self, node: ast_models.ASTNode, new_node: ast_models.ASTNode) -> bool:
+        location = self.location(node)
+        if location is None:
+            return False
+        parent, field_name, list_index = location
+        if list_index is None:
+            setattr(parent, field_name, new_node)
+        else:
+            getattr(parent, field_name)[list_index] = new_node
+        self._unindex(node)
+        self._index(new_node, parent, field_name, list_index)
+        invalidate_node_cache(new_node, parent, *self.ancestors(parent))
+        return True
+
+    def cursor(self, node: Optional[ast_models.ASTNode] = None) -> "AstCursor":
+        return AstCursor(self, self.root if node is None else node)
+
+
+class AstCursor:
+    def __init__(self, parent_map: ParentMap, node: ast_models.ASTNode):
+        self.parent_map = parent_map
+        self.node = node
+
+    def __repr__(self) -> str:
+        return f"AstCursor({getattr(self.node, 'node_type', None)}, id={getattr(self.node, 'id', None)})"
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, AstCursor) and other.node is self.node
+
+    def __hash__(self) -> int:
+        return id(self.node)
+
+    def _at(self, node: Optional[ast_models.ASTNode]) -> Optional["AstCursor"]:
+        return AstCursor(self.parent_map, node) if node is not None else None
+
+    @property
+    def parent(self) -> Optional["AstCursor"]:
+        return self._at(self.parent_map.parent(self.node))
+
+    @property
+    def field_name(self) -> Optional[str]:
+        location = self.parent_map.location(self.node)
+        return location[1] if location else None
+
+    @property
+    def index(self) -> Optional[int]:
+        location = self.parent_map.location(self.node)
+        return location[2] if location else None
+
+    def _container(self) -> Tuple[Optional[list], Optional[int]]:
+        location = self.parent_map.location(self.node)
+        if location is None or location[2] is None:
+            return None, None
+        parent, field_name, list_index = location
+        return getattr(parent, field_name), list_index
+
+    @property
+    def siblings(self) -> List["AstCursor"]:
+        container, list_index = self._container()
+        if container is None:
+            return []
+        return [
+            AstCursor(self.parent_map, item)
+            for i, item in enumerate(container)
+            if i != list_index and hasattr(item, "node_type")
+        ]
+
+    @property
+    def next(self) -> Optional["AstCursor"]:
+        container, list_index = self._container()
+        if container is None or list_index + 1 >= len(container):
+            return None
+        return self._at(container[list_index + 1])
+
+    @property
+    def prev(self) -> Optional["AstCursor"]:
+        container, list_index = self._container()
+        if container is None or list_index == 0:
+            return None
+        return self._at(container[list_index - 1])
+
+    @property
+    def path(self) -> Tuple[PathStep, ...]:
+        return self.parent_map.path(self.node)
+
+    @property
+    def children(self) -> List["AstCursor"]:
+        return [
+            AstCursor(self.parent_map, child)
+            for _, _, child in iter_child_nodes(self.node)
+        ]
+
+    def ancestors(self) -> Iterator["AstCursor"]:
+        for ancestor in self.parent_map.ancestors(self.node):
+            yield AstCursor(self.parent_map, ancestor)
+
+    def replace(self, new_node: ast_models.ASTNode) -> "AstCursor":
+        if not self.parent_map.replace(self.node, new_node):
+            raise ValueError("Cannot replace the root node or a detached node")
+        return AstCursor(self.parent_map, new_node)
+
+
+def create_cursor(
+    ast: ast_models.ASTNode, node: Optional[ast_models.ASTNode] = None
+) -> AstCursor:
+    return ParentMap(ast).cursor(node)
@@ -0,0 +1,354 @@
+import bisect
+import typing
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from pydantic import BaseModel
+
+from solc_ast_parser.hashing import IGNORED_FIELDS, subtree_hash
+from solc_ast_parser.models import ast_models
+from solc_ast_parser.utils import (
+    find_node_with_properties,
+    insert_node,
+    invalidate_node_cache,
+    remove_node,
+    replace_node,
+    traverse_ast,
+    update_node_fields,
+)
+
+EditKind = typing.Literal["insert", "delete", "move", "update"]
+Position = typing.Literal["after", "before", "child_first", "child_last"]
+
+
+@dataclass
+class EditOperation:
+    kind: EditKind
+    node_id: Optional[int] = None
+    node: Optional[ast_models.ASTNode] = None
+    anchor_id: Optional[int] = None
+    position: Optional[Position] = None
+    fields: Dict[str, Any] = field(default_factory=dict)
+
+
+def _is_node(value: Any) -> bool:
+    return hasattr(value, "model_fields") and hasattr(value, "node_type")
+
+
+def _has_id(node: ast_models.ASTNode) -> bool:
+    return isinstance(getattr(node, "id", None), int)
+
+
+def _is_node_list(value: Any) -> bool:
+    return isinstance(value, list) and all(_is_node(item) for item in value)
+
+
+class _AstDiffer:
+    def __init__(self, original: ast_models.ASTNode):
+        self.script: List[EditOperation] = []
+        self.used_ids: Set[int] = set()
+        traverse_ast(original, self._collect_id)
+        self.next_id = max((i for i in self.used_ids if i >= 0), default=-1) + 1
+        self.next_yul_id = min((i for i in self.used_ids if i < 0), default=0) - 1
+
+    def _collect_id(self, node: ast_models.ASTNode, parent: Any) -> None:
+        node_id = getattr(node, "id", None)
+        if isinstance(node_id, int):
+            self.used_ids.add(node_id)
+
+    def fresh_copy(self, node: ast_models.ASTNode) -> ast_models.ASTNode:
+        # Nodes taken from the other tree may reuse ids of the original one,
+        # which would make later operations ambiguous.
+        copy = node.model_copy(deep=True)
+
+        def renumber(current: ast_models.ASTNode, parent: Any) -> None:
+            node_id = getattr(current, "id", None)
+            if not isinstance(node_id, int):
+                return
+            if node_id in self.used_ids:
+                if node_id >= 0:
+                    current.id = self.next_id
+                    self.next_id += 1
+                else:
+                    current.id = self.next_yul_id
+                    self.next_yul_id -= 1
+            self.used_ids.add(current.id)
+
+        traverse_ast(copy, renumber)
+        return copy
+
+    def diff_node(self, old: ast_models.ASTNode, new: ast_models.ASTNode) -> None:
+        if subtree_hash(old) == subtree_hash(new):
+            return
+
+        changed_fields = {}
+        for field_name, old_value in old.__dict__.items():
+            if field_name in IGNORED_FIELDS:
+                continue
+            new_value = new.__dict__.get(field_name)
+            if _is_node(old_value) or _is_node(new_value):
+                self.diff_child(old, field_name, old_value, new_value)
+            elif (
+                isinstance(old_value, list)
+                and isinstance(new_value, list)
+                and (old_value or new_value)
+                and _is_node_list(old_value)
+                and _is_node_list(new_value)
+            ):
+                self.diff_list(old, field_name, old_value, new_value)
+            elif old_value != new_value:
+                changed_fields[field_name] = _copy_value(new_value)
+
+        if changed_fields:
+            self.script.append(
+                EditOperation("update", node_id=old.id, fields=changed_fields)
+            )
+
+    def diff_child(
+        self,
+        parent: ast_models.ASTNode,
+        field_name: str,
+        old: Optional[ast_models.ASTNode],
+        new: Optional[ast_models.ASTNode],
+    ) -> None:
+        if new is None and _has_id(old):
+            self.script.append(EditOperation("delete", node_id=old.id))
+        elif old is None or new is None or not _has_id(old):
+            # A node without an id can only be rewritten through the field
+            # that holds it.
+            self.script.append(
+                EditOperation(
+                    "update",
+                    node_id=parent.id,
+                    fields={
+                        field_name: None if new is None else self.fresh_copy(new)
+                    },
+                )
+            )
+        elif type(old) is not type(new):
+            self.script.append(
+                EditOperation("update", node_id=old.id, node=self.fresh_copy(new))
+            )
+        else:
+            self.diff_node(old, new)
+
+    def diff_list(
+        self,
+        parent: ast_models.ASTNode,
+        field_name: str,
+        old_items: List[ast_models.ASTNode],
+        new_items: List[ast_models.ASTNode],
+    ) -> None:
+        if not all(_has_id(item) for item in old_items + new_items):
+            self.script.append(
+                EditOperation(
+                    "update",
+                    node_id=parent.id,
+                    fields={field_name: [self.fresh_copy(i) for i in new_items]},
+                )
+            )
+            return
+
+        matches = _match_items(old_items, new_items)
+        matched_old = {old_index for old_index, _ in matches}
+        new_to_old = {new_index: old_index for old_index, new_index in matches}
+        in_place = _longest_increasing_run(matches)
+
+        for old_index, item in enumerate(old_items):
+            if old_index not in matched_old:
+                self.script.append(EditOperation("delete", node_id=item.id))
+
+        first_in_place = next(
+            (
+                old_items[new_to_old[new_index]].id
+                for new_index in range(len(new_items))
+                if new_to_old.get(new_index) in in_place
+            ),
+            None,
+        )
+        previous_id = None
+        for new_index, new_item in enumerate(new_items):
+            old_index = new_to_old.get(new_index)
+            if old_index in in_place:
+                previous_id = old_items[old_index].id
+                continue
+
+            if previous_id is not None:
+                anchor_id, position = previous_id, "after"
+            elif first_in_place is not None:
+                anchor_id, position = first_in_place, "before"
+            elif field_name in ("nodes", "statements"):
+                anchor_id, position = parent.id, "child_first"
+            else:
+                # Nothing left to anchor on and insert_node() cannot address
+                # this list, so rewrite the whole field.
+                self.script.append(
+                    EditOperation(
+                        "update",
+                        node_id=parent.id,
+                        fields={field_name: [self.fresh_copy(i) for i in new_items]},
+                    )
+                )
+                return
+
+            if old_index is None:
+                node = self.fresh_copy(new_item)
+                self.script.append(
+                    EditOperation(
+                        "insert", node=node, anchor_id=anchor_id, position=position
+                    )
+                )
+                previous_id = node.id
+            else:
+                self.script.append(
+                    EditOperation(
+                        "move",
+                        node_id=old_items[old_index].id,
+                        anchor_id=anchor_id,
+                        position=position,
+                    )
+                )
+                previous_id = old_items[old_index].id
+
+        for old_index, new_index in matches:
+            old_item, new_item = old_items[old_index], new_items[new_index]
+            if type(old_item) is not type(new_item):
+                self.script.append(
+                    EditOperation(
+                        "update", node_id=old_item.id, node=self.fresh_copy(new_item)
+                    )
+                )
+            else:
+                self.diff_node(old_item, new_item)
+
+
+def _match_items(
+    old_items: List[ast_models.ASTNode], new_items: List[ast_models.ASTNode]
+) -> List[Tuple[int, int]]:
+    # Identical subtrees first, then renamed ones, then nodes of the same kind
+    # and name, and finally any remaining nodes of the same kind in order.
+    keys = (
+        lambda node: subtree_hash(node),
+        lambda node: subtree_hash(node, ignore_names=True),
+        lambda node: (node.node_type, getattr(node, "name", None)),
+        lambda node: node.node_type,
+    )
+    unmatched_old = list(range(len(old_items)))
+    unmatched_new = list(range(len(new_items)))
+    matches = []
+    for key in keys:
+        candidates: Dict[Any, List[int]] = {}
+        for old_index in unmatched_old:
+            candidates.setdefault(key(old_items[old_index]), []).append(old_index)
+        for bucket in candidates.values():
+            bucket.reverse()
+        still_unmatched_new = []
+        for new_index in unmatched_new:
+            bucket = candidates.get(key(new_items[new_index]))
+            if bucket:
+                matches.append((bucket.pop(), new_index))
+            else:
+                still_unmatched_new.append(new_index)
+        matched_old = {old_index for old_index, _ in matches}
+        unmatched_old = [i for i in unmatched_old if i not in matched_old]
+        unmatched_new = still_unmatched_new
+    return sorted(matches)
+
+
+def _longest_increasing_run(matches: List[Tuple[int, int]]) -> Set[int]:
+    # Longest increasing subsequence of new positions in old order: these
+    # matched items keep their relative order, every other match is a move.
+    tails: List[int] = []
+    tail_indices: List[int] = []
+    previous: List[Optional[int]] = []
+    for i, (_, new_index) in enumerate(matches):
+        position = bisect.bisect_left(tails, new_index)
+        if position == len(tails):
+            tails.append(new_index)
+            tail_indices.append(i)
+        else:
+            tails[position] = new_index
+            tail_indices[position] = i
+        previous.append(tail_indices[position - 1] if position else None)
+
+    result = set()
+    i = tail_indices[-1] if tail_indices else None
+    while i is not None:
+        result.add(matches[i][0])
+        i = previous[i]
+    return result
+
+
+def diff_ast(
+    original: ast_models.ASTNode, modified: ast_models.ASTNode
+) -> List[EditOperation]:
+    if type(original) is not type(modified):
+        raise ValueError("Cannot diff nodes of different types")
+    differ = _AstDiffer(original)
+    differ.diff_node(original, modified)
+    return differ.script
+
+
+def apply_edit_script(ast: ast_models.ASTNode, script: List[EditOperation]) -> bool:
+    success = True
+    for operation in script:
+        if operation.kind == "delete":
+            success = remove_node(ast, operation.node_id) and success
+        elif operation.kind == "insert":
+            success = (
+                _insert(
+                    ast,
+                    operation.anchor_id,
+                    operation.node.model_copy(deep=True),
+                    operation.position,
+                )
+                and success
+            )
+        elif operation.kind == "move":
+            moved = find_node_with_properties(ast, id=operation.node_id)
+            success = (
+                bool(moved)
+                and remove_node(ast, operation.node_id)
+                and _insert(ast, operation.anchor_id, moved[0], operation.position)
+                and success
+            )
+        elif operation.node is not None:
+            success = (
+                replace_node(
+                    ast, operation.node_id, operation.node.model_copy(deep=True)
+                )
+                and success
+            )
+        else:
+            fields = {
+                name: _copy_value(value) for name, value in operation.fields.items()
+            }
+            success = (
+                update_node_fields(ast, {"id": operation.node_id}, fields) and success
+            )
+    return success
+
+
+def _copy_value(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_copy(deep=True)
+    if isinstance(value, list):
+        return [_copy_value(item) for item in value]
+    return value
+
+
+def _insert(
+    ast: ast_models.ASTNode,
+    anchor_id: int,
+    node: ast_models.ASTNode,
+    position: Position,
+) -> bool:
+    if getattr(ast, "id", None) == anchor_id:
+        # insert_node() only looks below the root.
+        children = getattr(ast, "nodes", None)
+        if children is None or position not in ("child_first", "child_last"):
+            return False
+        children.insert(0 if position == "child_first" else len(children), node)
+        invalidate_node_cache(ast)
+        return True
+    return insert_node(ast, anchor_id, node, position)
@@ -0,0 +1,166 @@
+import re
+from array import array
+from bisect import bisect_right
+from typing import Dict, List, Optional, TextIO, Tuple
+
+# Block rendering checks whether a statement wrote a `// ...` comment. The
+# lookahead finds overlapping occurrences too, as re.search on the statement
+# output alone would.
+_LINE_COMMENT = re.compile(r"(?=// [^\n])")
+_TAIL_SIZE = 3
+
+# Indentation strings, built once and shared by every render.
+INDENTATION = tuple(" " * spaces_count for spaces_count in range(0, 129))
+
+# Captured output, the offset of its last `// ` comment (-1 if none) and its
+# source map entries relative to the start (None when not mapping).
+Rendered = Tuple[str, int, Optional[array]]
+Capture = Tuple[int, int, int, int]
+
+
+class SolidityEmitter:
+    def __init__(self, stream: Optional[TextIO] = None, source_map: bool = False):
+        self.stream = stream
+        self.position = 0
+        # Flat (start, length, node id) triples in byte offsets, like src.
+        # Entries are in emission order, so enclosing nodes come first.
+        self.source_map: Optional[array] = array("q") if source_map else None
+        self._byte_position = 0
+        self._parts: List[str] = []
+        self._tail = ""
+        self._last_comment = -1
+        self._captures = 0
+        self._config_keys: Dict[int, Tuple] = {}
+
+    def write(self, text: str) -> None:
+        if not text:
+            return
+        window = self._tail + text
+        if "// " in window:
+            offset = self.position - len(self._tail)
+            for match in _LINE_COMMENT.finditer(window):
+                self._last_comment = offset + match.start()
+        self._tail = window[-_TAIL_SIZE:]
+        self._append(text)
+
+    def _append(self, text: str) -> None:
+        self.position += len(text)
+        if self.source_map is not None:
+            self._byte_position += len(text) if text.isascii() else len(text.encode())
+        if self.stream is None or self._captures:
+            self._parts.append(text)
+        if self.stream is not None:
+            self.stream.write(text)
+
+    def indent(self, spaces_count: int) -> None:
+        if spaces_count < len(INDENTATION):
+            self.write(INDENTATION[spaces_count])
+        else:
+            self.write(" " * spaces_count)
+
+    def config_key(self, config) -> Tuple:
+        # Render cache keys include the config, built once per render rather
+        # than once per node.
+        key = self._config_keys.get(id(config))
+        if key is None:
+            key = self._config_keys[id(config)] = tuple(config.__dict__.items())
+        return key
+
+    def ends_with(self, suffix: str, since: int = 0) -> bool:
+        if self.position - since < len(suffix):
+            return False
+        return self._tail.endswith(suffix)
+
+    def has_line_comment(self, since: int = 0) -> bool:
+        return self._last_comment >= since
+
+    def open_node(self, node) -> int:
+        node_id = getattr(node, "id", None)
+        if self.source_map is None or node_id is None:
+            return -1
+        self.source_map.extend((self._byte_position, 0, node_id))
+        return len(self.source_map) - 3
+
+    def close_node(self, entry: int) -> None:
+        if entry >= 0:
+            self.source_map[entry + 1] = self._byte_position - self.source_map[entry]
+
+    def start_capture(self) -> Capture:
+        self._captures += 1
+        map_index = len(self.source_map) if self.source_map is not None else 0
+        return len(self._parts), self.position, map_index, self._byte_position
+
+    def end_capture(self, capture: Capture) -> Rendered:
+        index, start, map_index, byte_start = capture
+        text = "".join(self._parts[index:])
+        self._captures -= 1
+        if self.stream is not None and not self._captures:
+            del self._parts[:]
+        else:
+            self._parts[index:] = [text]
+        last_comment = self._last_comment - start if self._last_comment >= start else -1
+        entries = None
+        if self.source_map is not None:
+            entries = self.source_map[map_index:]
+            for i in range(0, len(entries), 3):
+                entries[i] -= byte_start
+        return text, last_comment, entries
+
+    def replay(self, rendered: Rendered) -> None:
+        # Writes previously captured output without scanning all of it again,
+        # only a comment marker split across the boundary can be new.
+        text, last_comment, entries = rendered
+        if entries is not None and self.source_map is not None:
+            for i in range(0, len(entries), 3):
+                self.source_map.extend(
+                    (entries[i] + self._byte_position, entries[i + 1], entries[i + 2])
+                )
+        if not text:
+            return
+        window = self._tail + text[:_TAIL_SIZE]
+        offset = self.position - len(self._tail)
+        for match in _LINE_COMMENT.finditer(window):
+            self._last_comment = offset + match.start()
+        if last_comment >= 0:
+            self._last_comment = max(self._last_comment, self.position + last_comment)
+        self._tail = (self._tail + text)[-_TAIL_SIZE:]
+        self._append(text)
+
+    def getvalue(self) -> str:
+        if self.stream is not None:
+            raise ValueError("Emitter writes to a stream")
+        if len(self._parts) > 1:
+            self._parts = ["".join(self._parts)]
+        return self._parts[0] if self._parts else ""
+
+
+def render(node, **kwargs) -> str:
+    emitter = SolidityEmitter()
+    node.emit_solidity(emitter, **kwargs)
+    return emitter.getvalue()
+
+
+def render_with_source_map(node, **kwargs) -> Tuple[str, array]:
+    emitter = SolidityEmitter(source_map=True)
+    node.emit_solidity(emitter, **kwargs)
+    return emitter.getvalue(), emitter.source_map
+
+
+def source_map_node_id(source_map: array, offset: int) -> Optional[int]:
+    # Innermost node whose generated text covers the byte offset. Enclosing
+    # entries come before the ones they contain, so the last entry starting
+    # at or before the offset that still covers it is the innermost one.
+    # Bisects over the entry indexes, slicing out the starts would copy a
+    # third of the map on every lookup.
+    i = (
+        bisect_right(
+            range(len(source_map) // 3), offset, key=lambda i: source_map[3 * i]
+        )
+        - 1
+    )
+    while i >= 0:
+        start, length, node_id = source_map[3 * i : 3 * i + 3]
+        if offset < start + length:
+            return node_id
+        i -= 1
+    return None
@@ -1,6 +1,9 @@
 import json
-import random
-from typing import List, Tuple, Union
+import re
+from concurrent.futures import Executor
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple, Union
+from solc_ast_parser.cursor import ParentMap
+from solc_ast_parser.ids import id_allocator, new_id
 from solc_ast_parser.models import ast_models
 from solc_ast_parser.models.ast_models import (
     ElementaryTypeName,
@@ -12,8 +15,13 @@ from solc_ast_parser.models.ast_models import (
     TypeName,
     VariableDeclaration,
 )
-from solc_ast_parser.models.base_ast_models import NodeType
-from solc_ast_parser.utils import find_node_with_properties, traverse_ast
+from solc_ast_parser.models.base_ast_models import IdAllocator, NodeType, node_cache
+from solc_ast_parser.symbols import ReferenceResolver, SymbolTable
+from solc_ast_parser.utils import (
+    invalidate_node_cache,
+    iter_child_nodes,
+)
+from solc_ast_parser.visitor import NodeVisitor
 
 
 def create_storage_declaration(
@@ -24,6 +32,7 @@ def create_storage_declaration(
     mutability: str = "nonpayable",
     state_variable: bool = False,
     storage_location: str = "",
+    ids: Optional[IdAllocator] = None,
 ) -> VariableDeclaration:
     return VariableDeclaration(
         name=storage_name,
@@ -35,16 +44,18 @@ def create_storage_declaration(
         visibility=visibility,
         nameLocation="",
         nodeType=NodeType.VARIABLE_DECLARATION,
-        id=random.randint(0, 100000),
+        id=new_id(ids),
         src="",
     )
 
 
-def create_elementary_type(type_name: str) -> ElementaryTypeName:
+def create_elementary_type(
+    type_name: str, ids: Optional[IdAllocator] = None
+) -> ElementaryTypeName:
     return ElementaryTypeName(
         name=type_name if type_name is not None else "uint256",
         nodeType=NodeType.ELEMENTARY_TYPE_NAME,
-        id=random.randint(0, 100000),
+        id=new_id(ids),
         src="",
     )
 
@@ -53,6 +64,7 @@ def create_struct_declaration(
     struct_name: str,
     struct_members: List[VariableDeclaration],
     visibility: str = "internal",
+    ids: Optional[IdAllocator] = None,
 ) -> StructDefinition:
     return StructDefinition(
         name=struct_name,
@@ -60,7 +72,7 @@ def create_struct_declaration(
         members=struct_members,
         visibility=visibility,
         nodeType=NodeType.STRUCT_DEFINITION,
-        id=random.randint(0, 100000),
+        id=new_id(ids),
         src="",
     )
 
@@ -68,6 +80,7 @@ def create_struct_declaration(
 def create_event_definition(
     event_name: str,
     parameters: List[VariableDeclaration],
+    ids: Optional[IdAllocator] = None,
 ) -> ast_models.EventDefinition:
     return ast_models.EventDefinition(
         name=event_name,
@@ -75,155 +88,223 @@ def create_event_definition(
         parameters=ast_models.ParameterList(
             parameters=parameters,
             nodeType=NodeType.PARAMETER_LIST,
-            id=random.randint(0, 100000),
+            id=new_id(ids),
             src="",
         ),
         anonymous=False,
         nodeType=NodeType.EVENT_DEFINITION,
-        id=random.randint(0, 100000),
+        id=new_id(ids),
         src="",
     )
 
 
-def create_array_type_name(base_type: ElementaryTypeName) -> ast_models.ArrayTypeName:
+def create_array_type_name(
+    base_type: ElementaryTypeName, ids: Optional[IdAllocator] = None
+) -> ast_models.ArrayTypeName:
     return ast_models.ArrayTypeName(
         baseType=base_type,
         length=None,
         nodeType=NodeType.ARRAY_TYPE_NAME,
-        id=random.randint(0, 100000),
+        id=new_id(ids),
         src="",
     )
 
 
-def create_user_defined_type_name(type_name: str) -> ast_models.UserDefinedTypeName:
+def create_user_defined_type_name(
+    type_name: str, ids: Optional[IdAllocator] = None
+) -> ast_models.UserDefinedTypeName:
     return ast_models.UserDefinedTypeName(
         name=type_name,
         nodeType=NodeType.USER_DEFINED_TYPE_NAME,
-        id=random.randint(0, 100000),
+        id=new_id(ids),
         src="",
     )
 
 
 def append_declaration_to_contract(
-    ast: SourceUnit, declaration: Union[VariableDeclaration, StructDefinition]
+    ast: SourceUnit,
+    declaration: Union[VariableDeclaration, StructDefinition],
+    contract: Optional[ast_models.ContractDefinition] = None,
 ) -> SourceUnit:
-    for ast_node in ast.nodes:
-        if ast_node.node_type == NodeType.CONTRACT_DEFINITION:
-            if declaration.node_type == NodeType.STRUCT_DEFINITION:
-                ast_node.nodes.insert(0, declaration)
-            else:
-                last_struct_definition = next(
-                    (
-                        idx
-                        for idx, contract_node in enumerate(reversed(ast_node.nodes))
-                        if contract_node.node_type == NodeType.STRUCT_DEFINITION
-                    ),
-                    None,
+    # Without a target the declaration goes into the first contract.
+    if contract is None:
+        contract = next(
+            (
+                ast_node
+                for ast_node in ast.nodes
+                if ast_node.node_type == NodeType.CONTRACT_DEFINITION
+            ),
+            None,
+        )
+        if contract is None:
+            raise ValueError("Contract not found in AST")
+    if declaration.node_type == NodeType.STRUCT_DEFINITION:
+        contract.nodes.insert(0, declaration)
+    else:
+        last_struct_definition = next(
+            (
+                idx
+                for idx, contract_node in enumerate(reversed(contract.nodes))
+                if contract_node.node_type == NodeType.STRUCT_DEFINITION
+            ),
+            None,
+        )
+        if last_struct_definition:
+            contract.nodes.insert(last_struct_definition, declaration)
+        else:
+            contract.nodes.insert(0, declaration)
+    invalidate_node_cache(contract, ast)
+    return ast
+
+
+class _StorageUsageCollector(NodeVisitor):
+    # One pass over the AST gathering everything restore_storages looks up.
+    # Usages are kept in visit order and only judged afterwards, once all
+    # declarations and calls are known.
+    def __init__(self):
+        self.declarations: Set[str] = set()
+        self.function_calls: Set[int] = set()
+        self.member_accesses: Dict[str, List[ast_models.MemberAccess]] = {}
+        self.usages: List[Tuple[str, str, ast_models.ASTNode]] = []
+        self.events_to_create: Dict[str, Tuple[list, FunctionCall]] = {}
+
+    def visit_VariableDeclaration(self, node: VariableDeclaration):
+        self.declarations.add(node.name)
+        self.generic_visit(node)
+
+    def visit_IndexAccess(self, node: ast_models.IndexAccess):
+        base_name = extract_expression_name(node.base_expression)
+        self.usages.append(("array", base_name, node))
+        self.generic_visit(node)
+
+    def visit_MemberAccess(self, node: ast_models.MemberAccess):
+        base_name = extract_expression_name(node.expression)
+        self.member_accesses.setdefault(base_name, []).append(node)
+        if node.expression.node_type == NodeType.INDEX_ACCESS:
+            self.usages.append(("struct array", base_name, node))
+        else:
+            self.usages.append(("struct", base_name, node))
+        self.generic_visit(node)
+
+    def visit_EmitStatement(self, node: ast_models.EmitStatement):
+        if hasattr(node.event_call, "expression"):
+            event_name = extract_expression_name(node.event_call.expression)
+            if event_name not in self.events_to_create:
+                self.events_to_create[event_name] = (
+                    node.event_call.arguments,
+                    node.event_call,
                 )
-                if last_struct_definition:
-                    ast_node.nodes.insert(last_struct_definition, declaration)
-                else:
-                    ast_node.nodes.insert(0, declaration)
-            return ast
-    raise ValueError("Contract not found in AST")
+        self.generic_visit(node)
 
+    def visit_FunctionCall(self, node: ast_models.FunctionCall):
+        self.function_calls.add(id(node.expression))
+        if hasattr(node, "expression") and hasattr(node.expression, "member_name"):
+            if node.expression.member_name in {"transfer", "send", "call", "sender"}:
+                base_name = extract_expression_name(node.expression.expression)
+                self.usages.append(("address", base_name, node))
+        self.generic_visit(node)
 
-def restore_storages(ast: SourceUnit) -> SourceUnit:
-    storages = [
-        s.name
-        for s in find_node_with_properties(ast, node_type=NodeType.VARIABLE_DECLARATION)
-    ]
-    function_calls = [
-        f.expression
-        for f in find_node_with_properties(ast, node_type=NodeType.FUNCTION_CALL)
-    ]
+    def visit_Identifier(self, node: ast_models.Identifier):
+        self.usages.append(("uint256", node.name, node))
+
+    def storage_types(self) -> Dict[str, str]:
+        storage_types = {}
+        for storage_type, name, node in self.usages:
+            if name in self.declarations:
+                continue
+            if storage_type == "address":
+                storage_types[name] = storage_type
+            elif name not in storage_types and id(node) not in self.function_calls:
+                storage_types[name] = storage_type
+        return storage_types
+
+
+def _storage_declarations(
+    root: ast_models.ASTNode,
+    ids: IdAllocator,
+    declared: Iterable[str] = (),
+) -> List[ast_models.ASTNode]:
+    # The declarations restore_storages adds for the usages under root, in
+    # the order they are appended. Names in declared count as declared.
+    collector = _StorageUsageCollector()
+    collector.visit(root)
+    storages = collector.declarations.union(declared)
     builtin_storages = {"msg", "block", "tx", "now", "gasleft", "this", "abi", "self"}
-    storage_types = {}
-    events_to_create = {}
+    declarations = []
 
     def _create_array_storage(storage_name: str):
         return create_storage_declaration(
             storage_name=storage_name,
             storage_type=ast_models.ArrayTypeName(
-                baseType=create_elementary_type("uint256"),
+                baseType=create_elementary_type("uint256", ids=ids),
                 length=None,
                 nodeType=NodeType.ARRAY_TYPE_NAME,
-                id=random.randint(0, 100000),
+                id=ids.allocate(),
                 src="",
             ),
+            ids=ids,
         )
 
+    def _create_struct_members(storage_name: str):
+        # One member per distinct name accessed on the storage.
+        member_names = dict.fromkeys(
+            member.member_name
+            for member in collector.member_accesses.get(storage_name, [])
+        )
+        return [
+            create_storage_declaration(
+                storage_name=member_name,
+                storage_type=create_elementary_type("uint256", ids=ids),
+                ids=ids,
+            )
+            for member_name in member_names
+        ]
+
     def _create_struct_storage(storage_name: str):
-        nonlocal ast
         struct_name = storage_name.capitalize()
-        members = filter(
-            lambda n: n.node_type == NodeType.MEMBER_ACCESS
-            and extract_expression_name(n.expression) == storage_name,
-            find_node_with_properties(ast, node_type=NodeType.MEMBER_ACCESS),
-        )
         struct_decl = create_struct_declaration(
             struct_name=struct_name,
-            struct_members=[
-                create_storage_declaration(
-                    storage_name=member.member_name,
-                    storage_type=create_elementary_type("uint256"),
-                )
-                for member in members
-            ],
+            struct_members=_create_struct_members(storage_name),
+            ids=ids,
         )
-        ast = append_declaration_to_contract(ast, struct_decl)
+        declarations.append(struct_decl)
 
         return create_storage_declaration(
             storage_name=storage_name,
             storage_type=ast_models.UserDefinedTypeName(
                 nodeType=NodeType.USER_DEFINED_TYPE_NAME,
-                id=random.randint(0, 100000),
+                id=ids.allocate(),
                 src="",
                 pathNode=IdentifierPath(
                     nodeType=NodeType.IDENTIFIER_PATH,
-                    id=random.randint(0, 100000),
+                    id=ids.allocate(),
                     src="",
                     nameLocations=[],
                     name=struct_name,
                 ),
             ),
+            ids=ids,
         )
 
     def _create_struct_array_storage(storage_name: str):
-        nonlocal ast
         struct_name = storage_name.capitalize()
-        members = filter(
-            lambda n: n.node_type == NodeType.MEMBER_ACCESS
-            and extract_expression_name(n.expression) == storage_name,
-            find_node_with_properties(ast, node_type=NodeType.MEMBER_ACCESS),
-        )
-        struct_members = []
-
-        for member in members:
-            if member.id not in [m.id for m in struct_members]:
-                struct_members.append(
-                    create_storage_declaration(
-                        storage_name=member.member_name,
-                        storage_type=create_elementary_type("uint256"),
-                    )
-                )
-
         struct_decl = create_struct_declaration(
             struct_name=struct_name,
-            struct_members=struct_members,
+            struct_members=_create_struct_members(storage_name),
+            ids=ids,
         )
-        ast = append_declaration_to_contract(ast, struct_decl)
+        declarations.append(struct_decl)
 
         return create_storage_declaration(
             storage_name=storage_name,
             storage_type=ast_models.ArrayTypeName(
                 baseType=ast_models.UserDefinedTypeName(
                     nodeType=NodeType.USER_DEFINED_TYPE_NAME,
-                    id=random.randint(0, 100000),
+                    id=ids.allocate(),
                     src="",
                     pathNode=IdentifierPath(
                         nodeType=NodeType.IDENTIFIER_PATH,
-                        id=random.randint(0, 100000),
+                        id=ids.allocate(),
                         src="",
                         nameLocations=[],
                         name=struct_name,
@@ -231,64 +312,10 @@ def restore_storages(ast: SourceUnit) -> SourceUnit:
                 ),
                 length=None,
                 nodeType=NodeType.ARRAY_TYPE_NAME,
-                id=random.randint(0, 100000),
+                id=ids.allocate(),
                 src="",
             ),
-        )
-
-    def analyze_storage_type(node: ast_models.ASTNode):
-        if not hasattr(node, "node_type"):
-            return
-
-        handlers = {
-            NodeType.INDEX_ACCESS: _handle_index_access,
-            NodeType.MEMBER_ACCESS: _handle_member_access,
-            NodeType.EMIT_STATEMENT: _handle_emit_statement,
-            NodeType.FUNCTION_CALL: _handle_function_call,
-            NodeType.IDENTIFIER: _handle_identifier,
-        }
-
-        handler = handlers.get(node.node_type)
-        if handler:
-            handler(node)
-
-    def _handle_index_access(node):
-        base_name = extract_expression_name(node.base_expression)
-        if _should_add_storage(base_name, node):
-            storage_types[base_name] = "array"
-
-    def _handle_member_access(node):
-        if node.expression.node_type == NodeType.INDEX_ACCESS:
-            base_name = extract_expression_name(node.expression)
-            if _should_add_storage(base_name, node):
-                storage_types[base_name] = "struct array"
-        else:
-            base_name = extract_expression_name(node.expression)
-            if _should_add_storage(base_name, node):
-                storage_types[base_name] = "struct"
-
-    def _handle_emit_statement(node):
-        if hasattr(node.event_call, "expression"):
-            event_name = extract_expression_name(node.event_call.expression)
-            if event_name not in events_to_create:
-                events_to_create[event_name] = node.event_call.arguments
-
-    def _handle_function_call(node):
-        if hasattr(node, "expression") and hasattr(node.expression, "member_name"):
-            if node.expression.member_name in {"transfer", "send", "call", "sender"}:
-                base_name = extract_expression_name(node.expression.expression)
-                if base_name not in storages:
-                    storage_types[base_name] = "address"
-
-    def _handle_identifier(node):
-        if _should_add_storage(node.name, node):
-            storage_types[node.name] = "uint256"
-
-    def _should_add_storage(name, node):
-        return (
-            name not in storages
-            and name not in storage_types
-            and node not in function_calls
+            ids=ids,
         )
 
     def _create_storage_node(storage_name: str, storage_type: str):
@@ -300,43 +327,155 @@ def restore_storages(ast: SourceUnit) -> SourceUnit:
             "struct": _create_struct_storage,
             "struct array": _create_struct_array_storage,
             "address": lambda name: create_storage_declaration(
-                storage_name=name, storage_type=create_elementary_type("address")
+                storage_name=name,
+                storage_type=create_elementary_type("address", ids=ids),
+                ids=ids,
             ),
             "uint256": lambda name: create_storage_declaration(
-                storage_name=name, storage_type=create_elementary_type("uint256")
+                storage_name=name,
+                storage_type=create_elementary_type("uint256", ids=ids),
+                ids=ids,
             ),
         }
 
         handler = type_handlers.get(storage_type)
         return handler(storage_name) if handler else None
 
-    traverse_ast(ast, lambda n, p: analyze_storage_type(n))
+    storage_types = collector.storage_types()
 
-    for event_name, event_args in events_to_create.items():
+    for event_name, (event_args, event_call) in collector.events_to_create.items():
+        # The arguments' parent is the event call, indexing just that subtree
+        # is enough for is_likely_address.
+        parent_map = ParentMap(event_call)
         event_params = [
             create_storage_declaration(
                 storage_name=f"param{i}",
                 storage_type=create_elementary_type(
-                    "address" if is_likely_address(arg, ast) else "uint256"
+                    (
+                        "address"
+                        if is_likely_address(arg, root, parent_map)
+                        else "uint256"
+                    ),
+                    ids=ids,
                 ),
+                ids=ids,
             )
             for i, arg in enumerate(event_args)
         ]
-        ast = append_declaration_to_contract(
-            ast, create_event_definition(event_name=event_name, parameters=event_params)
+        declarations.append(
+            create_event_definition(
+                event_name=event_name, parameters=event_params, ids=ids
+            )
         )
 
     for storage_name, storage_type in storage_types.items():
         storage_node = _create_storage_node(storage_name, storage_type)
         if storage_node:
-            ast = append_declaration_to_contract(ast, storage_node)
+            declarations.append(storage_node)
+
+    return declarations
 
+
+def restore_storages(ast: SourceUnit) -> SourceUnit:
+    for declaration in _storage_declarations(ast, id_allocator(ast)):
+        ast = append_declaration_to_contract(ast, declaration)
     return ast
 
 
-def is_likely_address(node: ast_models.ASTNode, ast: SourceUnit) -> bool:
+def _variable_names(root: ast_models.ASTNode) -> Set[str]:
+    names = set()
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if node.node_type == NodeType.VARIABLE_DECLARATION:
+            names.add(node.name)
+        stack.extend(child for _, _, child in iter_child_nodes(node))
+    return names
+
+
+def _base_contracts(
+    contract: ast_models.ContractDefinition,
+    by_name: Dict[str, ast_models.ContractDefinition],
+) -> List[ast_models.ContractDefinition]:
+    # Every contract of the unit the contract inherits from, directly or not.
+    bases = []
+    seen = {id(contract)}
+    pending = [contract]
+    while pending:
+        current = pending.pop()
+        for specifier in current.base_contracts:
+            base = by_name.get(specifier.base_name.name.split(".")[-1])
+            if base is not None and id(base) not in seen:
+                seen.add(id(base))
+                bases.append(base)
+                pending.append(base)
+    return bases
+
+
+def _plan_contract(
+    task: Tuple[ast_models.ContractDefinition, FrozenSet[str]]
+) -> Tuple[List[ast_models.ASTNode], int]:
+    # Runs in a worker: ids are counted from 0 and shifted when merging.
+    contract, declared = task
+    ids = IdAllocator(0)
+    declarations = _storage_declarations(contract, ids, declared)
+    return declarations, ids.next_id
+
+
+def _shift_ids(node: ast_models.ASTNode, offset: int) -> None:
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        current.id += offset
+        stack.extend(child for _, _, child in iter_child_nodes(current))
+
+
+def restore_contract_storages(
+    ast: SourceUnit, executor: Optional[Executor] = None
+) -> SourceUnit:
+    # Like restore_storages, but every contract is restored on its own and
+    # gets its own missing declarations. A name counts as declared in a
+    # contract if the contract, one of its bases or the file level declares
+    # it. Contracts are planned independently, in the executor when given,
+    # and merged in source order, so the result doesn't depend on it.
+    contracts = [
+        node for node in ast.nodes if node.node_type == NodeType.CONTRACT_DEFINITION
+    ]
+    by_name = {contract.name: contract for contract in contracts}
+    own_names = {id(contract): _variable_names(contract) for contract in contracts}
+    file_names = set()
+    for node in ast.nodes:
+        if node.node_type != NodeType.CONTRACT_DEFINITION:
+            file_names |= _variable_names(node)
+
+    def declared(contract: ast_models.ContractDefinition) -> FrozenSet[str]:
+        names = set(file_names)
+        for base in _base_contracts(contract, by_name):
+            names |= own_names[id(base)]
+        return frozenset(names)
+
+    tasks = [(contract, declared(contract)) for contract in contracts]
+    run = executor.map if executor is not None else map
+    plans = run(_plan_contract, tasks)
+
+    ids = id_allocator(ast)
+    for contract, (declarations, used) in zip(contracts, plans):
+        offset = ids.next_id
+        for declaration in declarations:
+            _shift_ids(declaration, offset)
+            ast = append_declaration_to_contract(ast, declaration, contract)
+        if used:
+            ids.reserve(offset + used - 1)
+    return ast
+
+
+def is_likely_address(
+    node: ast_models.ASTNode,
+    ast: SourceUnit,
+    parent_map: Optional[ParentMap] = None,
+) -> bool:
     if node.node_type == NodeType.IDENTIFIER:
-        for parent in find_parent_nodes(ast, node):
+        for parent in find_parent_nodes(ast, node, parent_map):
             if parent.node_type == NodeType.FUNCTION_CALL:
                 if hasattr(parent.expression, "member_name"):
                     if parent.expression.member_name in [
@@ -350,26 +489,14 @@ def is_likely_address(node: ast_models.ASTNode, ast: SourceUnit) -> bool:
 
 
 def find_parent_nodes(
-    ast: SourceUnit, target_node: ast_models.ASTNode
+    ast: SourceUnit,
+    target_node: ast_models.ASTNode,
+    parent_map: Optional[ParentMap] = None,
 ) -> List[ast_models.ASTNode]:
-    parents = []
-
-    def collect_parents(node: ast_models.ASTNode):
-        for field_name, field in node.model_fields.items():
-            value = getattr(node, field_name)
-            if isinstance(value, list):
-                for item in value:
-                    if item == target_node:
-                        parents.append(node)
-                    elif hasattr(item, "model_fields") and hasattr(item, "node_type"):
-                        collect_parents(item)
-            elif value == target_node:
-                parents.append(node)
-            elif hasattr(value, "model_fields") and hasattr(value, "node_type"):
-                collect_parents(value)
-
-    traverse_ast(ast, lambda n, p: collect_parents(n))
-    return parents
+    if parent_map is None:
+        parent_map = ParentMap(ast)
+    parent = parent_map.parent(target_node)
+    return [parent] if parent is not None else []
 
 
 def extract_type_name(node: ast_models.TypeName) -> str:
@@ -387,83 +514,336 @@ def extract_type_name(node: ast_models.TypeName) -> str:
     return None
 
 
+_DATA_LOCATION = re.compile(
+    r" (?:storage ref|storage pointer|memory|calldata|slice)\b"
+)
+
+TYPE_DEFINITIONS = frozenset(
+    {
+        NodeType.CONTRACT_DEFINITION,
+        NodeType.STRUCT_DEFINITION,
+        NodeType.ENUM_DEFINITION,
+        NodeType.USER_DEFINED_VALUE_TYPE_DEFINITION,
+    }
+)
+
+_TYPE_KEYWORD = re.compile(r"\b(?:contract|struct|enum) ")
+
+# What a literal's variable would be declared as, for ASTs without types.
+LITERAL_TYPES = {
+    "number": "uint256",
+    "bool": "bool",
+    "string": "string",
+    "unicodeString": "string",
+    "hexString": "bytes",
+}
+
+# Types of the members of msg, block and tx, for ASTs without types.
+MAGIC_MEMBER_TYPES = {
+    ("msg", "sender"): "address",
+    ("msg", "value"): "uint256",
+    ("msg", "data"): "bytes",
+    ("msg", "sig"): "bytes4",
+    ("block", "number"): "uint256",
+    ("block", "timestamp"): "uint256",
+    ("block", "chainid"): "uint256",
+    ("block", "basefee"): "uint256",
+    ("tx", "origin"): "address",
+    ("tx", "gasprice"): "uint256",
+}
+
+
+def solidity_type_name(type_string: str) -> Optional[str]:
+    # The declarable type behind a solc typeString, None for tuples, type
+    # expressions and other types without one.
+    type_string = _DATA_LOCATION.sub("", type_string)
+    if type_string.startswith(("int_const", "rational_const")):
+        return "int256" if "-" in type_string else "uint256"
+    if type_string.startswith("literal_string"):
+        return "string"
+    type_string = _TYPE_KEYWORD.sub("", type_string)
+    if type_string.startswith(("tuple(", "type(", "function", "modifier", "magic")):
+        return None
+    if type_string in ("msg", "block", "tx", "abi"):
+        return None
+    return type_string
+
+
+def _identifier(node: ast_models.ASTNode) -> Optional[ast_models.Identifier]:
+    return node if node.node_type == NodeType.IDENTIFIER else None
+
+
+class TypeInference:
+    def __init__(
+        self,
+        ast: ast_models.ASTNode,
+        symbols: Optional[SymbolTable] = None,
+        resolver: Optional[ReferenceResolver] = None,
+    ):
+        self.ast = ast
+        self.resolver = resolver or ReferenceResolver(ast, symbols)
+        # node id -> (node, type name)
+        self._types: Dict[int, Tuple[ast_models.ASTNode, Optional[str]]] = {}
+
+    @property
+    def symbols(self) -> SymbolTable:
+        return self.resolver.symbols
+
+    def infer(self, node: ast_models.Expression) -> Optional[str]:
+        entry = self._types.get(node.id)
+        if entry is not None and entry[0] is node:
+            return entry[1]
+        descriptions = getattr(node, "type_descriptions", None)
+        result = None
+        if descriptions is not None and descriptions.type_string:
+            result = solidity_type_name(descriptions.type_string)
+        if result is None:
+            result = self._infer(node)
+        self._types[node.id] = (node, result)
+        return result
+
+    def _declarations(
+        self,
+        reference: Optional[ast_models.ASTNode],
+        name: str,
+        node: ast_models.ASTNode,
+        node_type: NodeType,
+    ) -> List[ast_models.ASTNode]:
+        # A compiled reference is followed as is. Otherwise the name is looked
+        # up, and since partially restored code may use names that are
+        # declared, just not in scope, any declaration of it beats none.
+        if getattr(reference, "referenced_declaration", None) is not None:
+            declaration = self.resolver.resolve(reference)
+            if declaration is None or declaration.node_type != node_type:
+                return []
+            return [declaration]
+        if not isinstance(name, str):
+            return []
+        found = self.symbols.lookup_all(name, node, (node_type,))
+        return found or self.symbols.declarations(name, (node_type,))
+
+    def _type_name(
+        self, node: ast_models.Expression
+    ) -> Optional[ast_models.TypeName]:
+        # The declared type of a variable, followed through index and member
+        # accesses so they type as the element or member they select.
+        match node.node_type:
+            case NodeType.IDENTIFIER:
+                declarations = self._declarations(
+                    node, node.name, node, NodeType.VARIABLE_DECLARATION
+                )
+                return declarations[0].type_name if declarations else None
+            case NodeType.INDEX_ACCESS:
+                base = self._type_name(node.base_expression)
+                if base is None:
+                    return None
+                if base.node_type == NodeType.MAPPING:
+                    return base.value_type
+                if base.node_type == NodeType.ARRAY_TYPE_NAME:
+                    return base.base_type
+                return None
+            case NodeType.INDEX_RANGE_ACCESS:
+                return self._type_name(node.base_expression)
+            case NodeType.MEMBER_ACCESS:
+                if node.referenced_declaration is not None:
+                    member = self.resolver.resolve(node)
+                else:
+                    container = self._type_name(node.expression)
+                    if (
+                        container is None
+                        or container.node_type != NodeType.USER_DEFINED_TYPE_NAME
+                    ):
+                        return None
+                    definition = self.resolver.resolve(container)
+                    if definition is None:
+                        return None
+                    member = self.symbols.member(definition, node.member_name)
+                if member is None or member.node_type != NodeType.VARIABLE_DECLARATION:
+                    return None
+                return member.type_name
+        return None
+
+    def _type_string(self, type_name: ast_models.TypeName) -> Optional[str]:
+        # Spelled the way solidity_type_name() reads solc's typeString, so
+        # both paths give the same answer.
+        match type_name.node_type:
+            case NodeType.ELEMENTARY_TYPE_NAME:
+                if (
+                    type_name.name == "address"
+                    and type_name.state_mutability == "payable"
+                ):
+                    return "address payable"
+                if type_name.name in ("uint", "int"):
+                    return f"{type_name.name}256"
+                return type_name.name
+            case NodeType.MAPPING:
+                key = self._type_string(type_name.key_type)
+                value = self._type_string(type_name.value_type)
+                if key is None or value is None:
+                    return None
+                return f"mapping({key} => {value})"
+            case NodeType.ARRAY_TYPE_NAME:
+                base = self._type_string(type_name.base_type)
+                length = type_name.length
+                if base is None:
+                    return None
+                if length is None:
+                    return f"{base}[]"
+                if length.node_type == NodeType.LITERAL:
+                    return f"{base}[{length.value}]"
+                return None
+            case NodeType.USER_DEFINED_TYPE_NAME:
+                return self._canonical_name(type_name)
+        return None
+
+    def _canonical_name(self, type_name: ast_models.UserDefinedTypeName) -> str:
+        # Qualified by the contracts it is declared in, like solc's
+        # canonicalName, which parsed-only ASTs lack.
+        definition = self.resolver.resolve(type_name)
+        if definition is None or definition.node_type not in TYPE_DEFINITIONS:
+            return type_name.path_node.name
+        names = [definition.name]
+        scope = self.symbols.scope(definition)
+        if scope is not None and scope.node is definition:
+            scope = scope.parent
+        while scope is not None:
+            if scope.kind == "contract":
+                names.append(scope.node.name)
+            scope = scope.parent
+        return ".".join(reversed(names))
+
+    def _access_type(self, node: ast_models.Expression) -> Optional[str]:
+        type_name = self._type_name(node)
+        if type_name is not None:
+            return self._type_string(type_name)
+        if node.node_type == NodeType.INDEX_ACCESS:
+            # Indexing bytes and fixed-size byte arrays gives single bytes.
+            base = self._type_name(node.base_expression)
+            if (
+                base is not None
+                and base.node_type == NodeType.ELEMENTARY_TYPE_NAME
+                and base.name.startswith("bytes")
+            ):
+                return "bytes1"
+        elif node.node_type == NodeType.MEMBER_ACCESS:
+            container = self._type_name(node.expression)
+            if container is None:
+                base = _identifier(node.expression)
+                if base is None:
+                    return None
+                return MAGIC_MEMBER_TYPES.get((base.name, node.member_name))
+            container_type = self._type_string(container)
+            if node.member_name == "length" and (
+                container.node_type == NodeType.ARRAY_TYPE_NAME
+                or container_type == "bytes"
+            ):
+                return "uint256"
+            if node.member_name == "balance" and container_type in (
+                "address",
+                "address payable",
+            ):
+                return "uint256"
+        return None
+
+    def _infer(self, node: ast_models.Expression) -> Optional[str]:
+        match node.node_type:
+            case NodeType.IDENTIFIER:
+                type_name = self._type_name(node)
+                return self._type_string(type_name) if type_name else None
+            case NodeType.FUNCTION_CALL:
+                function_name = extract_expression_name(node.expression)
+                functions = self._declarations(
+                    _identifier(node.expression),
+                    function_name,
+                    node,
+                    NodeType.FUNCTION_DEFINITION,
+                )
+                for function in functions:
+                    for param in function.return_parameters.parameters:
+                        if param.type_name is not None:
+                            return self._type_string(param.type_name)
+                return None
+            case (
+                NodeType.INDEX_ACCESS
+                | NodeType.INDEX_RANGE_ACCESS
+                | NodeType.MEMBER_ACCESS
+            ):
+                return self._access_type(node)
+            case NodeType.BINARY_OPERATION:
+                return self.infer(node.left_expression)
+            case NodeType.UNARY_OPERATION:
+                return self.infer(node.sub_expression)
+            case NodeType.LITERAL:
+                return LITERAL_TYPES.get(node.kind, node.kind)
+            case NodeType.TUPLE_EXPRESSION:
+                first = node.components[0] if node.components else None
+                return self.infer(first) if first is not None else None
+            case _:
+                raise ValueError(f"Unsupported node type: {node.node_type}")
+
+
+INFERABLE_TYPES = frozenset(
+    {
+        NodeType.IDENTIFIER,
+        NodeType.FUNCTION_CALL,
+        NodeType.INDEX_ACCESS,
+        NodeType.INDEX_RANGE_ACCESS,
+        NodeType.MEMBER_ACCESS,
+        NodeType.BINARY_OPERATION,
+        NodeType.UNARY_OPERATION,
+        NodeType.LITERAL,
+        NodeType.TUPLE_EXPRESSION,
+    }
+)
+
+
+def type_inference(
+    ast: ast_models.ASTNode, symbols: Optional[SymbolTable] = None
+) -> TypeInference:
+    # One engine per root, kept in its cache so repeated lookups share the
+    # memo and indexes until an editing helper clears it.
+    cache = node_cache(ast)
+    if cache is None:
+        return TypeInference(ast, symbols)
+    entry = cache.get("type_inference")
+    if entry is None or (symbols is not None and entry[0] is not symbols):
+        entry = (symbols, TypeInference(ast, symbols))
+        cache["type_inference"] = entry
+    return entry[1]
+
+
+def infer_types(
+    ast: ast_models.ASTNode,
+    symbols: Optional[SymbolTable] = None,
+    inference: Optional[TypeInference] = None,
+) -> Dict[int, str]:
+    # node id -> type name for every expression that could be typed.
+    if inference is None:
+        inference = type_inference(ast, symbols)
+    types = {}
+    stack = [ast]
+    while stack:
+        node = stack.pop()
+        if node.node_type in INFERABLE_TYPES:
+            try:
+                type_name = inference.infer(node)
+            except ValueError:
+                type_name = None
+            if type_name is not None:
+                types[node.id] = type_name
+        stack.extend(child for _, _, child in iter_child_nodes(node))
+    return types
+
+
 def extract_expression_type(
-    ast: ast_models.ASTNode, node: ast_models.Expression
+    ast: ast_models.ASTNode,
+    node: ast_models.Expression,
+    symbols: Optional[SymbolTable] = None,
+    inference: Optional[TypeInference] = None,
 ) -> str:
-    type_name = []
-
-    match node.node_type:
-        case NodeType.IDENTIFIER:
-            traverse_ast(
-                ast,
-                lambda n, p: (
-                    type_name.append(extract_type_name(n.type_name))
-                    if n.node_type == NodeType.VARIABLE_DECLARATION
-                    and n.name == node.name
-                    else None
-                ),
-            )
-        case NodeType.FUNCTION_CALL:
-            traverse_ast(
-                ast,
-                lambda n, p: (
-                    type_name.extend(
-                        [
-                            extract_type_name(param.type_name)
-                            for param in n.return_parameters
-                        ]
-                    )
-                    if n.node_type == NodeType.FUNCTION_DEFINITION
-                    and n.name == extract_expression_name(node.expression)
-                    else None
-                ),
-            )
-        case NodeType.INDEX_ACCESS:
-            traverse_ast(
-                ast,
-                lambda n, p: (
-                    type_name.append(extract_type_name(n.type_name))
-                    if n.node_type == NodeType.VARIABLE_DECLARATION
-                    and n.name == node.base_expression.name
-                    else None
-                ),
-            )
-        case NodeType.INDEX_RANGE_ACCESS:
-            traverse_ast(
-                ast,
-                lambda n, p: (
-                    type_name.append(extract_type_name(n.type_name))
-                    if n.node_type == NodeType.VARIABLE_DECLARATION
-                    and n.name == node.base_expression.name
-                    else None
-                ),
-            )
-        case NodeType.MEMBER_ACCESS:
-            traverse_ast(
-                ast,
-                lambda n, p: (
-                    type_name.append(extract_type_name(n.type_name))
-                    if n.node_type == NodeType.VARIABLE_DECLARATION
-                    and n.name == extract_expression_name(node.expression)
-                    else None
-                ),
-            )
-        case NodeType.BINARY_OPERATION:
-            type_name.append(extract_expression_type(ast, node.left_expression))
-        case NodeType.UNARY_OPERATION:
-            type_name.append(extract_expression_type(ast, node.sub_expression))
-        case NodeType.LITERAL:
-            type_name.append(node.kind)
-        case NodeType.TUPLE_EXPRESSION:
-            type_name.extend(
-                [
-                    extract_expression_type(ast, expression)
-                    for expression in node.components
-                ]
-            )
-        case _:
-            raise ValueError(f"Unsupported node type: {node.node_type}")
-    return type_name[0] if type_name else None
+    if inference is None:
+        inference = type_inference(ast, symbols)
+    return inference.infer(node)
 
 
 def extract_expression_name(node: ast_models.Expression) -> str:
@@ -482,7 +862,8 @@ def extract_expression_name(node: ast_models.Expression) -> str:
             return extract_expression_name(node.sub_expression)
         case NodeType.TUPLE_EXPRESSION:
             return [
-                extract_expression_name(expression) for expression in node.components
+                extract_expression_name(expression) if expression is not None else None
+                for expression in node.components
             ]
         case NodeType.ELEMENTARY_TYPE_NAME_EXPRESSION:
             return node.type_name.name
@@ -492,69 +873,156 @@ def extract_expression_name(node: ast_models.Expression) -> str:
             raise ValueError(f"Unsupported node type: {node.node_type}")
 
 
-def restore_function_definitions(
-    ast: SourceUnit,
-) -> List[ast_models.FunctionDefinition]:
-    def restore_function_arguments(node: FunctionCall):
-        args = []
-        for argument in node.arguments:
-            type_name = extract_expression_type(ast, argument)
-            if type_name:
-                args.append(
-                    create_storage_declaration(
-                        storage_name=extract_expression_name(argument),
-                        storage_type=create_elementary_type(type_name),
-                    )
-                )
-        return args
-
-    function_calls = find_node_with_properties(ast, node_type=NodeType.FUNCTION_CALL)
-    event_defintions = [
-        e.name
-        for e in find_node_with_properties(ast, node_type=NodeType.EVENT_DEFINITION)
-    ]
-    function_definitions = find_node_with_properties(
-        ast, node_type=NodeType.FUNCTION_DEFINITION
-    )
-    storages = [
-        s.name
-        for s in find_node_with_properties(ast, node_type=NodeType.VARIABLE_DECLARATION)
-    ]
-
-    builtin_functions = [
+BUILTIN_FUNCTIONS = frozenset(
+    {
         "require",
         "revert",
         "assert",
+        "keccak256",
+        "sha256",
+        "ripemd160",
+        "ecrecover",
+        "addmod",
+        "mulmod",
+        "blockhash",
+        "blobhash",
+        "gasleft",
+        "selfdestruct",
+        "type",
+        "abi",
+        "this",
+        "super",
+        "payable",
         "address",
-        "uint256",
-        "int256",
         "bool",
         "string",
         "bytes",
-        "bytes32",
-        "uint8",
-        "uint16",
-        "uint32",
-        "uint64",
-        "uint128",
-        "int8",
-        "int16",
-        "int32",
-        "int64",
-        "int128",
+        "uint",
+        "int",
+    }
+    # Conversions, which parsed-only ASTs don't mark as such.
+    | {f"{prefix}{bits}" for prefix in ("uint", "int") for bits in range(8, 257, 8)}
+    | {f"bytes{size}" for size in range(1, 33)}
+)
+
+
+def _callee_name(expression: ast_models.Expression) -> Optional[str]:
+    # Calls through this and super name a function of the contract. Other
+    # member calls (token.transfer, abi.encode, items.push) call into
+    # another type, so there is nothing to restore here.
+    if expression.node_type == NodeType.MEMBER_ACCESS:
+        base = expression.expression
+        if base.node_type == NodeType.IDENTIFIER and base.name in ("this", "super"):
+            return expression.member_name
+        return None
+    try:
+        name = extract_expression_name(expression)
+    except ValueError:
+        # `new C(...)`, `f{value: v}(...)` and the like name no function.
+        return None
+    return name if isinstance(name, str) else None
+
+
+class _FunctionCallCollector(NodeVisitor):
+    # Declared names and calls per contract, keyed by id(contract). File-level
+    # code is kept under None.
+    def __init__(self):
+        self.contract: Optional[ast_models.ContractDefinition] = None
+        self.contracts: List[ast_models.ContractDefinition] = []
+        self.declarations: Dict[Optional[int], Set[str]] = {None: set()}
+        # callee name -> call sites, in visit order
+        self.calls: Dict[Optional[int], Dict[str, List[FunctionCall]]] = {None: {}}
+
+    def _key(self) -> Optional[int]:
+        return id(self.contract) if self.contract is not None else None
+
+    def visit_ContractDefinition(self, node: ast_models.ContractDefinition):
+        # Contract names are visible everywhere, e.g. for `IToken(token)`.
+        self.declarations[None].add(node.name)
+        self.contracts.append(node)
+        self.declarations[id(node)] = set()
+        self.calls[id(node)] = {}
+        outer, self.contract = self.contract, node
+        self.generic_visit(node)
+        self.contract = outer
+
+    def _declare(self, node: ast_models.ASTNode):
+        self.declarations[self._key()].add(node.name)
+        self.generic_visit(node)
+
+    visit_FunctionDefinition = _declare
+    visit_VariableDeclaration = _declare
+    visit_EventDefinition = _declare
+    visit_ErrorDefinition = _declare
+    visit_StructDefinition = _declare
+
+    def visit_FunctionCall(self, node: FunctionCall):
+        if node.kind != "typeConversion":
+            function_name = _callee_name(node.expression)
+            if function_name is not None and function_name not in BUILTIN_FUNCTIONS:
+                self.calls[self._key()].setdefault(function_name, []).append(node)
+        self.generic_visit(node)
+
+
+def _argument_name(argument: ast_models.Expression, position: int) -> str:
+    try:
+        name = extract_expression_name(argument)
+    except ValueError:
+        name = None
+    return name if isinstance(name, str) else f"param{position}"
+
+
+def restore_function_definitions(
+    ast: SourceUnit,
+) -> List[ast_models.FunctionDefinition]:
+    def restore_function_arguments(calls: List[FunctionCall]):
+        # Each position is typed by the first call site that can type it.
+        arguments: Dict[int, Tuple[str, str]] = {}
+        for call in calls:
+            for position, argument in enumerate(call.arguments):
+                if position in arguments:
+                    continue
+                try:
+                    type_name = inference.infer(argument)
+                except ValueError:
+                    continue
+                if type_name:
+                    name = _argument_name(argument, position)
+                    arguments[position] = (name, type_name)
+        return [
+            create_storage_declaration(
+                storage_name=name,
+                storage_type=create_elementary_type(type_name, ids=ids),
+                ids=ids,
+            )
+            for _, (name, type_name) in sorted(arguments.items())
+        ]
+
+    collector = _FunctionCallCollector()
+    collector.visit(ast)
+    ids = id_allocator(ast)
+    inference = type_inference(ast)
+    by_name = {contract.name: contract for contract in collector.contracts}
+    file_names = collector.declarations[None]
+
+    # A call is missing its function if neither the calling contract, one of
+    # its bases nor the file level declares the name. Each stub's scope is
+    # the id of the contract (or source unit) it belongs in.
+    units = [
+        (id(contract), contract.id, [contract, *_base_contracts(contract, by_name)])
+        for contract in collector.contracts
     ]
+    units.append((None, ast.id, []))
+
     restored_functions = []
-    for function_call in function_calls:
-        function_names = [f.name for f in function_definitions]
-        function_name = extract_expression_name(function_call.expression)
-        if (
-            function_name not in function_names
-            and function_name not in builtin_functions
-            and function_call.kind != "typeConversion"
-            and function_name not in storages
-            and function_name not in event_defintions
-        ):
-            function_arguments = restore_function_arguments(function_call)
+    for key, scope, contracts in units:
+        declared = file_names.union(
+            *(collector.declarations[id(contract)] for contract in contracts)
+        )
+        for function_name, calls in collector.calls[key].items():
+            if function_name in declared:
+                continue
+            function_arguments = restore_function_arguments(calls)
             restored_functions.append(
                 ast_models.FunctionDefinition(
                     name=function_name,
@@ -562,22 +1030,23 @@ def restore_function_definitions(
                     parameters=ParameterList(
                         parameters=function_arguments,
                         nodeType=NodeType.PARAMETER_LIST,
-                        id=random.randint(0, 100000),
+                        id=ids.allocate(),
                         src="",
                     ),
                     returnParameters=ParameterList(
                         parameters=[],
                         nodeType=NodeType.PARAMETER_LIST,
-                        id=random.randint(0, 100000),
+                        id=ids.allocate(),
                         src="",
                     ),
                     implemented=True,
                     visibility="internal",
                     stateMutability="nonpayable",
                     nodeType=NodeType.FUNCTION_DEFINITION,
-                    id=random.randint(0, 100000),
+                    id=ids.allocate(),
                     src="",
                     kind="function",
+                    scope=scope,
                 )
             )
     return restored_functions
@@ -0,0 +1,111 @@
+import hashlib
+from typing import Any, Dict, Iterable, List
+
+from pydantic import BaseModel
+
+from solc_ast_parser.models import ast_models
+from solc_ast_parser.models.base_ast_models import NodeType, YulNodeType, node_cache
+
+# Source locations, node ids and the analysis annotations that embed them
+# differ between two compilations of the same code, so they are not part of
+# the structure.
+IGNORED_FIELDS = frozenset(
+    {
+        "id",
+        "src",
+        "native_src",
+        "name_location",
+        "name_locations",
+        "key_name_location",
+        "value_name_location",
+        "member_location",
+        "referenced_declaration",
+        "overloaded_declarations",
+        "scope",
+        "contract_dependencies",
+        "linearized_base_contracts",
+        "internal_function_ids",
+        "used_events",
+        "used_errors",
+        "base_functions",
+        "base_modifiers",
+        "function_return_parameters",
+        "assignments",
+        "function",
+        "exported_symbols",
+        "external_references",
+        "type_descriptions",
+        "argument_types",
+        "common_type",
+    }
+)
+
+NAME_FIELDS = frozenset({"name"})
+
+# The `name` of these nodes is a type or a builtin, not an identifier.
+KEEP_NAME_NODE_TYPES = frozenset(
+    {
+        NodeType.ELEMENTARY_TYPE_NAME,
+        YulNodeType.YUL_BUILTIN_NAME,
+        YulNodeType.YUL_LITERAL,
+    }
+)
+
+
+def subtree_hash(node: ast_models.ASTNode, ignore_names: bool = False) -> str:
+    cache = node_cache(node)
+    key = ("subtree_hash", ignore_names)
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    digest = hashlib.blake2b(type(node).__name__.encode(), digest_size=16)
+    skip_names = (
+        ignore_names and getattr(node, "node_type", None) not in KEEP_NAME_NODE_TYPES
+    )
+    for field_name, value in node.__dict__.items():
+        if field_name in IGNORED_FIELDS or (skip_names and field_name in NAME_FIELDS):
+            continue
+        digest.update(b"\x00" + field_name.encode() + b"=")
+        _update_digest(digest, value, ignore_names)
+
+    result = digest.hexdigest()
+    if cache is not None:
+        cache[key] = result
+    return result
+
+
+def _update_digest(digest: Any, value: Any, ignore_names: bool) -> None:
+    if isinstance(value, BaseModel):
+        digest.update(b"<" + subtree_hash(value, ignore_names).encode() + b">")
+    elif isinstance(value, list):
+        digest.update(b"[")
+        for item in value:
+            _update_digest(digest, item, ignore_names)
+            digest.update(b",")
+        digest.update(b"]")
+    elif isinstance(value, dict):
+        digest.update(b"{")
+        for item_key in sorted(value, key=repr):
+            digest.update(repr(item_key).encode() + b":")
+            _update_digest(digest, value[item_key], ignore_names)
+            digest.update(b",")
+        digest.update(b"}")
+    else:
+        digest.update(repr(value).encode())
+
+
+def structurally_equal(
+    first: ast_models.ASTNode, second: ast_models.ASTNode, ignore_names: bool = False
+) -> bool:
+    return subtree_hash(first, ignore_names) == subtree_hash(second, ignore_names)
+
+
+def unique_nodes(
+    nodes: Iterable[ast_models.ASTNode], ignore_names: bool = False
+) -> List[ast_models.ASTNode]:
+    seen: Dict[str, ast_models.ASTNode] = {}
+    for node in nodes:
+        seen.setdefault(subtree_hash(node, ignore_names), node)
+    return list(seen.values())
@@ -0,0 +1,131 @@
+import threading
+from typing import Any, Dict, Optional
+
+from solc_ast_parser.models import ast_models
+from solc_ast_parser.models.base_ast_models import IdAllocator
+from solc_ast_parser.utils import invalidate_node_cache, traverse_ast
+
+# Ids handed out to nodes built without an AST at hand. They start far above
+# anything solc assigns to a single compilation.
+DETACHED_ID_START = 1 << 30
+
+
+class SharedIdAllocator(IdAllocator):
+    # For allocators used by every thread of the process. Per-AST allocators
+    # are left unlocked, they are only safe with one writer per AST anyway.
+    def __init__(self, next_id: Optional[int] = None):
+        super().__init__(next_id)
+        self._lock = threading.Lock()
+
+    def allocate(self) -> int:
+        with self._lock:
+            return super().allocate()
+
+    def reserve(self, node_id: int) -> None:
+        with self._lock:
+            super().reserve(node_id)
+
+
+detached_ids = SharedIdAllocator(DETACHED_ID_START)
+
+# Fields holding ids of other nodes, remapped by renumber_ids().
+ID_REFERENCE_FIELDS = frozenset(
+    {
+        "referenced_declaration",
+        "overloaded_declarations",
+        "scope",
+        "contract_dependencies",
+        "linearized_base_contracts",
+        "used_events",
+        "used_errors",
+        "base_functions",
+        "base_modifiers",
+        "function_return_parameters",
+        "assignments",
+        "function",
+        "exported_symbols",
+        "external_references",
+    }
+)
+
+
+def max_node_id(ast: ast_models.ASTNode) -> Optional[int]:
+    result = None
+
+    def visit(node: ast_models.ASTNode, parent: Any) -> None:
+        nonlocal result
+        node_id = getattr(node, "id", None)
+        if isinstance(node_id, int) and node_id >= 0:
+            result = node_id if result is None else max(result, node_id)
+
+    traverse_ast(ast, visit)
+    return result
+
+
+def id_allocator(ast: ast_models.ASTNode) -> IdAllocator:
+    allocator = getattr(ast, "_id_allocator", None)
+    if allocator is None:
+        # Only SourceUnit keeps its allocator, other roots get a fresh one.
+        allocator = IdAllocator()
+    if not allocator.seeded:
+        highest = max_node_id(ast)
+        allocator.reserve(-1 if highest is None else highest)
+    return allocator
+
+
+def new_id(allocator: Optional[IdAllocator] = None) -> int:
+    return (allocator or detached_ids).allocate()
+
+
+def renumber_ids(ast: ast_models.ASTNode, start: int = 0) -> Dict[int, int]:
+    # Yul synthetic ids are negative and derived from src, so they are kept.
+    mapping: Dict[int, int] = {}
+    next_id = start
+
+    def assign(node: ast_models.ASTNode, parent: Any) -> None:
+        nonlocal next_id
+        # Cached renders with source maps (and other id keyed data) are
+        # stale once the ids below them change.
+        invalidate_node_cache(node)
+        node_id = getattr(node, "id", None)
+        if not isinstance(node_id, int) or node_id < 0:
+            return
+        mapping.setdefault(node_id, next_id)
+        node.id = next_id
+        next_id += 1
+
+    def remap(node: ast_models.ASTNode, parent: Any) -> None:
+        for field_name in ID_REFERENCE_FIELDS:
+            value = node.__dict__.get(field_name)
+            if value is not None:
+                setattr(node, field_name, _remap_ids(field_name, value, mapping))
+
+    traverse_ast(ast, assign)
+    traverse_ast(ast, remap)
+
+    allocator = getattr(ast, "_id_allocator", None)
+    if allocator is not None:
+        allocator.next_id = next_id
+    return mapping
+
+
+def _remap_ids(field_name: str, value: Any, mapping: Dict[int, int]) -> Any:
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, int):
+        return mapping.get(value, value)
+    if isinstance(value, list):
+        return [_remap_ids(field_name, item, mapping) for item in value]
+    if isinstance(value, dict):
+        if field_name == "external_references":
+            return {
+                key: _remap_ids(field_name, item, mapping) if key == "declaration" else item
+                for key, item in value.items()
+            }
+        if field_name == "exported_symbols":
+            return {
+                key: _remap_ids(field_name, item, mapping) for key, item in value.items()
+            }
+    # Anything else (IdentifierPath in UsingForDirective.function, ...) is
+    # either a node, visited on its own, or not an id.
+    return value
@@ -1,13 +1,14 @@
-import re
 import typing
 from typing import Dict, List, Optional, Union
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
+from solc_ast_parser.emitter import SolidityEmitter, render
 from solc_ast_parser.models.yul_models import YulBlock
 from .base_ast_models import (
     ExpressionBase,
     Comment,
+    IdAllocator,
     MultilineComment,
     Node,
     NodeBase,
@@ -137,29 +138,62 @@ class SourceUnit(NodeBase):
     )
     absolute_path: Optional[str] = Field(default=None, alias="absolutePath")
     node_type: typing.Literal[NodeType.SOURCE_UNIT] = Field(alias="nodeType")
+    _id_allocator: IdAllocator = PrivateAttr(default_factory=IdAllocator)
+
+    # A copy goes on from the same next id without allocating into ours.
+    def __copy__(self):
+        copy = super().__copy__()
+        copy._id_allocator = IdAllocator(self._id_allocator.next_id)
+        return copy
 
     def to_solidity(
         self, spaces_count: int = 0, config: Optional[SolidityConfig] = None
+    ):
+        return render(self, spaces_count=spaces_count, config=config)
+
+    def _emit_solidity(
+        self,
+        emitter: SolidityEmitter,
+        spaces_count: int = 0,
+        config: Optional[SolidityConfig] = None,
     ):
         if config is None:
             config = SolidityConfig()
-        result = super().to_solidity(spaces_count=spaces_count, config=config)
+        self._emit_opening(emitter, spaces_count=spaces_count, config=config)
         for i, node in enumerate(self.nodes):
-            if hasattr(node, "to_solidity"):
-                if "config" in node.to_solidity.__code__.co_varnames:
-                    result += node.to_solidity(spaces_count, config=config)
-                else:
-                    result += node.to_solidity(spaces_count=spaces_count, config=config)
-            else:
-                result += str(node)
+            self._emit_member(
+                emitter,
+                node,
+                spaces_count=spaces_count,
+                config=config,
+                last=i == len(self.nodes) - 1,
+            )
 
-            if (
-                node.node_type == NodeType.VARIABLE_DECLARATION
-                and i < len(self.nodes) - 1
-            ):
-                result += ";\n"
+    def _emit_opening(
+        self,
+        emitter: SolidityEmitter,
+        spaces_count: int = 0,
+        config: Optional[SolidityConfig] = None,
+    ):
+        emitter.write(super().to_solidity(spaces_count=spaces_count, config=config))
+
+    # Members render without the container, so they can be rendered apart
+    # from it (see solc_ast_parser.parallel).
+    @staticmethod
+    def _emit_member(
+        emitter: SolidityEmitter,
+        node: ASTNode,
+        spaces_count: int = 0,
+        config: Optional[SolidityConfig] = None,
+        last: bool = False,
+    ):
+        if hasattr(node, "emit_solidity"):
+            node.emit_solidity(emitter, spaces_count=spaces_count, config=config)
+        else:
+            emitter.write(str(node))
 
-        return result
+        if node.node_type == NodeType.VARIABLE_DECLARATION and not last:
+            emitter.write(";\n")
 
 
 class PragmaDirective(NodeBase):
@@ -218,25 +252,53 @@ class ContractDefinition(NodeBase):
     node_type: typing.Literal[NodeType.CONTRACT_DEFINITION] = Field(alias="nodeType")
 
     def to_solidity(self, spaces_count=0, config: SolidityConfig | None = None):
+        return render(self, spaces_count=spaces_count, config=config)
+
+    def _emit_solidity(
+        self,
+        emitter: SolidityEmitter,
+        spaces_count=0,
+        config: SolidityConfig | None = None,
+    ):
+        self._emit_opening(emitter, spaces_count=spaces_count, config=config)
+        for contract_node in self.nodes:
+            self._emit_member(emitter, contract_node, spaces_count=4, config=config)
+        self._emit_closing(emitter)
+
+    def _emit_opening(
+        self,
+        emitter: SolidityEmitter,
+        spaces_count=0,
+        config: SolidityConfig | None = None,
+    ):
         base_contracts = ""
         if len(self.base_contracts):
             base_contracts = [
                 base.to_solidity(config=config) for base in self.base_contracts
             ]
             base_contracts = f" is {', '.join(base_contracts)}"
-        code = (
+        emitter.write(
             super().to_solidity(spaces_count=spaces_count, config=config)
             + f"{self.contract_kind} {self.name}{base_contracts} {{{f' // {self.comment.text}' if self.comment else ''}\n"
         )
-        spaces_count = 4
-        for contract_node in self.nodes:
-            if contract_node.node_type == NodeType.VARIABLE_DECLARATION:
-                code += f"{contract_node.to_solidity(spaces_count=spaces_count, config=config)};{f' // {contract_node.comment.text}' if contract_node.comment else ''}\n"
-                continue
-            code += contract_node.to_solidity(spaces_count=spaces_count, config=config)
-        code += "}\n\n"
 
-        return code
+    def _emit_closing(self, emitter: SolidityEmitter):
+        emitter.write("}\n\n")
+
+    @staticmethod
+    def _emit_member(
+        emitter: SolidityEmitter,
+        contract_node: ASTNode,
+        spaces_count=4,
+        config: SolidityConfig | None = None,
+    ):
+        if contract_node.node_type == NodeType.VARIABLE_DECLARATION:
+            contract_node.emit_solidity(emitter, spaces_count=spaces_count, config=config)
+            emitter.write(
+                f";{f' // {contract_node.comment.text}' if contract_node.comment else ''}\n"
+            )
+            return
+        contract_node.emit_solidity(emitter, spaces_count=spaces_count, config=config)
 
 
 class IdentifierPath(NodeBase):
@@ -457,17 +519,29 @@ class FunctionDefinition(NodeBase):
     node_type: typing.Literal[NodeType.FUNCTION_DEFINITION] = Field(alias="nodeType")
 
     def to_solidity(self, spaces_count=0, config: SolidityConfig | None = None):
-        result = super().to_solidity(
-            spaces_count=spaces_count, config=config
-        ) + build_function_header(self, spaces_count, config)
+        return render(self, spaces_count=spaces_count, config=config)
+
+    def _emit_solidity(
+        self,
+        emitter: SolidityEmitter,
+        spaces_count=0,
+        config: SolidityConfig | None = None,
+    ):
+        emitter.write(
+            super().to_solidity(spaces_count=spaces_count, config=config)
+            + build_function_header(self, spaces_count, config)
+        )
         if not self.body:
-            return result + ";\n\n"
-        body = self.body.to_solidity(spaces_count + 4, config=config)
-        if body:
-            result += f" {{\n{body}{' ' * spaces_count}}}\n\n"
-        else:
-            result += " {}\n\n"
-        return result
+            emitter.write(";\n\n")
+            return
+        # A block renders to nothing only without documentation and statements.
+        if not self.body.documentation and not self.body.statements:
+            emitter.write(" {}\n\n")
+            return
+        emitter.write(" {\n")
+        self.body.emit_solidity(emitter, spaces_count + 4, config=config)
+        emitter.indent(spaces_count)
+        emitter.write("}\n\n")
 
 
 class VariableDeclaration(TypeBase):
@@ -522,15 +596,21 @@ class ModifierDefinition(NodeBase):
     node_type: typing.Literal[NodeType.MODIFIER_DEFINITION] = Field(alias="nodeType")
 
     def to_solidity(self, spaces_count=0, config: SolidityConfig | None = None):
-        result = (
+        return render(self, spaces_count=spaces_count, config=config)
+
+    def _emit_solidity(
+        self,
+        emitter: SolidityEmitter,
+        spaces_count=0,
+        config: SolidityConfig | None = None,
+    ):
+        emitter.write(
             super().to_solidity(spaces_count=spaces_count, config=config)
             + f"{' ' * spaces_count}modifier {self.name}({self.parameters.to_solidity(config=config)}) {{\n"
         )
-        spaces_count += 4
-        result += self.body.to_solidity(spaces_count=spaces_count, config=config)
-        spaces_count -= 4
-        result += f"{' ' * spaces_count}}}\n"
-        return result
+        self.body.emit_solidity(emitter, spaces_count=spaces_count + 4, config=config)
+        emitter.indent(spaces_count)
+        emitter.write("}\n")
 
 
 class ModifierInvocation(NodeBase):
@@ -667,10 +747,19 @@ class InlineAssembly(NodeBase):
     node_type: typing.Literal[NodeType.INLINE_ASSEMBLY] = Field(alias="nodeType")
 
     def to_solidity(self, spaces_count=0, config: SolidityConfig | None = None):
-        return (
+        return render(self, spaces_count=spaces_count, config=config)
+
+    def _emit_solidity(
+        self,
+        emitter: SolidityEmitter,
+        spaces_count=0,
+        config: SolidityConfig | None = None,
+    ):
+        emitter.write(
             super().to_solidity(spaces_count=spaces_count, config=config)
-            + f"{' ' * spaces_count}assembly {self.AST.to_solidity(spaces_count=spaces_count, config=config)}"
+            + f"{' ' * spaces_count}assembly "
         )
+        self.AST.emit_solidity(emitter, spaces_count=spaces_count, config=config)
 
 
 class Block(NodeBase):
@@ -680,27 +769,40 @@ class Block(NodeBase):
     )
 
     def to_solidity(self, spaces_count=0, config: SolidityConfig | None = None):
-        result = super().to_solidity(spaces_count=spaces_count, config=config)
-        for statement in self.statements:
-            if not statement.node_type in (
-                NodeType.COMMENT,
-                NodeType.MULTILINE_COMMENT,
-            ):
-                st = statement.to_solidity(spaces_count=spaces_count, config=config)
-                if (
-                    statement.node_type != NodeType.INLINE_ASSEMBLY
-                    and not st.endswith(";\n")
-                    and not st.endswith("}\n")
-                    and not re.search(r"\/\/ .+", st)
-                ):
-                    st += f";{f' // {statement.comment.text}' if statement.comment else ''}\n"
-                result += st
+        return render(self, spaces_count=spaces_count, config=config)
 
-            else:
-                result += statement.to_solidity(
-                    spaces_count=spaces_count, config=config
-                )
-        return result
+    def _emit_solidity(
+        self,
+        emitter: SolidityEmitter,
+        spaces_count=0,
+        config: SolidityConfig | None = None,
+    ):
+        emitter.write(super().to_solidity(spaces_count=spaces_count, config=config))
+        for statement in self.statements:
+            self._emit_member(emitter, statement, spaces_count=spaces_count, config=config)
+
+    def _emit_member(
+        self,
+        emitter: SolidityEmitter,
+        statement: Statement,
+        spaces_count=0,
+        config: SolidityConfig | None = None,
+    ):
+        if statement.node_type in (NodeType.COMMENT, NodeType.MULTILINE_COMMENT):
+            statement.emit_solidity(emitter, spaces_count=spaces_count, config=config)
+            return
+
+        start = emitter.position
+        statement.emit_solidity(emitter, spaces_count=spaces_count, config=config)
+        if (
+            statement.node_type != NodeType.INLINE_ASSEMBLY
+            and not emitter.ends_with(";\n", since=start)
+            and not emitter.ends_with("}\n", since=start)
+            and not emitter.has_line_comment(since=start)
+        ):
+            emitter.write(
+                f";{f' // {statement.comment.text}' if statement.comment else ''}\n"
+            )
 
 
 class PlaceholderStatement(NodeBase):
@@ -720,27 +822,34 @@ class IfStatement(NodeBase):
     node_type: typing.Literal[NodeType.IF_STATEMENT] = Field(alias="nodeType")
 
     def to_solidity(self, spaces_count=0, config: SolidityConfig | None = None):
-        result = (
+        return render(self, spaces_count=spaces_count, config=config)
+
+    def _emit_solidity(
+        self,
+        emitter: SolidityEmitter,
+        spaces_count=0,
+        config: SolidityConfig | None = None,
+    ):
+        emitter.write(
             super().to_solidity(spaces_count=spaces_count, config=config)
             + f"{' ' * spaces_count}if ({self.condition.to_solidity(config=config)}) {{\n"
         )
-        spaces_count += 4
-        result += self.true_body.to_solidity(spaces_count=spaces_count, config=config)
-        spaces_count -= 4
+        self.true_body.emit_solidity(
+            emitter, spaces_count=spaces_count + 4, config=config
+        )
 
         if self.false_body:
-            result += f"{' ' * spaces_count}}} else {{\n"
-            spaces_count += 4
-            result += self.false_body.to_solidity(
-                spaces_count=spaces_count, config=config
+            emitter.indent(spaces_count)
+            emitter.write("} else {\n")
+            self.false_body.emit_solidity(
+                emitter, spaces_count=spaces_count + 4, config=config
             )
-            spaces_count -= 4
 
-        if not result.endswith(";\n") and not result.endswith("}\n"):
-            result += f";\n"
+        if not emitter.ends_with(";\n") and not emitter.ends_with("}\n"):
+            emitter.write(";\n")
 
-        result += f"{' ' * spaces_count}}}\n"
-        return result
+        emitter.indent(spaces_count)
+        emitter.write("}\n")
 
 
 class TryCatchClause(NodeBase):
@@ -750,18 +859,24 @@ class TryCatchClause(NodeBase):
     node_type: typing.Literal[NodeType.TRY_CATCH_CLAUSE] = Field(alias="nodeType")
 
     def to_solidity(self, spaces_count=0, config: SolidityConfig | None = None):
-        result = (
+        return render(self, spaces_count=spaces_count, config=config)
+
+    def _emit_solidity(
+        self,
+        emitter: SolidityEmitter,
+        spaces_count=0,
+        config: SolidityConfig | None = None,
+    ):
+        emitter.write(
             super().to_solidity(spaces_count=spaces_count, config=config)
             + f"{' ' * spaces_count}catch "
         )
         if self.parameters:
-            result += f"({self.parameters.to_solidity(config=config)}) "
-        result += "{\n"
-        spaces_count += 4
-        result += self.block.to_solidity(spaces_count=spaces_count, config=config)
-        spaces_count -= 4
-        result += f"{' ' * spaces_count}}}\n"
-        return result
+            emitter.write(f"({self.parameters.to_solidity(config=config)}) ")
+        emitter.write("{\n")
+        self.block.emit_solidity(emitter, spaces_count=spaces_count + 4, config=config)
+        emitter.indent(spaces_count)
+        emitter.write("}\n")
 
 
 class TryStatement(NodeBase):
@@ -770,28 +885,37 @@ class TryStatement(NodeBase):
     node_type: typing.Literal[NodeType.TRY_STATEMENT] = Field(alias="nodeType")
 
     def to_solidity(self, spaces_count=0, config: SolidityConfig | None = None):
-        result = (
+        return render(self, spaces_count=spaces_count, config=config)
+
+    def _emit_solidity(
+        self,
+        emitter: SolidityEmitter,
+        spaces_count=0,
+        config: SolidityConfig | None = None,
+    ):
+        emitter.write(
             super().to_solidity(spaces_count=spaces_count, config=config)
             + f"{' ' * spaces_count}try "
         )
         if self.external_call:
-            result += self.external_call.to_solidity(config=config)
+            emitter.write(self.external_call.to_solidity(config=config))
         if self.clauses:
-            result += (
+            emitter.write(
                 f" returns ({self.clauses[0].parameters.to_solidity(config=config)})"
                 if self.clauses[0].parameters
                 else ""
             )
-            result += " {\n"
+            emitter.write(" {\n")
 
-            result += self.clauses[0].block.to_solidity(spaces_count + 4, config=config)
+            self.clauses[0].block.emit_solidity(
+                emitter, spaces_count + 4, config=config
+            )
 
-            result += f"{' ' * spaces_count}}}"
+            emitter.indent(spaces_count)
+            emitter.write("}")
 
         for clause in self.clauses[1:]:
-            result += clause.to_solidity(spaces_count=spaces_count, config=config)
-
-        return result
+            clause.emit_solidity(emitter, spaces_count=spaces_count, config=config)
 
 
 class WhileStatement(NodeBase):  # DoWhileStatement
@@ -800,15 +924,21 @@ class WhileStatement(NodeBase):  # DoWhileStatement
     node_type: typing.Literal[NodeType.WHILE_STATEMENT] = Field(alias="nodeType")
 
     def to_solidity(self, spaces_count=0, config: SolidityConfig | None = None):
-        result = (
+        return render(self, spaces_count=spaces_count, config=config)
+
+    def _emit_solidity(
+        self,
+        emitter: SolidityEmitter,
+        spaces_count=0,
+        config: SolidityConfig | None = None,
+    ):
+        emitter.write(
             super().to_solidity(spaces_count=spaces_count, config=config)
             + f"{' ' * spaces_count}while ({self.condition.to_solidity(config=config)}) {{\n"
         )
-        spaces_count += 4
-        result += self.body.to_solidity(spaces_count=spaces_count, config=config)
-        spaces_count -= 4
-        result += f"{' ' * spaces_count}}}\n"
-        return result
+        self.body.emit_solidity(emitter, spaces_count=spaces_count + 4, config=config)
+        emitter.indent(spaces_count)
+        emitter.write("}\n")
 
 
 class ForStatement(NodeBase):
@@ -826,24 +956,30 @@ class ForStatement(NodeBase):
     node_type: typing.Literal[NodeType.FOR_STATEMENT] = Field(alias="nodeType")
 
     def to_solidity(self, spaces_count=0, config: SolidityConfig | None = None):
-        result = (
+        return render(self, spaces_count=spaces_count, config=config)
+
+    def _emit_solidity(
+        self,
+        emitter: SolidityEmitter,
+        spaces_count=0,
+        config: SolidityConfig | None = None,
+    ):
+        header = (
             super().to_solidity(spaces_count=spaces_count, config=config)
             + f"{' ' * spaces_count}for ("
         )
         if self.intialization_expression:
-            result += f"{self.intialization_expression.to_solidity(config=config)}; "
+            header += f"{self.intialization_expression.to_solidity(config=config)}; "
         if self.condition:
-            result += f"{self.condition.to_solidity(config=config)}; "
+            header += f"{self.condition.to_solidity(config=config)}; "
         if self.loop_expression:
-            result += f"{self.loop_expression.to_solidity(config=config)}"
-        result += f") {{\n"
-        spaces_count += 4
-        result += self.body.to_solidity(spaces_count=spaces_count, config=config)
-        if not result.endswith(";\n") and not result.endswith("}\n"):
-            result += f";\n"
-        spaces_count -= 4
-        result += f"{' ' * spaces_count}}}\n"
-        return result
+            header += f"{self.loop_expression.to_solidity(config=config)}"
+        emitter.write(header + ") {\n")
+        self.body.emit_solidity(emitter, spaces_count=spaces_count + 4, config=config)
+        if not emitter.ends_with(";\n") and not emitter.ends_with("}\n"):
+            emitter.write(";\n")
+        emitter.indent(spaces_count)
+        emitter.write("}\n")
 
 
 class Continue(NodeBase):
@@ -1,7 +1,9 @@
 from abc import ABC
 import enum
-from typing import List, Optional, Union
-from pydantic import BaseModel, ConfigDict, Field
+from typing import List, Optional, TextIO, Union
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, model_validator
+
+from solc_ast_parser.emitter import SolidityEmitter
 
 
 class QuotePreference(enum.StrEnum):
@@ -11,6 +13,9 @@ class QuotePreference(enum.StrEnum):
 
 class SolidityConfig(BaseModel):
     quote_preference: QuotePreference = QuotePreference.DOUBLE
+    # Keep each subtree's output in its node cache. Edits must go through the
+    # editing helpers (or invalidate_node_cache) to be picked up.
+    render_cache: bool = False
 
 
 class NodeType(enum.StrEnum):
@@ -95,12 +100,140 @@ class YulNodeType(enum.StrEnum):
     YUL_TYPED_NAME = "YulTypedName"
 
 
+# New Yul node types must be appended to YulNodeType, otherwise the synthetic
+# ids of already serialized Yul nodes change.
+YUL_NODE_TYPE_INDEX = {node_type: i for i, node_type in enumerate(YulNodeType)}
+
+
+def yul_node_id(src: str, node_type: YulNodeType) -> Optional[int]:
+    try:
+        start, length, file_index = (int(part) for part in src.split(":"))
+    except ValueError:
+        return None
+    if start < 0 or length < 0 or file_index < 0:
+        return None
+    key = (((start << 32) | length) << 16 | file_index) << 5
+    # Negative, so it never collides with the ids assigned by solc.
+    return -(key + YUL_NODE_TYPE_INDEX[node_type] + 1)
+
+
+class NodeCache(dict):
+    # Derived data (subtree hashes, rendered output) must never make two
+    # otherwise identical nodes compare unequal.
+    def __eq__(self, other):
+        return isinstance(other, NodeCache)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    __hash__ = None
+
+    # Pickled subtrees (e.g. sent to worker processes) start with an empty
+    # cache instead of carrying every rendering along.
+    def __reduce__(self):
+        return NodeCache, ()
+
+
+def node_cache(node) -> Optional[NodeCache]:
+    # Looked up on every cached hash and render, pydantic's __getattr__ for
+    # private attributes is far slower than reading them directly.
+    private = getattr(node, "__pydantic_private__", None)
+    return private.get("_cache") if private else None
+
+
+class IdAllocator:
+    def __init__(self, next_id: Optional[int] = None):
+        self.next_id = next_id
+
+    @property
+    def seeded(self) -> bool:
+        return self.next_id is not None
+
+    def allocate(self) -> int:
+        if self.next_id is None:
+            self.next_id = 0
+        node_id = self.next_id
+        self.next_id += 1
+        return node_id
+
+    def reserve(self, node_id: int) -> None:
+        if self.next_id is None or node_id >= self.next_id:
+            self.next_id = node_id + 1
+
+    # Held privately by SourceUnit, so like NodeCache it must not take part
+    # in model equality.
+    def __eq__(self, other):
+        return isinstance(other, IdAllocator)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    __hash__ = None
+
+
+class Node(ABC):
+    def to_solidity(self, spaces_count: int = 0) -> str:
+        raise NotImplementedError
+
+    def emit_solidity(self, emitter: SolidityEmitter, spaces_count: int = 0, **kwargs) -> None:
+        config = kwargs.get("config")
+        cache = None
+        if config is not None and config.render_cache:
+            cache = node_cache(self)
+        if cache is None:
+            if emitter.source_map is None:
+                self._emit_solidity(emitter, spaces_count=spaces_count, **kwargs)
+                return
+            entry = emitter.open_node(self)
+            self._emit_solidity(emitter, spaces_count=spaces_count, **kwargs)
+            emitter.close_node(entry)
+            return
+
+        # Entries recorded without a source map can't be replayed into one.
+        key = (
+            "solidity",
+            spaces_count,
+            emitter.config_key(config),
+            tuple(sorted((k, v) for k, v in kwargs.items() if k != "config")),
+            emitter.source_map is not None,
+        )
+        rendered = cache.get(key)
+        if rendered is None:
+            capture = emitter.start_capture()
+            entry = emitter.open_node(self)
+            self._emit_solidity(emitter, spaces_count=spaces_count, **kwargs)
+            emitter.close_node(entry)
+            cache[key] = emitter.end_capture(capture)
+        else:
+            emitter.replay(rendered)
+
+    # Nodes with children override this to stream them into the emitter,
+    # everything else writes its rendered string.
+    def _emit_solidity(self, emitter: SolidityEmitter, spaces_count: int = 0, **kwargs) -> None:
+        emitter.write(self.to_solidity(spaces_count=spaces_count, **kwargs))
+
+    def write_solidity(self, stream: TextIO, spaces_count: int = 0, **kwargs) -> None:
+        self.emit_solidity(SolidityEmitter(stream), spaces_count=spaces_count, **kwargs)
+
+
+class CachedModel(BaseModel):
+    _cache: NodeCache = PrivateAttr(default_factory=NodeCache)
+
+    # Shallow copies (model_copy, copy.copy) share private attributes with
+    # the original, so an edited copy would keep serving its hashes and
+    # renderings.
+    def __copy__(self):
+        copy = super().__copy__()
+        copy._cache = NodeCache()
+        return copy
+
+
 class TypeDescriptions(BaseModel):
     type_identifier: Optional[str] = Field(default=None, alias="typeIdentifier")
     type_string: Optional[str] = Field(default=None, alias="typeString")
 
 
-class Comment(BaseModel):
+class Comment(CachedModel, Node):
     id: int
     src: str
     node_type: NodeType = Field(alias="nodeType")
@@ -111,7 +244,7 @@ class Comment(BaseModel):
         return f"{' ' * spaces_count}// {self.text}\n"
 
 
-class MultilineComment(BaseModel):
+class MultilineComment(CachedModel, Node):
     id: int
     src: str
     node_type: NodeType = Field(alias="nodeType")
@@ -121,12 +254,9 @@ class MultilineComment(BaseModel):
         return f"{' ' * spaces_count}{self.text}\n"
 
 
-class Node(ABC):
-    def to_solidity(self, spaces_count: int = 0) -> str:
-        raise NotImplementedError
 
 
-class NodeBase(BaseModel, Node):
+class NodeBase(CachedModel, Node):
     model_config = ConfigDict(extra="forbid")
 
     id: int
@@ -143,13 +273,20 @@ class NodeBase(BaseModel, Node):
         )
 
 
-class YulBase(BaseModel):
+class YulBase(CachedModel, Node):
     model_config = ConfigDict(extra="forbid")
 
     src: str
     node_type: YulNodeType = Field(alias="nodeType")
     native_src: str = Field(alias="nativeSrc")
     documentation: Optional[str] = Field(default=None)
+    id: Optional[int] = Field(default=None)
+
+    @model_validator(mode="after")
+    def assign_synthetic_id(self):
+        if self.id is None:
+            self.id = yul_node_id(self.src, self.node_type)
+        return self
 
     def to_solidity(self, spaces_count=0, new_line: bool = False, config: SolidityConfig | None = None):
         return (
@@ -2,6 +2,7 @@ from typing import List, Optional, Union
 import typing
 
 from pydantic import Field
+from solc_ast_parser.emitter import SolidityEmitter, render
 from solc_ast_parser.models.base_ast_models import SolidityConfig, YulBase, YulNodeType
 
 YulExpression = Union[
@@ -30,21 +31,38 @@ class YulBlock(YulBase):
     node_type: typing.Literal[YulNodeType.YUL_BLOCK] = Field(alias="nodeType")
 
     def to_solidity(self, spaces_count=0, new_line: bool = False, config: SolidityConfig | None = None):
+        return render(self, spaces_count=spaces_count, new_line=new_line, config=config)
+
+    def _emit_solidity(
+        self,
+        emitter: SolidityEmitter,
+        spaces_count=0,
+        new_line: bool = False,
+        config: SolidityConfig | None = None,
+    ):
         if (
             len(self.statements) == 1
             and not new_line
             and self.statements[0].node_type
             not in [YulNodeType.YUL_BLOCK, YulNodeType.YUL_SWITCH]
         ):
-            return f"{{ {self.statements[0].to_solidity()} }}"
+            emitter.write(f"{{ {self.statements[0].to_solidity()} }}")
+            return
 
         if not self.statements:
-            return "{ }"
-
-        statements = "\n".join(
-            [statement.to_solidity(spaces_count=spaces_count + 4, config=config) for statement in self.statements]
-        )
-        return f"{{\n{statements}\n{' ' * spaces_count}}}"
+            emitter.write("{ }")
+            return
+
+        emitter.write("{\n")
+        for i, statement in enumerate(self.statements):
+            if i:
+                emitter.write("\n")
+            statement.emit_solidity(
+                emitter, spaces_count=spaces_count + 4, config=config
+            )
+        emitter.write("\n")
+        emitter.indent(spaces_count)
+        emitter.write("}")
 
 
 class YulTypedName(YulBase):
@@ -192,17 +210,27 @@ class YulFunctionDefinition(YulBase):
 
     def to_solidity(
         self, spaces_count=0, new_line=False, config: SolidityConfig | None = None
+    ):
+        return render(self, spaces_count=spaces_count, new_line=new_line, config=config)
+
+    def _emit_solidity(
+        self,
+        emitter: SolidityEmitter,
+        spaces_count=0,
+        new_line=False,
+        config: SolidityConfig | None = None,
     ):
         parameters = ", ".join([param.to_solidity() for param in self.parameters])
         return_variables = ", ".join(
             [return_variable.to_solidity() for return_variable in self.return_variables]
         )
-        return (
+        emitter.write(
             super().to_solidity(
                 spaces_count=spaces_count, new_line=new_line, config=config
             )
-            + f"{' ' * spaces_count}function {self.name}({parameters}) -> {return_variables} {self.body.to_solidity()}"
+            + f"{' ' * spaces_count}function {self.name}({parameters}) -> {return_variables} "
         )
+        self.body.emit_solidity(emitter)
 
 
 class YulIf(YulBase):
@@ -213,12 +241,22 @@ class YulIf(YulBase):
     def to_solidity(
         self, spaces_count=0, new_line=False, config: SolidityConfig | None = None
     ):
-        return (
+        return render(self, spaces_count=spaces_count, new_line=new_line, config=config)
+
+    def _emit_solidity(
+        self,
+        emitter: SolidityEmitter,
+        spaces_count=0,
+        new_line=False,
+        config: SolidityConfig | None = None,
+    ):
+        emitter.write(
             super().to_solidity(
                 spaces_count=spaces_count, new_line=new_line, config=config
             )
-            + f"{' ' * spaces_count}if {self.condition.to_solidity()} {self.body.to_solidity( spaces_count, True)}"
+            + f"{' ' * spaces_count}if {self.condition.to_solidity()} "
         )
+        self.body.emit_solidity(emitter, spaces_count, new_line=True)
 
 
 class YulCase(YulBase):
@@ -229,12 +267,22 @@ class YulCase(YulBase):
     def to_solidity(
         self, spaces_count=0, new_line=False, config: SolidityConfig | None = None
     ):
-        return (
+        return render(self, spaces_count=spaces_count, new_line=new_line, config=config)
+
+    def _emit_solidity(
+        self,
+        emitter: SolidityEmitter,
+        spaces_count=0,
+        new_line=False,
+        config: SolidityConfig | None = None,
+    ):
+        emitter.write(
             super().to_solidity(
                 spaces_count=spaces_count, new_line=new_line, config=config
             )
-            + f"{' ' * spaces_count}{f'case {self.value.to_solidity() if type(self.value) != str else self.value}' if self.value != 'default' else 'default'} {self.body.to_solidity(spaces_count, new_line=True)}"
+            + f"{' ' * spaces_count}{f'case {self.value.to_solidity() if type(self.value) != str else self.value}' if self.value != 'default' else 'default'} "
         )
+        self.body.emit_solidity(emitter, spaces_count, new_line=True)
 
 
 class YulSwitch(YulBase):
@@ -245,18 +293,25 @@ class YulSwitch(YulBase):
     def to_solidity(
         self, spaces_count=0, new_line=False, config: SolidityConfig | None = None
     ):
-        cases = "\n".join(
-            [
-                case.to_solidity(spaces_count=spaces_count, config=config)
-                for case in self.cases
-            ]
-        )
-        return (
+        return render(self, spaces_count=spaces_count, new_line=new_line, config=config)
+
+    def _emit_solidity(
+        self,
+        emitter: SolidityEmitter,
+        spaces_count=0,
+        new_line=False,
+        config: SolidityConfig | None = None,
+    ):
+        emitter.write(
             super().to_solidity(
                 spaces_count=spaces_count, new_line=new_line, config=config
             )
-            + f"{' ' * spaces_count}switch {self.expression.to_solidity()}\n{cases}"
+            + f"{' ' * spaces_count}switch {self.expression.to_solidity()}\n"
         )
+        for i, case in enumerate(self.cases):
+            if i:
+                emitter.write("\n")
+            case.emit_solidity(emitter, spaces_count=spaces_count, config=config)
 
 
 class YulForLoop(YulBase):
@@ -268,6 +323,15 @@ class YulForLoop(YulBase):
 
     def to_solidity(
         self, spaces_count=0, new_line=False, config: SolidityConfig | None = None
+    ):
+        return render(self, spaces_count=spaces_count, new_line=new_line, config=config)
+
+    def _emit_solidity(
+        self,
+        emitter: SolidityEmitter,
+        spaces_count=0,
+        new_line=False,
+        config: SolidityConfig | None = None,
     ):
         pre_arr = []
         for statement in self.pre.statements:
@@ -275,12 +339,13 @@ class YulForLoop(YulBase):
                 pre_arr.append(f"let {statement.to_solidity()}")
             else:
                 pre_arr.append(statement.to_solidity())
-        return (
+        emitter.write(
             super().to_solidity(
                 spaces_count=spaces_count, new_line=new_line, config=config
             )
-            + f"{' ' * spaces_count}for {{ {', '.join(pre_arr)} }} {self.condition.to_solidity()} {self.post.to_solidity()} {self.body.to_solidity(spaces_count, True)}"
+            + f"{' ' * spaces_count}for {{ {', '.join(pre_arr)} }} {self.condition.to_solidity()} {self.post.to_solidity()} "
         )
+        self.body.emit_solidity(emitter, spaces_count, new_line=True)
 
 
 class YulBreak(YulBase):
@@ -0,0 +1,164 @@
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from solc_ast_parser.models import ast_models
+from solc_ast_parser.models.base_ast_models import node_cache
+from solc_ast_parser.utils import traverse_ast
+
+_TAG_LINE = re.compile(r"@([A-Za-z][\w:-]*)\s*(.*)")
+
+# Tags whose first word names what they describe.
+NAMED_TAGS = frozenset({"param"})
+
+
+@dataclass
+class NatSpecTag:
+    tag: str
+    name: Optional[str]
+    text: str
+
+
+@dataclass
+class NatSpec:
+    tags: List[NatSpecTag] = field(default_factory=list)
+
+    def get(self, tag: str) -> List[NatSpecTag]:
+        return [item for item in self.tags if item.tag == tag]
+
+    def _text(self, tag: str) -> Optional[str]:
+        texts = [item.text for item in self.get(tag)]
+        return "\n".join(texts) if texts else None
+
+    @property
+    def title(self) -> Optional[str]:
+        return self._text("title")
+
+    @property
+    def author(self) -> Optional[str]:
+        return self._text("author")
+
+    @property
+    def notice(self) -> Optional[str]:
+        return self._text("notice")
+
+    @property
+    def dev(self) -> Optional[str]:
+        return self._text("dev")
+
+    @property
+    def inheritdoc(self) -> Optional[str]:
+        return self._text("inheritdoc")
+
+    @property
+    def params(self) -> Dict[str, str]:
+        return {item.name: item.text for item in self.get("param") if item.name}
+
+    @property
+    def returns(self) -> List[str]:
+        return [item.text for item in self.get("return")]
+
+    @property
+    def custom(self) -> Dict[str, str]:
+        return {
+            item.tag[len("custom:") :]: item.text
+            for item in self.tags
+            if item.tag.startswith("custom:")
+        }
+
+
+def _strip_markers(line: str) -> str:
+    line = line.strip()
+    if line.endswith("*/"):
+        line = line[:-2]
+    for prefix in ("/**", "///", "*"):
+        if line.startswith(prefix):
+            line = line[len(prefix) :]
+            break
+    return line.strip()
+
+
+def parse_natspec(text: str) -> NatSpec:
+    # Untagged text before the first tag is a @notice, as solc reads it.
+    # Lines without a tag continue the previous one.
+    tags: List[NatSpecTag] = []
+    current: Optional[NatSpecTag] = None
+    for line in text.splitlines():
+        line = _strip_markers(line)
+        match = _TAG_LINE.match(line)
+        if match:
+            tag, rest = match.groups()
+            name = None
+            if tag in NAMED_TAGS:
+                name, _, rest = rest.partition(" ")
+                name = name or None
+            current = NatSpecTag(tag, name, rest.strip())
+            tags.append(current)
+        elif line:
+            if current is None:
+                current = NatSpecTag("notice", None, line)
+                tags.append(current)
+            else:
+                current.text = f"{current.text}\n{line}" if current.text else line
+    return NatSpec(tags)
+
+
+def documentation_text(node: ast_models.ASTNode) -> Optional[str]:
+    documentation = getattr(node, "documentation", None)
+    if documentation is None or isinstance(documentation, str):
+        return documentation or None
+    return documentation.text or None
+
+
+def natspec(node: ast_models.ASTNode) -> Optional[NatSpec]:
+    # Parsed once per node and kept in its cache, which the editing helpers
+    # clear when the node or its documentation changes.
+    cache = node_cache(node)
+    if cache is not None and "natspec" in cache:
+        return cache["natspec"]
+    text = documentation_text(node)
+    result = parse_natspec(text) if text is not None else None
+    if cache is not None:
+        cache["natspec"] = result
+    return result
+
+
+class NatSpecIndex:
+    def __init__(self, asts: Iterable[ast_models.ASTNode]):
+        self._by_tag: Dict[str, List[Tuple[ast_models.ASTNode, NatSpecTag]]] = {}
+        self.documented: List[ast_models.ASTNode] = []
+
+        def visit(node, parent):
+            spec = natspec(node)
+            if spec is None:
+                return
+            self.documented.append(node)
+            for item in spec.tags:
+                self._by_tag.setdefault(item.tag, []).append((node, item))
+
+        for ast in asts:
+            traverse_ast(ast, visit)
+
+    @property
+    def tags(self) -> List[str]:
+        return sorted(self._by_tag)
+
+    def entries(
+        self, tag: str, name: Optional[str] = None
+    ) -> List[Tuple[ast_models.ASTNode, NatSpecTag]]:
+        return [
+            (node, item)
+            for node, item in self._by_tag.get(tag, ())
+            if name is None or item.name == name
+        ]
+
+    def nodes(self, tag: str, name: Optional[str] = None) -> List[ast_models.ASTNode]:
+        # A node documented with the tag twice (e.g. two @dev lines) is
+        # listed once.
+        result = []
+        seen = set()
+        for node, _ in self.entries(tag, name):
+            if id(node) not in seen:
+                seen.add(id(node))
+                result.append(node)
+        return result
@@ -0,0 +1,108 @@
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import List, Optional, Tuple, Union
+
+from solc_ast_parser.emitter import SolidityEmitter
+from solc_ast_parser.models.ast_models import (
+    ASTNode,
+    ContractDefinition,
+    SourceUnit,
+)
+from solc_ast_parser.models.base_ast_models import NodeType, SolidityConfig
+from solc_ast_parser.spans import parse_src
+
+# Chunks per worker, so one slow chunk doesn't leave the others idle.
+CHUNKS_PER_WORKER = 4
+
+# A member to render: the type of its container, the member, its indentation
+# and whether it is the container's last member.
+Task = Tuple[NodeType, ASTNode, int, bool]
+
+
+def _weight(node: ASTNode) -> int:
+    # Rendering cost grows with the node's source text.
+    try:
+        return max(parse_src(node.src)[1], 1)
+    except (AttributeError, ValueError):
+        return 1
+
+
+def _render_chunk(tasks: List[Task], config: SolidityConfig) -> str:
+    emitter = SolidityEmitter()
+    for container_type, node, spaces_count, last in tasks:
+        if container_type == NodeType.SOURCE_UNIT:
+            SourceUnit._emit_member(
+                emitter, node, spaces_count=spaces_count, config=config, last=last
+            )
+        else:
+            ContractDefinition._emit_member(
+                emitter, node, spaces_count=spaces_count, config=config
+            )
+    return emitter.getvalue()
+
+
+def _plan(
+    ast: SourceUnit, config: SolidityConfig, chunk_count: int
+) -> List[Union[str, List[Task]]]:
+    # Text written by the containers themselves is rendered here, members
+    # are grouped into contiguous chunks of about the same weight. Contracts
+    # heavier than a chunk are split into their members.
+    target = max(sum(_weight(node) for node in ast.nodes) // chunk_count, 1)
+    pieces: List[Union[str, List[Task]]] = []
+    chunk: List[Task] = []
+    chunk_weight = 0
+
+    def add(task: Task, weight: int) -> None:
+        nonlocal chunk, chunk_weight
+        chunk.append(task)
+        chunk_weight += weight
+        if chunk_weight >= target:
+            flush()
+
+    def flush() -> None:
+        nonlocal chunk, chunk_weight
+        if chunk:
+            pieces.append(chunk)
+        chunk, chunk_weight = [], 0
+
+    def write(emit) -> None:
+        flush()
+        emitter = SolidityEmitter()
+        emit(emitter)
+        pieces.append(emitter.getvalue())
+
+    write(lambda emitter: ast._emit_opening(emitter, config=config))
+    for i, node in enumerate(ast.nodes):
+        last = i == len(ast.nodes) - 1
+        weight = _weight(node)
+        if node.node_type != NodeType.CONTRACT_DEFINITION or weight <= target:
+            add((NodeType.SOURCE_UNIT, node, 0, last), weight)
+            continue
+        write(lambda emitter: node._emit_opening(emitter, config=config))
+        for member in node.nodes:
+            add((NodeType.CONTRACT_DEFINITION, member, 4, False), _weight(member))
+        write(node._emit_closing)
+    flush()
+    return pieces
+
+
+def to_solidity_parallel(
+    ast: SourceUnit,
+    config: Optional[SolidityConfig] = None,
+    max_workers: Optional[int] = None,
+    executor: Optional[Executor] = None,
+) -> str:
+    # Each chunk pickles only its own subtrees, node caches stay behind.
+    if config is None:
+        config = SolidityConfig()
+    if executor is None:
+        with ProcessPoolExecutor(max_workers) as pool:
+            return to_solidity_parallel(ast, config, max_workers, pool)
+
+    workers = max_workers or os.cpu_count() or 1
+    pieces = _plan(ast, config, workers * CHUNKS_PER_WORKER)
+    chunks = [piece for piece in pieces if not isinstance(piece, str)]
+    rendered = iter(executor.map(_render_chunk, chunks, [config] * len(chunks)))
+    return "".join(
+        piece if isinstance(piece, str) else next(rendered) for piece in pieces
+    )
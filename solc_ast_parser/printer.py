@@ -0,0 +1,334 @@
+from typing import Any, Dict, List, NamedTuple, Optional, TextIO, Tuple
+
+from pydantic import BaseModel
+
+from solc_ast_parser.emitter import SolidityEmitter
+from solc_ast_parser.hashing import IGNORED_FIELDS, subtree_hash
+from solc_ast_parser.models import ast_models
+from solc_ast_parser.models.base_ast_models import (
+    NodeBase,
+    NodeType,
+    SolidityConfig,
+    YulBase,
+)
+from solc_ast_parser.spans import parse_src
+from solc_ast_parser.utils import iter_child_nodes
+
+# Containers printing one member per line. Members there can be added,
+# removed or moved without reprinting the container.
+MEMBER_FIELDS = {
+    NodeType.SOURCE_UNIT: "nodes",
+    NodeType.CONTRACT_DEFINITION: "nodes",
+    NodeType.BLOCK: "statements",
+    NodeType.UNCHECKED_BLOCK: "statements",
+}
+
+ChildKey = Tuple[str, Optional[int]]
+
+
+class _Snapshot(NamedTuple):
+    node: Any
+    start: int
+    end: int
+    hash: str
+    scalars: Tuple
+    children: Dict[ChildKey, Any]
+
+
+def _scalars(node: ast_models.ASTNode) -> Tuple:
+    result = []
+    for field_name, value in node.__dict__.items():
+        if field_name in IGNORED_FIELDS:
+            continue
+        if isinstance(value, list):
+            value = [item for item in value if not isinstance(item, BaseModel)]
+        elif isinstance(value, BaseModel):
+            continue
+        result.append((field_name, repr(value)))
+    return tuple(result)
+
+
+class SourcePrinter:
+    def __init__(self, ast: ast_models.ASTNode, source: str):
+        # Offsets in src are byte offsets into the UTF-8 encoded source.
+        self.ast = ast
+        self.source = source.encode()
+        self._file_index = parse_src(ast.src)[2]
+        self._snapshots: Dict[int, _Snapshot] = {}
+
+        stack = [ast]
+        while stack:
+            node = stack.pop()
+            children = {
+                (field_name, index): child
+                for field_name, index, child in iter_child_nodes(node)
+            }
+            span = self._source_span(node)
+            if span is not None:
+                self._snapshots[id(node)] = _Snapshot(
+                    node, span[0], span[1], subtree_hash(node), _scalars(node), children
+                )
+            stack.extend(children.values())
+
+    def to_solidity(self, config: Optional[SolidityConfig] = None) -> str:
+        return b"".join(self._print_root(config)).decode()
+
+    def write_solidity(
+        self, stream: TextIO, config: Optional[SolidityConfig] = None
+    ) -> None:
+        # Pieces are cut at token boundaries, so each one decodes on its own.
+        for piece in self._print_root(config):
+            stream.write(piece.decode())
+
+    def _print_root(self, config: Optional[SolidityConfig]) -> List[bytes]:
+        out: List[bytes] = []
+        snapshot = self._snapshot(self.ast)
+        if snapshot is None:
+            out.append(self._regenerate(self.ast, 0, None, config))
+            return out
+        out.append(self.source[: snapshot.start])
+        self._print(self.ast, 0, snapshot.end, config, out)
+        out.append(self.source[snapshot.end :])
+        return out
+
+    def _source_span(self, node: ast_models.ASTNode) -> Optional[Tuple[int, int]]:
+        src = getattr(node, "src", None)
+        if src is None:
+            return None
+        try:
+            start, length, file_index = parse_src(src)
+        except ValueError:
+            return None
+        if file_index != self._file_index or start < 0 or length < 0:
+            return None
+        if start + length > len(self.source):
+            return None
+        return start, start + length
+
+    def _snapshot(self, node: ast_models.ASTNode) -> Optional[_Snapshot]:
+        snapshot = self._snapshots.get(id(node))
+        if snapshot is None or snapshot.node is not node:
+            return None
+        return snapshot
+
+    def _is_clean(self, node: ast_models.ASTNode) -> bool:
+        snapshot = self._snapshot(node)
+        return snapshot is not None and subtree_hash(node) == snapshot.hash
+
+    def _indentation(self, offset: int) -> int:
+        line_start = self.source.rfind(b"\n", 0, offset) + 1
+        line = self.source[line_start:offset]
+        return len(line) - len(line.lstrip(b" \t"))
+
+    def _print(
+        self,
+        node: ast_models.ASTNode,
+        indentation: int,
+        end: Optional[int],
+        config: Optional[SolidityConfig],
+        out: List[bytes],
+    ) -> None:
+        # `end` is where the original text continues after the node.
+        snapshot = self._snapshot(node)
+        if snapshot is None:
+            out.append(self._regenerate(node, indentation, end, config))
+        elif subtree_hash(node) == snapshot.hash:
+            out.append(self.source[snapshot.start : snapshot.end])
+        elif not self._patch(node, snapshot, config, out):
+            out.append(self._regenerate(node, indentation, end, config))
+
+    def _patch(
+        self,
+        node: ast_models.ASTNode,
+        snapshot: _Snapshot,
+        config: Optional[SolidityConfig],
+        out: List[bytes],
+    ) -> bool:
+        # Keeps the node's own text and only replaces the spans of the
+        # children that changed.
+        if _scalars(node) != snapshot.scalars:
+            return False
+        children = {
+            (field_name, index): child
+            for field_name, index, child in iter_child_nodes(node)
+        }
+        member_field = MEMBER_FIELDS.get(node.node_type)
+        if {key for key in children if key[0] != member_field} != {
+            key for key in snapshot.children if key[0] != member_field
+        }:
+            return False
+
+        pairs = [
+            (old_child, children[key])
+            for key, old_child in snapshot.children.items()
+            if key[0] != member_field
+        ]
+        edits = []
+        if member_field is not None:
+            old_members = self._members(snapshot.children, member_field)
+            members = self._members(children, member_field)
+            if len(old_members) == len(members) and all(
+                member is old_member for member, old_member in zip(members, old_members)
+            ):
+                # Same members in the same order, patched like any other child.
+                pairs.extend(zip(old_members, members))
+            else:
+                segments = self._member_segments(old_members)
+                if not segments:
+                    return False
+                start, end = segments[0][0], segments[-1][1]
+                if start < snapshot.start or end > snapshot.end:
+                    return False
+                edits.append((start, end, members, (old_members, segments)))
+
+        for old_child, child in pairs:
+            if child is old_child and self._is_clean(child):
+                continue
+            old = self._snapshot(old_child)
+            if old is None or old.start == old.end:
+                return False
+            if old.start < snapshot.start or old.end > snapshot.end:
+                return False
+            edits.append((old.start, old.end, child, None))
+
+        edits.sort(key=lambda edit: edit[0])
+        for previous, edit in zip(edits, edits[1:]):
+            if previous[1] > edit[0]:
+                return False
+
+        position = snapshot.start
+        for start, end, child, members in edits:
+            out.append(self.source[position:start])
+            if members is None:
+                self._print(child, self._indentation(start), end, config, out)
+            else:
+                self._print_members(node, child, *members, config, out)
+            position = end
+        out.append(self.source[position : snapshot.end])
+        return True
+
+    @staticmethod
+    def _members(children: Dict[ChildKey, Any], member_field: str) -> List[Any]:
+        return [
+            child
+            for key, child in sorted(
+                (item for item in children.items() if item[0][0] == member_field),
+                key=lambda item: item[0][1],
+            )
+        ]
+
+    def _member_segment(self, member: ast_models.ASTNode) -> Optional[Tuple[int, int]]:
+        # The lines a member occupies, if it shares them with nothing but its
+        # `;` and a trailing comment.
+        snapshot = self._snapshot(member)
+        if snapshot is None:
+            return None
+        line_start = self.source.rfind(b"\n", 0, snapshot.start) + 1
+        if self.source[line_start : snapshot.start].strip():
+            return None
+        line_end = self.source.find(b"\n", snapshot.end)
+        line_end = len(self.source) if line_end == -1 else line_end + 1
+        rest = self.source[snapshot.end : line_end].lstrip(b"; \t")
+        if rest.strip() and not rest.startswith(b"//"):
+            return None
+        return line_start, line_end
+
+    def _member_segments(
+        self, members: List[ast_models.ASTNode]
+    ) -> Optional[List[Tuple[int, int]]]:
+        segments = []
+        for member in members:
+            segment = self._member_segment(member)
+            if segment is None or (segments and segment[0] < segments[-1][1]):
+                return None
+            segments.append(segment)
+        return segments
+
+    def _print_members(
+        self,
+        node: ast_models.ASTNode,
+        members: List[ast_models.ASTNode],
+        old_members: List[ast_models.ASTNode],
+        segments: List[Tuple[int, int]],
+        config: Optional[SolidityConfig],
+        out: List[bytes],
+    ) -> None:
+        old_positions = {id(member): i for i, member in enumerate(old_members)}
+        indentation = self._indentation(self._snapshot(old_members[0]).start)
+        for member in members:
+            i = old_positions.get(id(member))
+            if i is not None:
+                # Blank lines and comments above a member move along with it.
+                if i:
+                    out.append(self.source[segments[i - 1][1] : segments[i][0]])
+                snapshot = self._snapshot(member)
+                line_start, line_end = segments[i]
+                out.append(self.source[line_start : snapshot.start])
+                self._print(
+                    member, self._indentation(snapshot.start), snapshot.end, config, out
+                )
+                out.append(self.source[snapshot.end : line_end])
+                continue
+
+            segment = self._member_segment(member) if self._is_clean(member) else None
+            if segment is not None:
+                # Moved in unchanged from elsewhere in the source.
+                snapshot = self._snapshot(member)
+                out.append(b" " * indentation)
+                out.append(self.source[snapshot.start : segment[1]])
+                continue
+
+            emitter = SolidityEmitter()
+            node._emit_member(emitter, member, spaces_count=indentation, config=config)
+            text = emitter.getvalue()
+            out.append(text.encode() if text.endswith("\n") else (text + "\n").encode())
+
+    def _documentation_kept(
+        self, node: ast_models.ASTNode, snapshot: _Snapshot
+    ) -> bool:
+        documentation = getattr(node, "documentation", None)
+        if not documentation or not isinstance(node, (NodeBase, YulBase)):
+            return False
+        if isinstance(documentation, BaseModel):
+            doc_snapshot = self._snapshot(documentation)
+            return (
+                doc_snapshot is not None
+                and doc_snapshot.start < snapshot.start
+                and self._is_clean(documentation)
+            )
+        return ("documentation", repr(documentation)) in snapshot.scalars
+
+    def _regenerate(
+        self,
+        node: ast_models.ASTNode,
+        indentation: int,
+        end: Optional[int],
+        config: Optional[SolidityConfig],
+    ) -> bytes:
+        emitter = SolidityEmitter()
+        if node.node_type in (NodeType.BLOCK, NodeType.UNCHECKED_BLOCK):
+            # Block output has no braces, those come from the enclosing node.
+            if node.node_type == NodeType.UNCHECKED_BLOCK:
+                emitter.write("unchecked ")
+            emitter.write("{\n")
+            node.emit_solidity(emitter, spaces_count=indentation + 4, config=config)
+            emitter.indent(indentation)
+            emitter.write("}")
+        else:
+            node.emit_solidity(emitter, spaces_count=indentation, config=config)
+        text = emitter.getvalue()
+
+        # The original text already holds the indentation, and the
+        # documentation if it is unchanged (solc spans start after it).
+        snapshot = self._snapshot(node)
+        if snapshot is not None and self._documentation_kept(node, snapshot):
+            base = NodeBase if isinstance(node, NodeBase) else YulBase
+            prefix = base.to_solidity(node, spaces_count=indentation, config=config)
+            if prefix and text.startswith(prefix):
+                text = text[len(prefix) :]
+        if text.startswith(" " * indentation):
+            text = text[indentation:]
+        text = text.rstrip("\n")
+        if end is not None and text.endswith(";") and self.source[end : end + 1] == b";":
+            text = text[:-1]
+        return text.encode()
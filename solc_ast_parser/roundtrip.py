@@ -0,0 +1,240 @@
+import argparse
+import os
+import sys
+import time
+import typing
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Callable, Iterable, List, Optional
+
+import solcx
+from pydantic import BaseModel
+
+from solc_ast_parser.hashing import IGNORED_FIELDS, subtree_hash
+from solc_ast_parser.models import ast_models
+from solc_ast_parser.models.ast_models import SourceUnit
+from solc_ast_parser.models.base_ast_models import QuotePreference, SolidityConfig
+from solc_ast_parser.utils import (
+    create_ast_with_standart_input,
+    create_standard_solidity_input,
+    iter_child_nodes,
+)
+
+Status = typing.Literal[
+    "ok", "compile_error", "render_error", "recompile_error", "mismatch"
+]
+
+
+@dataclass
+class RoundTripResult:
+    path: str
+    status: Status
+    seconds: float
+    error: Optional[str] = None
+    # Types of the outermost nodes whose own fields or children differ.
+    mismatched_node_types: List[str] = field(default_factory=list)
+
+
+@dataclass
+class RoundTripReport:
+    results: List[RoundTripResult]
+    seconds: float
+
+    @property
+    def statuses(self) -> Counter:
+        return Counter(result.status for result in self.results)
+
+    @property
+    def failures_by_node_type(self) -> Counter:
+        counter = Counter()
+        for result in self.results:
+            counter.update(set(result.mismatched_node_types))
+        return counter
+
+    @property
+    def files_per_second(self) -> float:
+        return len(self.results) / self.seconds if self.seconds else 0.0
+
+    def summary(self) -> str:
+        lines = [
+            f"{len(self.results)} files in {self.seconds:.1f}s "
+            f"({self.files_per_second:.1f} files/s)"
+        ]
+        for status, count in sorted(self.statuses.items()):
+            lines.append(f"  {status}: {count}")
+        if self.failures_by_node_type:
+            lines.append("mismatches by node type:")
+            for node_type, count in self.failures_by_node_type.most_common():
+                lines.append(f"  {node_type}: {count}")
+        return "\n".join(lines)
+
+
+def compile_source_unit(
+    source: str, file_name: str = "example.sol", solc_binary: Optional[str] = None
+) -> SourceUnit:
+    # Without a binary the compiler version is picked (and installed) from the
+    # pragma, like everywhere else in the package.
+    if solc_binary is None:
+        return create_ast_with_standart_input(source, file_name)
+    output = solcx.compile_standard(
+        create_standard_solidity_input(source, file_name), solc_binary=solc_binary
+    )
+    return SourceUnit(**output["sources"][file_name]["ast"])
+
+
+def _own_fields(node: ast_models.ASTNode) -> List:
+    result = []
+    for field_name, value in node.__dict__.items():
+        if field_name in IGNORED_FIELDS:
+            continue
+        if isinstance(value, list):
+            value = [item for item in value if not isinstance(item, BaseModel)]
+        elif isinstance(value, BaseModel):
+            continue
+        result.append((field_name, value))
+    return result
+
+
+def mismatched_node_types(
+    first: ast_models.ASTNode, second: ast_models.ASTNode
+) -> List[str]:
+    # Walks both trees in step and reports where they stop matching, ignoring
+    # ids, source locations and analysis annotations (see IGNORED_FIELDS).
+    if subtree_hash(first) == subtree_hash(second):
+        return []
+    node_type = str(getattr(first, "node_type", type(first).__name__))
+    if type(first) is not type(second):
+        return [node_type]
+
+    children = {(name, index): child for name, index, child in iter_child_nodes(first)}
+    other_children = {
+        (name, index): child for name, index, child in iter_child_nodes(second)
+    }
+    result = []
+    if children.keys() != other_children.keys() or _own_fields(first) != _own_fields(
+        second
+    ):
+        result.append(node_type)
+    for key, child in children.items():
+        other = other_children.get(key)
+        if other is not None:
+            result.extend(mismatched_node_types(child, other))
+    return result
+
+
+def _error(error: Exception) -> str:
+    message = str(error).strip().splitlines()
+    return f"{type(error).__name__}: {message[0] if message else ''}"
+
+
+def check_file(
+    path: str,
+    solc_binary: Optional[str] = None,
+    config: Optional[SolidityConfig] = None,
+) -> RoundTripResult:
+    # source -> AST -> source -> AST, then compares the two ASTs.
+    start = time.perf_counter()
+    file_name = os.path.basename(path)
+
+    def result(status: Status, error=None, node_types=None) -> RoundTripResult:
+        return RoundTripResult(
+            path,
+            status,
+            time.perf_counter() - start,
+            _error(error) if error is not None else None,
+            node_types or [],
+        )
+
+    try:
+        with open(path) as f:
+            source = f.read()
+        original = compile_source_unit(source, file_name, solc_binary)
+    except Exception as e:
+        return result("compile_error", e)
+    try:
+        generated = original.to_solidity(config=config)
+    except Exception as e:
+        return result("render_error", e)
+    try:
+        regenerated = compile_source_unit(generated, file_name, solc_binary)
+    except Exception as e:
+        return result("recompile_error", e)
+
+    node_types = mismatched_node_types(original, regenerated)
+    return result("mismatch" if node_types else "ok", node_types=node_types)
+
+
+def find_contracts(paths: Iterable[str]) -> List[str]:
+    found = []
+    for path in paths:
+        if os.path.isfile(path):
+            found.append(path)
+            continue
+        for root, _, files in os.walk(path):
+            found.extend(
+                os.path.join(root, name) for name in files if name.endswith(".sol")
+            )
+    return sorted(found)
+
+
+def run_round_trip(
+    paths: List[str],
+    solc_binary: Optional[str] = None,
+    config: Optional[SolidityConfig] = None,
+    max_workers: Optional[int] = None,
+    chunksize: int = 8,
+    progress: Optional[Callable[[RoundTripResult], None]] = None,
+) -> RoundTripReport:
+    start = time.perf_counter()
+    results = []
+    check = partial(check_file, solc_binary=solc_binary, config=config)
+    with ProcessPoolExecutor(max_workers) as pool:
+        for result in pool.map(check, paths, chunksize=chunksize):
+            results.append(result)
+            if progress is not None:
+                progress(result)
+    return RoundTripReport(results, time.perf_counter() - start)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Parse, regenerate and recompile Solidity files, then "
+        "compare the two ASTs."
+    )
+    parser.add_argument("paths", nargs="+", help="Solidity files or directories")
+    parser.add_argument("--solc", help="Local solc binary, nothing is downloaded")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunksize", type=int, default=8)
+    parser.add_argument(
+        "--quote", choices=[q.value for q in QuotePreference], default=None
+    )
+    parser.add_argument(
+        "--show", type=int, default=20, help="Failures to list (default: 20)"
+    )
+    args = parser.parse_args(argv)
+
+    config = SolidityConfig(quote_preference=args.quote) if args.quote else None
+    paths = find_contracts(args.paths)
+    done = 0
+
+    def progress(result: RoundTripResult) -> None:
+        nonlocal done
+        done += 1
+        if done % 1000 == 0:
+            print(f"{done}/{len(paths)}", file=sys.stderr)
+
+    report = run_round_trip(
+        paths, args.solc, config, args.workers, args.chunksize, progress
+    )
+    print(report.summary())
+    failures = [result for result in report.results if result.status != "ok"]
+    for result in failures[: args.show]:
+        detail = result.error or ", ".join(result.mismatched_node_types)
+        print(f"{result.status} {result.path}: {detail}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,198 @@
+import bisect
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from solc_ast_parser.models import ast_models
+from solc_ast_parser.utils import iter_child_nodes
+
+SpanKey = Tuple[int, int]
+
+
+def parse_src(src: str) -> Tuple[int, int, int]:
+    start, length, file_index = (int(part) for part in src.split(":"))
+    return start, length, file_index
+
+
+class SourceIndex:
+    def __init__(
+        self,
+        root: ast_models.ASTNode,
+        node_filter: Optional[Callable[[ast_models.ASTNode], bool]] = None,
+    ):
+        self.root = root
+        self.node_filter = node_filter
+        # id(node) -> (node, parent, start, end, order)
+        self._spans: Dict[int, Tuple] = {}
+        self._start_keys: List[SpanKey] = []
+        self._start_nodes: List[ast_models.ASTNode] = []
+        self._end_keys: List[SpanKey] = []
+        self._end_nodes: List[ast_models.ASTNode] = []
+        self._segments: Optional[List[int]] = None
+        self._segment_nodes: List[Optional[ast_models.ASTNode]] = []
+        self._order = 0
+
+        entries = []
+        stack = [(root, None)]
+        while stack:
+            node, parent = stack.pop()
+            entry = self._entry(node, parent)
+            self._spans[id(node)] = entry
+            if entry[2] is not None:
+                entries.append(entry)
+            children = list(iter_child_nodes(node))
+            for _, _, child in reversed(children):
+                stack.append((child, node))
+
+        # Pre-order position breaks ties, so outer nodes come before the
+        # nodes they start or end together with, as traverse_ast visits them.
+        entries.sort(key=lambda entry: (entry[2], entry[4]))
+        self._start_keys = [(entry[2], entry[4]) for entry in entries]
+        self._start_nodes = [entry[0] for entry in entries]
+        entries.sort(key=lambda entry: (entry[3], entry[4]))
+        self._end_keys = [(entry[3], entry[4]) for entry in entries]
+        self._end_nodes = [entry[0] for entry in entries]
+
+    def _entry(
+        self, node: ast_models.ASTNode, parent: Optional[ast_models.ASTNode]
+    ) -> Tuple:
+        order = self._order
+        self._order += 1
+        src = getattr(node, "src", None)
+        if src is None or (self.node_filter and not self.node_filter(node)):
+            return (node, parent, None, None, order)
+        start, length, _ = parse_src(src)
+        return (node, parent, start, start + length, order)
+
+    def _span(self, node: ast_models.ASTNode) -> Optional[Tuple]:
+        span = self._spans.get(id(node))
+        if span is None or span[0] is not node:
+            return None
+        return span
+
+    def __contains__(self, node: ast_models.ASTNode) -> bool:
+        return self._span(node) is not None
+
+    def __len__(self) -> int:
+        return len(self._start_nodes)
+
+    def span(self, node: ast_models.ASTNode) -> Optional[Tuple[int, int]]:
+        span = self._span(node)
+        if span is None or span[2] is None:
+            return None
+        return span[2], span[3]
+
+    def parent(self, node: ast_models.ASTNode) -> Optional[ast_models.ASTNode]:
+        span = self._span(node)
+        return span[1] if span else None
+
+    def ancestors(self, node: ast_models.ASTNode) -> List[ast_models.ASTNode]:
+        result = []
+        current = self.parent(node)
+        while current is not None:
+            result.append(current)
+            current = self.parent(current)
+        return result
+
+    def node_at(self, offset: int) -> Optional[ast_models.ASTNode]:
+        if self._segments is None:
+            self._build_segments()
+        i = bisect.bisect_right(self._segments, offset) - 1
+        return self._segment_nodes[i] if i >= 0 else None
+
+    def nodes_in_range(self, start: int, end: int) -> List[ast_models.ASTNode]:
+        result = []
+        i = bisect.bisect_left(self._start_keys, (start, -1))
+        while i < len(self._start_keys) and self._start_keys[i][0] < end:
+            node = self._start_nodes[i]
+            if self._spans[id(node)][3] <= end:
+                result.append(node)
+            i += 1
+        return result
+
+    def next_node(
+        self, offset: int, by_end: bool = False
+    ) -> Optional[ast_models.ASTNode]:
+        keys, nodes = (
+            (self._end_keys, self._end_nodes)
+            if by_end
+            else (self._start_keys, self._start_nodes)
+        )
+        i = bisect.bisect_left(keys, (offset, -1))
+        return nodes[i] if i < len(nodes) else None
+
+    def next_nodes(
+        self, offsets: Iterable[int], by_end: bool = False
+    ) -> List[Optional[ast_models.ASTNode]]:
+        # next_node for each of the ascending offsets, in one merge pass.
+        keys, nodes = (
+            (self._end_keys, self._end_nodes)
+            if by_end
+            else (self._start_keys, self._start_nodes)
+        )
+        result = []
+        i = 0
+        previous = None
+        for offset in offsets:
+            if previous is not None and offset < previous:
+                raise ValueError("offsets must be ascending")
+            previous = offset
+            while i < len(keys) and keys[i][0] < offset:
+                i += 1
+            result.append(nodes[i] if i < len(nodes) else None)
+        return result
+
+    def add(
+        self, node: ast_models.ASTNode, parent: Optional[ast_models.ASTNode]
+    ) -> None:
+        entry = self._entry(node, parent)
+        self._spans[id(node)] = entry
+        if entry[2] is None:
+            return
+        key = (entry[2], entry[4])
+        i = bisect.bisect_left(self._start_keys, key)
+        self._start_keys.insert(i, key)
+        self._start_nodes.insert(i, node)
+        key = (entry[3], entry[4])
+        i = bisect.bisect_left(self._end_keys, key)
+        self._end_keys.insert(i, key)
+        self._end_nodes.insert(i, node)
+        self._segments = None
+
+    def remove(self, node: ast_models.ASTNode) -> bool:
+        span = self._span(node)
+        if span is None:
+            return False
+        del self._spans[id(node)]
+        if span[2] is None:
+            return True
+        i = bisect.bisect_left(self._start_keys, (span[2], span[4]))
+        del self._start_keys[i], self._start_nodes[i]
+        i = bisect.bisect_left(self._end_keys, (span[3], span[4]))
+        del self._end_keys[i], self._end_nodes[i]
+        self._segments = None
+        return True
+
+    def _build_segments(self) -> None:
+        # Flatten the nested spans into consecutive segments, each mapped to
+        # the innermost node covering it.
+        segments: List[int] = []
+        segment_nodes: List[Optional[ast_models.ASTNode]] = []
+        stack: List[Tuple[int, ast_models.ASTNode]] = []
+
+        def emit(position: int) -> None:
+            node = stack[-1][1] if stack else None
+            if segments and segments[-1] >= position:
+                segment_nodes[-1] = node
+            else:
+                segments.append(position)
+                segment_nodes.append(node)
+
+        for (start, _), node in zip(self._start_keys, self._start_nodes):
+            while stack and stack[-1][0] <= start:
+                emit(stack.pop()[0])
+            stack.append((self._spans[id(node)][3], node))
+            emit(start)
+        while stack:
+            emit(stack.pop()[0])
+
+        self._segments = segments
+        self._segment_nodes = segment_nodes
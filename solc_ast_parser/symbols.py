@@ -0,0 +1,278 @@
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from solc_ast_parser.cursor import ParentMap
+from solc_ast_parser.models import ast_models
+from solc_ast_parser.models.base_ast_models import NodeType
+from solc_ast_parser.utils import iter_child_nodes
+
+SCOPE_KINDS = {
+    NodeType.SOURCE_UNIT: "source_unit",
+    NodeType.CONTRACT_DEFINITION: "contract",
+    NodeType.FUNCTION_DEFINITION: "function",
+    NodeType.MODIFIER_DEFINITION: "modifier",
+    NodeType.BLOCK: "block",
+    NodeType.UNCHECKED_BLOCK: "block",
+    NodeType.FOR_STATEMENT: "block",
+    NodeType.TRY_CATCH_CLAUSE: "block",
+    # Members and parameters of these are only reachable through their
+    # owner, so they get a scope of their own instead of leaking outwards.
+    NodeType.STRUCT_DEFINITION: "struct",
+    NodeType.ENUM_DEFINITION: "enum",
+    NodeType.EVENT_DEFINITION: "event",
+    NodeType.ERROR_DEFINITION: "error",
+    NodeType.FUNCTION_TYPE_NAME: "function_type",
+}
+
+DECLARATION_TYPES = frozenset(
+    {
+        NodeType.CONTRACT_DEFINITION,
+        NodeType.FUNCTION_DEFINITION,
+        NodeType.MODIFIER_DEFINITION,
+        NodeType.EVENT_DEFINITION,
+        NodeType.ERROR_DEFINITION,
+        NodeType.STRUCT_DEFINITION,
+        NodeType.ENUM_DEFINITION,
+        NodeType.ENUM_VALUE,
+        NodeType.USER_DEFINED_VALUE_TYPE_DEFINITION,
+        NodeType.VARIABLE_DECLARATION,
+    }
+)
+
+
+class Scope:
+    def __init__(
+        self, kind: str, node: ast_models.ASTNode, parent: Optional["Scope"]
+    ):
+        self.kind = kind
+        self.node = node
+        self.parent = parent
+        # name -> [(visible_from, declaration)], in declaration order
+        self.symbols: Dict[str, List[Tuple[int, ast_models.ASTNode]]] = {}
+
+    def add(
+        self, name: str, declaration: ast_models.ASTNode, visible_from: int = 0
+    ) -> None:
+        self.symbols.setdefault(name, []).append((visible_from, declaration))
+
+    def find(
+        self,
+        name: str,
+        order: Optional[int] = None,
+        node_types: Optional[Iterable[NodeType]] = None,
+    ) -> List[ast_models.ASTNode]:
+        return [
+            declaration
+            for visible_from, declaration in self.symbols.get(name, ())
+            if (order is None or visible_from <= order)
+            and (node_types is None or declaration.node_type in node_types)
+        ]
+
+
+class SymbolTable:
+    def __init__(self, root: ast_models.ASTNode):
+        self.root = root
+        self.root_scope = Scope(
+            SCOPE_KINDS.get(root.node_type, "source_unit"), root, None
+        )
+        # id(node) -> (node, innermost scope, pre-order position)
+        self._positions: Dict[int, Tuple[ast_models.ASTNode, Scope, int]] = {}
+        self._scopes: Dict[int, Scope] = {id(root): self.root_scope}
+        self._by_name: Dict[str, List[ast_models.ASTNode]] = {}
+        self._build()
+
+    def _build(self) -> None:
+        order = 0
+        # Entries are (node, parent, scope) or (None, node, scope) once the
+        # node's subtree is done.
+        stack = [(self.root, None, None)]
+        while stack:
+            node, parent, scope = stack.pop()
+            if node is None:
+                self._leave(parent, scope, order)
+                continue
+
+            if scope is not None and node.node_type in DECLARATION_TYPES:
+                self._by_name.setdefault(node.name, []).append(node)
+                # Locals become visible after their statement, so
+                # `uint x = x;` still sees the outer x.
+                if not (
+                    parent is not None
+                    and parent.node_type == NodeType.VARIABLE_DECLARATION_STATEMENT
+                ):
+                    scope.add(node.name, node)
+
+            kind = SCOPE_KINDS.get(node.node_type)
+            if scope is None:
+                inner = self.root_scope
+            elif kind is not None:
+                inner = Scope(kind, node, scope)
+                self._scopes[id(node)] = inner
+            else:
+                inner = scope
+            self._positions[id(node)] = (node, inner, order)
+            order += 1
+
+            stack.append((None, node, inner))
+            children = list(iter_child_nodes(node))
+            for _, _, child in reversed(children):
+                stack.append((child, node, inner))
+
+    def _leave(self, node: ast_models.ASTNode, scope: Scope, order: int) -> None:
+        if node.node_type != NodeType.VARIABLE_DECLARATION_STATEMENT:
+            return
+        for declaration in node.declarations:
+            if declaration is not None:
+                scope.add(declaration.name, declaration, order)
+
+    def scope(self, node: ast_models.ASTNode) -> Optional[Scope]:
+        # The innermost scope a node is in, which is its own for scope nodes.
+        position = self._positions.get(id(node))
+        if position is None or position[0] is not node:
+            return None
+        return position[1]
+
+    def _base_scopes(self, scope: Scope) -> Iterator[Scope]:
+        # Bases in roughly linearized order, the last listed base first.
+        seen = {id(scope.node)}
+        pending = [scope]
+        while pending:
+            current = pending.pop(0)
+            for specifier in reversed(getattr(current.node, "base_contracts", [])):
+                name = specifier.base_name.name.split(".")[-1]
+                for contract in self.root_scope.find(
+                    name, node_types=(NodeType.CONTRACT_DEFINITION,)
+                ):
+                    base = self._scopes.get(id(contract))
+                    if base is not None and id(contract) not in seen:
+                        seen.add(id(contract))
+                        pending.append(base)
+                        yield base
+
+    def lookup_all(
+        self,
+        name: str,
+        node: Optional[ast_models.ASTNode] = None,
+        node_types: Optional[Iterable[NodeType]] = None,
+    ) -> List[ast_models.ASTNode]:
+        # Every matching declaration of the innermost scope that has one, as
+        # seen from node (or from the top level without a node).
+        if node_types is not None:
+            node_types = frozenset(node_types)
+        position = self._positions.get(id(node)) if node is not None else None
+        if position is None or position[0] is not node:
+            scope, order = self.root_scope, None
+        else:
+            scope, order = position[1], position[2]
+        while scope is not None:
+            found = scope.find(name, order, node_types)
+            if found:
+                return found
+            if scope.kind == "contract":
+                for base in self._base_scopes(scope):
+                    found = base.find(name, None, node_types)
+                    if found:
+                        return found
+            scope = scope.parent
+        return []
+
+    def lookup(
+        self,
+        name: str,
+        node: Optional[ast_models.ASTNode] = None,
+        node_types: Optional[Iterable[NodeType]] = None,
+    ) -> Optional[ast_models.ASTNode]:
+        found = self.lookup_all(name, node, node_types)
+        return found[0] if found else None
+
+    def member(
+        self,
+        container: ast_models.ASTNode,
+        name: str,
+        node_types: Optional[Iterable[NodeType]] = None,
+    ) -> Optional[ast_models.ASTNode]:
+        # A name declared directly in a contract (or one of its bases), struct
+        # or enum.
+        scope = self._scopes.get(id(container))
+        if scope is None or scope.node is not container:
+            return None
+        if node_types is not None:
+            node_types = frozenset(node_types)
+        found = scope.find(name, None, node_types)
+        if not found and scope.kind == "contract":
+            for base in self._base_scopes(scope):
+                found = base.find(name, None, node_types)
+                if found:
+                    break
+        return found[0] if found else None
+
+    def declarations(
+        self, name: str, node_types: Optional[Iterable[NodeType]] = None
+    ) -> List[ast_models.ASTNode]:
+        # All declarations of a name anywhere in the tree, in traversal order.
+        found = self._by_name.get(name, [])
+        if node_types is None:
+            return list(found)
+        node_types = frozenset(node_types)
+        return [
+            declaration
+            for declaration in found
+            if declaration.node_type in node_types
+        ]
+
+    def declared(
+        self, name: str, node_types: Optional[Iterable[NodeType]] = None
+    ) -> bool:
+        return bool(self.declarations(name, node_types))
+
+
+class ReferenceResolver:
+    def __init__(
+        self, root: ast_models.ASTNode, symbols: Optional[SymbolTable] = None
+    ):
+        self.root = root
+        self._symbols = symbols
+        self._ids: Optional[ParentMap] = None
+
+    @property
+    def ids(self) -> ParentMap:
+        if self._ids is None:
+            self._ids = ParentMap(self.root)
+        return self._ids
+
+    @property
+    def symbols(self) -> SymbolTable:
+        if self._symbols is None:
+            self._symbols = SymbolTable(self.root)
+        return self._symbols
+
+    def resolve(self, node: ast_models.ASTNode) -> Optional[ast_models.ASTNode]:
+        # Compiled ASTs name the declaration, only parsed ones are resolved by
+        # name. Each index is built on first use.
+        reference = getattr(node, "referenced_declaration", None)
+        if reference is not None:
+            # Negative ids are builtins such as msg or keccak256.
+            return self.ids.get(reference) if reference >= 0 else None
+        return self._resolve_by_name(node)
+
+    def _resolve_by_name(
+        self, node: ast_models.ASTNode
+    ) -> Optional[ast_models.ASTNode]:
+        match node.node_type:
+            case NodeType.IDENTIFIER:
+                return self.symbols.lookup(node.name, node)
+            case NodeType.IDENTIFIER_PATH:
+                first, *rest = node.name.split(".")
+                declaration = self.symbols.lookup(first, node)
+                for name in rest:
+                    if declaration is None:
+                        break
+                    declaration = self.symbols.member(declaration, name)
+                return declaration
+            case NodeType.USER_DEFINED_TYPE_NAME:
+                return self.resolve(node.path_node)
+            case NodeType.MEMBER_ACCESS:
+                container = self.resolve(node.expression)
+                if container is None:
+                    return None
+                return self.symbols.member(container, node.member_name)
+        return None
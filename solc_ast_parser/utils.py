@@ -6,7 +6,7 @@ import solcx
 
 from solc_ast_parser.models import ast_models
 from solc_ast_parser.models.ast_models import SourceUnit
-from solc_ast_parser.models.base_ast_models import NodeType
+from solc_ast_parser.models.base_ast_models import NodeType, node_cache
 
 
 def compile_contract_from_source(source: str):
@@ -63,17 +63,60 @@ def traverse_ast(
             traverse_ast(value, visitor, node)
 
 
+def iter_child_nodes(
+    node: ast_models.ASTNode,
+) -> typing.Iterator[Tuple[str, Optional[int], ast_models.ASTNode]]:
+    for field_name, value in node.__dict__.items():
+        if isinstance(value, list):
+            for i, item in enumerate(value):
+                if hasattr(item, "model_fields") and hasattr(item, "node_type"):
+                    yield field_name, i, item
+        elif hasattr(value, "model_fields") and hasattr(value, "node_type"):
+            yield field_name, None, value
+
+
+def invalidate_node_cache(*nodes: ast_models.ASTNode) -> None:
+    for node in nodes:
+        cache = node_cache(node)
+        if cache:
+            cache.clear()
+
+
+def _invalidate_path(entry: Optional[Tuple]) -> None:
+    # Stack entries are (node, parent_entry), so an edit only has to clear the
+    # caches of the nodes on the path back to the root.
+    while entry is not None:
+        invalidate_node_cache(entry[0])
+        entry = entry[1]
+
+
+def _reserve_ids(root: ast_models.ASTNode, *nodes: Any) -> None:
+    # Keeps a seeded per-AST id allocator ahead of ids brought in by edits.
+    allocator = getattr(root, "_id_allocator", None)
+    if allocator is None or not allocator.seeded:
+        return
+
+    def reserve(node: ast_models.ASTNode, parent: Any) -> None:
+        node_id = getattr(node, "id", None)
+        if isinstance(node_id, int) and node_id >= 0:
+            allocator.reserve(node_id)
+
+    for node in nodes:
+        traverse_ast(node, reserve)
+
+
 def update_node_fields(
     ast_node: ast_models.ASTNode,
     target_fields: Dict[str, Any],
     new_values: Dict[str, Any],
 ) -> bool:
-    stack = deque([ast_node])
+    stack = deque([(ast_node, None)])
     updated = False
     visited = set()
 
     while stack:
-        current_node = stack.popleft()
+        entry = stack.popleft()
+        current_node = entry[0]
         if not hasattr(current_node, "id"):
             continue
         node_id = current_node.id
@@ -101,14 +144,15 @@ def update_node_fields(
                 if hasattr(current_node, field):
                     setattr(current_node, field, value)
                     updated = True
+                    _invalidate_path(entry)
 
         for field_name, field_value in current_node.__dict__.items():
             if isinstance(field_value, list):
                 for item in field_value:
                     if hasattr(item, "model_fields"):
-                        stack.append(item)
+                        stack.append((item, entry))
             elif hasattr(field_value, "model_fields"):
-                stack.append(field_value)
+                stack.append((field_value, entry))
 
     return updated
 
@@ -119,25 +163,32 @@ def replace_node(
     if hasattr(ast_node, "id") and ast_node.id == target_id:
         return False
 
-    stack = deque([(ast_node, None, None)])
+    stack = deque([(ast_node, None)])
 
     while stack:
-        current_node, parent_field, list_index = stack.popleft()
+        entry = stack.popleft()
+        current_node = entry[0]
 
         for field_name, field_value in current_node.__dict__.items():
             if isinstance(field_value, list):
                 for i, item in enumerate(field_value):
                     if hasattr(item, "id") and item.id == target_id:
                         field_value[i] = replacement_node
+                        _reserve_ids(ast_node, replacement_node)
+                        invalidate_node_cache(replacement_node)
+                        _invalidate_path(entry)
                         return True
                     elif hasattr(item, "__dict__"):
-                        stack.append((item, field_name, i))
+                        stack.append((item, entry))
 
             elif hasattr(field_value, "__dict__"):
                 if hasattr(field_value, "id") and field_value.id == target_id:
                     setattr(current_node, field_name, replacement_node)
+                    _reserve_ids(ast_node, replacement_node)
+                    invalidate_node_cache(replacement_node)
+                    _invalidate_path(entry)
                     return True
-                stack.append((field_value, field_name, None))
+                stack.append((field_value, entry))
 
     return False
 
@@ -150,25 +201,30 @@ def replace_node_to_multiple(
     if hasattr(ast_node, "id") and ast_node.id == target_id:
         return False
 
-    stack = deque([(ast_node, None, None)])
+    stack = deque([(ast_node, None)])
 
     while stack:
-        current_node, parent_field, list_index = stack.popleft()
+        entry = stack.popleft()
+        current_node = entry[0]
 
         for field_name, field_value in current_node.__dict__.items():
             if isinstance(field_value, list):
                 for i, item in enumerate(field_value):
                     if hasattr(item, "id") and item.id == target_id:
                         field_value[i] = replacement_nodes
+                        _reserve_ids(ast_node, *replacement_nodes)
+                        _invalidate_path(entry)
                         return True
                     elif hasattr(item, "__dict__"):
-                        stack.append((item, field_name, i))
+                        stack.append((item, entry))
 
             elif hasattr(field_value, "__dict__"):
                 if hasattr(field_value, "id") and field_value.id == target_id:
                     setattr(current_node, field_name, replacement_nodes)
+                    _reserve_ids(ast_node, *replacement_nodes)
+                    _invalidate_path(entry)
                     return True
-                stack.append((field_value, field_name, None))
+                stack.append((field_value, entry))
 
     return False
 
@@ -177,25 +233,28 @@ def remove_node(ast_node: ast_models.ASTNode, target_id: int) -> bool:
     if hasattr(ast_node, "id") and ast_node.id == target_id:
         return False
 
-    stack = deque([(ast_node, None, None)])
+    stack = deque([(ast_node, None)])
 
     while stack:
-        current_node, parent_field, list_index = stack.popleft()
+        entry = stack.popleft()
+        current_node = entry[0]
 
         for field_name, field_value in current_node.__dict__.items():
             if isinstance(field_value, list):
                 for i, item in enumerate(field_value):
                     if hasattr(item, "id") and item.id == target_id:
                         del field_value[i]
+                        _invalidate_path(entry)
                         return True
                     elif hasattr(item, "__dict__"):
-                        stack.append((item, field_name, i))
+                        stack.append((item, entry))
 
             elif hasattr(field_value, "__dict__"):
                 if hasattr(field_value, "id") and field_value.id == target_id:
                     setattr(current_node, field_name, None)
+                    _invalidate_path(entry)
                     return True
-                stack.append((field_value, field_name, None))
+                stack.append((field_value, entry))
 
     return False
 
@@ -253,10 +312,11 @@ def insert_node(
     if hasattr(ast_node, "id") and ast_node.id == target_id:
         return False
 
-    stack = deque([(ast_node, None, None, None)])
+    stack = deque([(ast_node, None)])
 
     while stack:
-        current_node, parent_node, field_name, list_index = stack.popleft()
+        entry = stack.popleft()
+        current_node = entry[0]
 
         for field_name, field_value in current_node.__dict__.items():
             if isinstance(field_value, list):
@@ -280,9 +340,13 @@ def insert_node(
                                 item.statements.append(new_node)
                             else:
                                 return False
+                        if position in ("child_first", "child_last"):
+                            invalidate_node_cache(item)
+                        _reserve_ids(ast_node, new_node)
+                        _invalidate_path(entry)
                         return True
                     elif hasattr(item, "__dict__"):
-                        stack.append((item, current_node, field_name, i))
+                        stack.append((item, entry))
 
             elif hasattr(field_value, "__dict__"):
                 if hasattr(field_value, "id") and field_value.id == target_id:
@@ -300,8 +364,11 @@ def insert_node(
                             field_value.statements.append(new_node)
                         else:
                             return False
+                    invalidate_node_cache(field_value)
+                    _reserve_ids(ast_node, new_node)
+                    _invalidate_path(entry)
                     return True
-                stack.append((field_value, current_node, field_name, None))
+                stack.append((field_value, entry))
 
     return False
 
@@ -324,7 +391,10 @@ def reorder_nodes(
                     _reorder_contract_nodes(node, node_order, custom_sort_key)
                     or success
                 )
+                invalidate_node_cache(node)
 
+    if success:
+        invalidate_node_cache(ast_node)
     return success
 
 
@@ -414,14 +484,25 @@ def group_nodes_by_type(
     return reorder_nodes(ast_node=ast_node, target_contract_name=target_contract_name)
 
 
+def _random_stream(
+    seed: Optional[int] = None, rng: Optional[random.Random] = None
+) -> Any:
+    # A seed gets a generator of its own instead of reseeding the module's,
+    # which other threads draw from. Shuffles come out the same either way.
+    # Unseeded calls keep using the module's generator.
+    if rng is not None:
+        return rng
+    return random.Random(seed) if seed is not None else random
+
+
 def shuffle_nodes_randomly(
     ast_node: ast_models.ASTNode,
     node_types: List[NodeType],
     target_contract_name: Optional[str] = None,
     seed: Optional[int] = None,
+    rng: Optional[random.Random] = None,
 ) -> bool:
-    if seed is not None:
-        random.seed(seed)
+    rng = _random_stream(seed, rng)
 
     if not hasattr(ast_node, "nodes"):
         return False
@@ -431,14 +512,20 @@ def shuffle_nodes_randomly(
     for node in ast_node.nodes:
         if node.node_type == NodeType.CONTRACT_DEFINITION:
             if target_contract_name is None or node.name == target_contract_name:
-                success = _shuffle_contract_nodes_randomly(node, node_types) or success
+                success = (
+                    _shuffle_contract_nodes_randomly(node, node_types, rng) or success
+                )
+                invalidate_node_cache(node)
 
+    if success:
+        invalidate_node_cache(ast_node)
     return success
 
 
 def _shuffle_contract_nodes_randomly(
     contract_node: ast_models.ASTNode,
     node_types: List[NodeType],
+    rng: Optional[random.Random] = None,
 ) -> bool:
     if not hasattr(contract_node, "nodes") or not contract_node.nodes:
         return False
@@ -455,7 +542,7 @@ def _shuffle_contract_nodes_randomly(
             else:
                 other_nodes.append(node)
 
-        random.shuffle(nodes_to_shuffle)
+        (rng or random).shuffle(nodes_to_shuffle)
 
         new_nodes = []
         shuffle_index = 0
@@ -479,12 +566,14 @@ def shuffle_functions_and_storages(
     ast_node: ast_models.ASTNode,
     target_contract_name: Optional[str] = None,
     seed: Optional[int] = None,
+    rng: Optional[random.Random] = None,
 ) -> bool:
     return shuffle_nodes_randomly(
         ast_node=ast_node,
         node_types=[NodeType.FUNCTION_DEFINITION, NodeType.VARIABLE_DECLARATION],
         target_contract_name=target_contract_name,
         seed=seed,
+        rng=rng,
     )
 
 
@@ -492,9 +581,9 @@ def shuffle_all_nodes_randomly(
     ast_node: ast_models.ASTNode,
     target_contract_name: Optional[str] = None,
     seed: Optional[int] = None,
+    rng: Optional[random.Random] = None,
 ) -> bool:
-    if seed is not None:
-        random.seed(seed)
+    rng = _random_stream(seed, rng)
 
     if not hasattr(ast_node, "nodes"):
         return False
@@ -507,9 +596,12 @@ def shuffle_all_nodes_randomly(
                 if hasattr(node, "nodes") and node.nodes:
                     original_nodes = node.nodes.copy()
                     try:
-                        random.shuffle(node.nodes)
+                        rng.shuffle(node.nodes)
                         success = True
                     except Exception:
                         node.nodes = original_nodes
+                    invalidate_node_cache(node)
 
+    if success:
+        invalidate_node_cache(ast_node)
     return success
@@ -0,0 +1,63 @@
+import random
+from typing import Callable, Dict, Iterator, Optional, Sequence, Union
+
+from solc_ast_parser.models.ast_models import ASTNode, SourceUnit
+from solc_ast_parser.models.base_ast_models import NodeType, SolidityConfig
+from solc_ast_parser.utils import (
+    shuffle_all_nodes_randomly,
+    shuffle_functions_and_storages,
+)
+
+# An operation edits a variant in place with the variant's own random stream.
+Operation = Callable[[SourceUnit, random.Random], object]
+
+OPERATIONS: Dict[str, Operation] = {
+    "shuffle_functions_and_storages": lambda ast, rng: shuffle_functions_and_storages(
+        ast, rng=rng
+    ),
+    "shuffle_all_nodes": lambda ast, rng: shuffle_all_nodes_randomly(ast, rng=rng),
+}
+
+
+def variant_rng(seed: Union[int, str], index: int) -> random.Random:
+    # Depends only on the seed and the index, so any single variant can be
+    # regenerated without producing the ones before it.
+    return random.Random(f"{seed}:{index}")
+
+
+def _shell(node: ASTNode) -> ASTNode:
+    # A copy sharing every field with node except the member list.
+    return node.model_copy(update={"nodes": list(node.nodes)})
+
+
+def copy_containers(ast: SourceUnit) -> SourceUnit:
+    # Only the source unit and its contracts are copied, the members
+    # themselves are shared with ast.
+    copy = _shell(ast)
+    copy.nodes = [
+        _shell(node) if node.node_type == NodeType.CONTRACT_DEFINITION else node
+        for node in copy.nodes
+    ]
+    return copy
+
+
+def generate_variants(
+    ast: SourceUnit,
+    n: int,
+    ops: Sequence[Union[str, Operation]] = ("shuffle_functions_and_storages",),
+    seed: Optional[Union[int, str]] = None,
+    render: bool = False,
+    config: Optional[SolidityConfig] = None,
+) -> Iterator[Union[SourceUnit, str]]:
+    # Variants are built one at a time as they are consumed. Operations may
+    # reorder or replace the members of the source unit and its contracts,
+    # but must not edit the shared members in place.
+    operations = [OPERATIONS[op] if isinstance(op, str) else op for op in ops]
+    if seed is None:
+        seed = random.Random().getrandbits(64)
+    for index in range(n):
+        rng = variant_rng(seed, index)
+        variant = copy_containers(ast)
+        for operation in operations:
+            operation(variant, rng)
+        yield variant.to_solidity(config=config) if render else variant
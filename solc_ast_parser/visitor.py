@@ -0,0 +1,146 @@
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional
+
+from solc_ast_parser.models import ast_models
+from solc_ast_parser.models.base_ast_models import NodeType, YulNodeType
+from solc_ast_parser.utils import invalidate_node_cache, iter_child_nodes
+
+ALL_NODE_TYPES = tuple(NodeType) + tuple(YulNodeType)
+
+
+class _FusedCall:
+    # The handler a fused walk is running, and how to walk the node's
+    # children for it once it calls generic_visit().
+    __slots__ = ("visitor", "node", "resume")
+
+    def __init__(self, visitor, node, resume):
+        self.visitor = visitor
+        self.node = node
+        self.resume = resume
+
+
+_fused_call: ContextVar[Optional[_FusedCall]] = ContextVar("_fused_call", default=None)
+
+
+class NodeVisitor:
+    _dispatch: Dict[str, Optional[Callable]] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._dispatch = {
+            node_type.value: getattr(cls, f"visit_{node_type.value}", None)
+            for node_type in ALL_NODE_TYPES
+        }
+
+    def visit(self, node: ast_models.ASTNode) -> Any:
+        method = self._dispatch.get(node.node_type)
+        if method is None:
+            return self.generic_visit(node)
+        return method(self, node)
+
+    def generic_visit(self, node: ast_models.ASTNode) -> Any:
+        call = _fused_call.get()
+        if (
+            call is not None
+            and call.visitor is self
+            and call.node is node
+            and call.resume is not None
+        ):
+            # The fused walk visits the children for every visitor at once and
+            # returns here, so the rest of the handler still runs after them.
+            resume, call.resume = call.resume, None
+            resume()
+            return None
+        for _, _, child in iter_child_nodes(node):
+            self.visit(child)
+
+
+class NodeTransformer(NodeVisitor):
+    def visit(self, node: ast_models.ASTNode) -> Any:
+        # Handlers may mutate the node in place, so anything cached on the
+        # visited nodes is stale afterwards.
+        invalidate_node_cache(node)
+        return super().visit(node)
+
+    def generic_visit(self, node: ast_models.ASTNode) -> ast_models.ASTNode:
+        for field_name, value in list(node.__dict__.items()):
+            if isinstance(value, list):
+                new_values = []
+                changed = False
+                for item in value:
+                    if not (
+                        hasattr(item, "model_fields") and hasattr(item, "node_type")
+                    ):
+                        new_values.append(item)
+                        continue
+                    new_item = self.visit(item)
+                    if new_item is None:
+                        changed = True
+                    elif isinstance(new_item, list):
+                        new_values.extend(new_item)
+                        changed = True
+                    else:
+                        changed = changed or new_item is not item
+                        new_values.append(new_item)
+                if changed:
+                    value[:] = new_values
+            elif hasattr(value, "model_fields") and hasattr(value, "node_type"):
+                new_value = self.visit(value)
+                if new_value is not value:
+                    setattr(node, field_name, new_value)
+        return node
+
+
+class FusedVisitor:
+    def __init__(self, *visitors: NodeVisitor):
+        for visitor in visitors:
+            if isinstance(visitor, NodeTransformer):
+                raise TypeError("NodeTransformer instances cannot be fused")
+        self.visitors = visitors
+
+    def visit(self, node: ast_models.ASTNode) -> None:
+        self._visit(node, self.visitors)
+
+    def _visit(self, node: ast_models.ASTNode, visitors) -> None:
+        # Each visitor only descends into the children of nodes it would have
+        # walked on its own: those without a handler and those whose handler
+        # called generic_visit().
+        descending = []
+        handled = []
+        for visitor in visitors:
+            handler = visitor._dispatch.get(node.node_type)
+            if handler is None:
+                descending.append(visitor)
+            else:
+                handled.append((visitor, handler))
+        self._run_handlers(node, handled, 0, descending)
+
+    def _run_handlers(self, node, handled, index, descending) -> None:
+        # The handlers are nested: generic_visit() in one runs the next ones,
+        # and the last walks the children, so code after generic_visit()
+        # sees the children visited just like in a separate run.
+        if index == len(handled):
+            if descending:
+                descending = tuple(descending)
+                for _, _, child in iter_child_nodes(node):
+                    self._visit(child, descending)
+            return
+        visitor, handler = handled[index]
+        call = _FusedCall(
+            visitor,
+            node,
+            lambda: self._run_handlers(
+                node, handled, index + 1, descending + [visitor]
+            ),
+        )
+        token = _fused_call.set(call)
+        try:
+            handler(visitor, node)
+        finally:
+            _fused_call.reset(token)
+        if call.resume is not None:
+            self._run_handlers(node, handled, index + 1, descending)
+
+
+def visit_fused(node: ast_models.ASTNode, visitors: List[NodeVisitor]) -> None:
+    FusedVisitor(*visitors).visit(node)
@@ -0,0 +1,63 @@
+import io
+import sys
+import timeit
+from os import listdir
+from os.path import dirname, isfile, join
+
+import solcx
+
+from solc_ast_parser.models.ast_models import SourceUnit
+from solc_ast_parser.models.base_ast_models import SolidityConfig
+
+CONTRACT_PATH = join(dirname(__file__), "..", "examples")
+
+
+def build_ast(contract_filename):
+    with open(join(CONTRACT_PATH, contract_filename)) as f:
+        source_code = f.read()
+    suggested_version = solcx.install.select_pragma_version(
+        source_code, solcx.get_installable_solc_versions()
+    )
+    solc_output = solcx.compile_source(source_code, solc_version=suggested_version)
+    contract_name = list(solc_output.keys())[0]
+    return SourceUnit(**solc_output[contract_name]["ast"])
+
+
+def best_of(function, number):
+    return min(timeit.repeat(function, number=number, repeat=5)) / number
+
+
+def main(number=50):
+    solcx.install_solc()
+    contracts = sorted(
+        f
+        for f in listdir(CONTRACT_PATH)
+        if isfile(join(CONTRACT_PATH, f)) and f.endswith(".sol")
+    )
+    cached = SolidityConfig(render_cache=True)
+    print(f"{'contract':40} {'to_solidity':>12} {'stream':>12} {'cached':>12}")
+    totals = [0.0, 0.0, 0.0]
+    for contract_filename in contracts:
+        ast = build_ast(contract_filename)
+        expected = ast.to_solidity()
+        stream = io.StringIO()
+        ast.write_solidity(stream)
+        # Every mode must produce the same bytes.
+        assert stream.getvalue() == expected, contract_filename
+        assert ast.to_solidity(config=cached) == expected, contract_filename
+
+        timings = [
+            best_of(ast.to_solidity, number),
+            best_of(lambda: ast.write_solidity(io.StringIO()), number),
+            best_of(lambda: ast.to_solidity(config=cached), number),
+        ]
+        totals = [total + timing for total, timing in zip(totals, timings)]
+        print(
+            f"{contract_filename:40} "
+            + " ".join(f"{timing * 1e3:10.3f}ms" for timing in timings)
+        )
+    print(f"{'total':40} " + " ".join(f"{total * 1e3:10.3f}ms" for total in totals))
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -2,7 +2,11 @@ from os.path import isfile, join, dirname
 from os import listdir
 import unittest
 import solcx
-from solc_ast_parser.comments import insert_comments_into_ast
+from solc_ast_parser.comments import (
+    CommentScanner,
+    find_comments,
+    insert_comments_into_ast,
+)
 from solc_ast_parser.utils import (
     create_ast_with_standart_input,
 )
@@ -46,5 +50,41 @@ class AstToSourceTestCase(unittest.TestCase):
         self.assertEqual(source, generated)
 
 
+class CommentScannerTestCase(unittest.TestCase):
+    SOURCE = (
+        "// SPDX\n"
+        'string url = "http://example.com"; // link\n'
+        "bytes c = 'it\\'s // not';\n"
+        "/* block // inside */ x = 1; // a // b\n"
+    )
+
+    def test_strings_and_blocks(self):
+        comments = find_comments(self.SOURCE)
+
+        self.assertEqual(
+            [(c.text, getattr(c, "is_pure", None)) for c in comments],
+            [
+                ("SPDX", True),
+                ("link", False),
+                ("/* block // inside */", None),
+                ("a // b", False),
+            ],
+        )
+
+    def test_chunked_input(self):
+        for size in (1, 2, 3, 7):
+            with self.subTest(size=size):
+                scanner = CommentScanner()
+                comments = []
+                for i in range(0, len(self.SOURCE), size):
+                    comments.extend(scanner.feed(self.SOURCE[i : i + size]))
+                comments.extend(scanner.close())
+
+                self.assertEqual(
+                    [(c.src, c.text) for c in comments],
+                    [(c.src, c.text) for c in find_comments(self.SOURCE)],
+                )
+
+
 if __name__ == "__main__":
     unittest.main()
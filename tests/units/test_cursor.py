@@ -0,0 +1,108 @@
+from os.path import join, dirname
+import unittest
+
+import solcx
+
+from solc_ast_parser.cursor import ParentMap, create_cursor
+from solc_ast_parser.enrichment import find_parent_nodes
+from solc_ast_parser.models.base_ast_models import NodeType
+from solc_ast_parser.utils import (
+    create_ast_with_standart_input,
+    find_node_with_properties,
+)
+
+CONTRACT_PATH = join(dirname(__file__), "..", "examples", "comments")
+
+
+class CursorTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        solcx.install_solc()
+        with open(join(CONTRACT_PATH, "GalacticHub.example.sol")) as f:
+            cls.source_code = f.read()
+
+    def setUp(self):
+        self.ast = create_ast_with_standart_input(
+            self.source_code, "GalacticHub.example.sol"
+        )
+        self.contract = find_node_with_properties(
+            self.ast, node_type=NodeType.CONTRACT_DEFINITION
+        )[0]
+
+    def test_parent_and_path(self):
+        withdraw = find_node_with_properties(
+            self.ast, node_type=NodeType.FUNCTION_DEFINITION, name="withdraw"
+        )[0]
+        statement = withdraw.body.statements[1]
+
+        cursor = create_cursor(self.ast, statement)
+
+        self.assertIs(cursor.parent.node, withdraw.body)
+        self.assertIs(cursor.parent.parent.node, withdraw)
+        self.assertEqual(
+            cursor.path,
+            (
+                ("nodes", self.ast.nodes.index(self.contract)),
+                ("nodes", self.contract.nodes.index(withdraw)),
+                ("body", None),
+                ("statements", 1),
+            ),
+        )
+        self.assertIsNone(cursor.parent_map.cursor().parent)
+
+    def test_siblings_navigation(self):
+        parent_map = ParentMap(self.ast)
+        first = parent_map.cursor(self.contract.nodes[0])
+
+        self.assertIsNone(first.prev)
+        self.assertIs(first.next.node, self.contract.nodes[1])
+        self.assertIs(first.next.prev.node, first.node)
+        self.assertEqual(len(first.siblings), len(self.contract.nodes) - 1)
+        self.assertNotIn(first, first.siblings)
+
+    def test_replace(self):
+        parent_map = ParentMap(self.ast)
+        deposit = find_node_with_properties(
+            self.ast, node_type=NodeType.FUNCTION_DEFINITION, name="deposit"
+        )[0]
+        transfer = find_node_with_properties(
+            self.ast, node_type=NodeType.FUNCTION_DEFINITION, name="transfer"
+        )[0]
+        replacement = transfer.model_copy(deep=True)
+
+        new_cursor = parent_map.cursor(deposit).replace(replacement)
+
+        self.assertIn(replacement, self.contract.nodes)
+        self.assertFalse(any(node is deposit for node in self.contract.nodes))
+        self.assertIs(new_cursor.parent.node, self.contract)
+        self.assertIs(parent_map.parent(replacement.body), replacement)
+
+    def test_replace_drops_old_subtree(self):
+        parent_map = ParentMap(self.ast)
+        deposit = find_node_with_properties(
+            self.ast, node_type=NodeType.FUNCTION_DEFINITION, name="deposit"
+        )[0]
+        statement = deposit.body.statements[0]
+        replacement = deposit.model_copy(update={"body": None})
+
+        parent_map.replace(deposit, replacement)
+
+        self.assertIsNone(parent_map.get(deposit.body.id))
+        self.assertIsNone(parent_map.get(statement.id))
+        self.assertNotIn(statement, parent_map)
+        self.assertIsNone(parent_map.parent(statement))
+        self.assertEqual(parent_map.path(statement), ())
+        self.assertIs(parent_map.get(deposit.id), replacement)
+
+    def test_find_parent_nodes(self):
+        owner_identifier = find_node_with_properties(
+            self.ast, node_type=NodeType.IDENTIFIER, name="owner"
+        )[0]
+        parents = find_parent_nodes(self.ast, owner_identifier)
+
+        self.assertEqual(len(parents), 1)
+        self.assertEqual(parents[0].node_type, NodeType.ASSIGNMENT)
+
+
+if __name__ == "__main__":
+    unittest.main()
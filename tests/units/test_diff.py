@@ -0,0 +1,93 @@
+from os.path import join, dirname
+import unittest
+
+import solcx
+
+from solc_ast_parser.diff import apply_edit_script, diff_ast
+from solc_ast_parser.hashing import structurally_equal
+from solc_ast_parser.models.base_ast_models import NodeType
+from solc_ast_parser.utils import (
+    create_ast_with_standart_input,
+    find_node_with_properties,
+    remove_node,
+)
+
+CONTRACT_PATH = join(dirname(__file__), "..", "examples", "comments")
+
+
+class DiffAstTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        solcx.install_solc()
+        with open(join(CONTRACT_PATH, "GalacticHub.example.sol")) as f:
+            cls.source_code = f.read()
+
+    def setUp(self):
+        self.ast = create_ast_with_standart_input(
+            self.source_code, "GalacticHub.example.sol"
+        )
+        self.other = create_ast_with_standart_input(
+            self.source_code, "GalacticHub.example.sol"
+        )
+
+    def find_function(self, ast, name):
+        return find_node_with_properties(
+            ast, node_type=NodeType.FUNCTION_DEFINITION, name=name
+        )[0]
+
+    def assert_replays(self, script):
+        self.assertTrue(apply_edit_script(self.ast, script))
+        self.assertTrue(structurally_equal(self.ast, self.other))
+
+    def test_identical_trees(self):
+        self.assertEqual(diff_ast(self.ast, self.other), [])
+
+    def test_rename_is_single_update(self):
+        self.find_function(self.other, "deposit").name = "depositFunds"
+
+        script = diff_ast(self.ast, self.other)
+
+        self.assertEqual(len(script), 1)
+        self.assertEqual(script[0].kind, "update")
+        self.assertEqual(script[0].node_id, self.find_function(self.ast, "deposit").id)
+        self.assertEqual(script[0].fields, {"name": "depositFunds"})
+        self.assert_replays(script)
+
+    def test_removed_statement(self):
+        statement = self.find_function(self.other, "withdraw").body.statements[0]
+        self.assertTrue(remove_node(self.other, statement.id))
+
+        script = diff_ast(self.ast, self.other)
+
+        self.assertEqual([operation.kind for operation in script], ["delete"])
+        self.assertEqual(script[0].node_id, statement.id)
+        self.assert_replays(script)
+
+    def test_moved_function(self):
+        contract = self.other.nodes[-1]
+        transfer = self.find_function(self.other, "transfer")
+        contract.nodes.remove(transfer)
+        contract.nodes.insert(0, transfer)
+
+        script = diff_ast(self.ast, self.other)
+
+        self.assertEqual([operation.kind for operation in script], ["move"])
+        self.assertEqual(script[0].node_id, transfer.id)
+        self.assert_replays(script)
+
+    def test_inserted_nodes_get_fresh_ids(self):
+        contract = self.other.nodes[-1]
+        deposit = self.find_function(self.other, "deposit")
+        copy = deposit.model_copy(deep=True)
+        copy.name = "depositAgain"
+        contract.nodes.append(copy)
+
+        script = diff_ast(self.ast, self.other)
+
+        self.assertEqual([operation.kind for operation in script], ["insert"])
+        self.assertNotEqual(script[0].node.id, deposit.id)
+        self.assert_replays(script)
+
+
+if __name__ == "__main__":
+    unittest.main()
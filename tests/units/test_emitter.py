@@ -0,0 +1,137 @@
+import io
+from os.path import isfile, join, dirname
+from os import listdir
+import unittest
+
+import solcx
+
+from solc_ast_parser.comments import insert_comments_into_ast
+from solc_ast_parser.emitter import (
+    SolidityEmitter,
+    render_with_source_map,
+    source_map_node_id,
+)
+from solc_ast_parser.models.ast_models import SourceUnit
+from solc_ast_parser.parallel import to_solidity_parallel
+from solc_ast_parser.models.base_ast_models import (
+    NodeType,
+    QuotePreference,
+    SolidityConfig,
+)
+from solc_ast_parser.utils import (
+    create_ast_with_standart_input,
+    find_node_with_properties,
+    update_node_fields,
+)
+
+CONTRACT_PATH = join(dirname(__file__), "..", "examples")
+
+
+class EmitterTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        solcx.install_solc()
+        cls.contracts = [
+            f
+            for f in listdir(CONTRACT_PATH)
+            if isfile(join(CONTRACT_PATH, f)) and f.endswith(".sol")
+        ]
+
+    def _build_ast(self, contract_filename):
+        with open(join(CONTRACT_PATH, contract_filename)) as f:
+            source_code = f.read()
+        suggested_version = solcx.install.select_pragma_version(
+            source_code, solcx.get_installable_solc_versions()
+        )
+        solc_output = solcx.compile_source(source_code, solc_version=suggested_version)
+        contract_name = list(solc_output.keys())[0]
+        return SourceUnit(**solc_output[contract_name]["ast"])
+
+    def test_write_solidity_matches_to_solidity(self):
+        config = SolidityConfig(quote_preference=QuotePreference.SINGLE)
+        for contract_filename in self.contracts:
+            with self.subTest(contract=contract_filename):
+                ast = self._build_ast(contract_filename)
+                stream = io.StringIO()
+
+                ast.write_solidity(stream, config=config)
+
+                self.assertEqual(stream.getvalue(), ast.to_solidity(config=config))
+
+    def test_parallel_matches_to_solidity(self):
+        config = SolidityConfig(quote_preference=QuotePreference.SINGLE)
+        for contract_filename in self.contracts:
+            with self.subTest(contract=contract_filename):
+                ast = self._build_ast(contract_filename)
+
+                self.assertEqual(
+                    to_solidity_parallel(ast, config, max_workers=2),
+                    ast.to_solidity(config=config),
+                )
+
+    def test_emit_with_comments(self):
+        with open(join(CONTRACT_PATH, "comments", "GalacticHub.example.sol")) as f:
+            source_code = f.read()
+        ast = create_ast_with_standart_input(source_code, "GalacticHub.example.sol")
+        ast = insert_comments_into_ast(source_code, ast)
+        emitter = SolidityEmitter()
+
+        for node in ast.nodes:
+            node.emit_solidity(emitter)
+
+        self.assertEqual(emitter.getvalue(), ast.to_solidity())
+        self.assertEqual(emitter.position, len(emitter.getvalue()))
+
+    def test_render_cache_follows_edits(self):
+        ast = self._build_ast("GalacticHub.example.sol")
+        cached = SolidityConfig(render_cache=True)
+        self.assertEqual(ast.to_solidity(config=cached), ast.to_solidity())
+
+        identifier = find_node_with_properties(
+            ast, node_type=NodeType.IDENTIFIER, name="feePercentage"
+        )[0]
+        update_node_fields(ast, {"id": identifier.id}, {"name": "platformFee"})
+
+        generated = ast.to_solidity(config=cached)
+        self.assertEqual(generated, ast.to_solidity())
+        self.assertIn("platformFee", generated)
+
+    def test_source_map(self):
+        ast = self._build_ast("GalacticHub.example.sol")
+        source, source_map = render_with_source_map(ast)
+        generated = source.encode()
+
+        self.assertEqual(source, ast.to_solidity())
+        self.assertEqual(list(source_map[:3]), [0, len(generated), ast.id])
+
+        function = find_node_with_properties(
+            ast, node_type=NodeType.FUNCTION_DEFINITION, name="setFeePercentage"
+        )[0]
+        statement = function.body.statements[-1]
+        offset = generated.index(b"feePercentage = newFee")
+        self.assertEqual(source_map_node_id(source_map, offset), statement.id)
+
+        cached = SolidityConfig(render_cache=True)
+        ast.to_solidity(config=cached)
+        for _ in range(2):
+            self.assertEqual(
+                render_with_source_map(ast, config=cached), (source, source_map)
+            )
+
+    def test_emitter_tracks_tail(self):
+        emitter = SolidityEmitter()
+        emitter.write("a = 1;")
+        start = emitter.position
+        emitter.write("\n")
+
+        self.assertFalse(emitter.ends_with(";\n", since=start))
+        self.assertTrue(emitter.ends_with(";\n"))
+        emitter.write("x /")
+        start = emitter.position
+        emitter.write("/ y")
+        self.assertFalse(emitter.has_line_comment(since=start))
+        self.assertTrue(emitter.has_line_comment(since=start - 3))
+
+
+if __name__ == "__main__":
+    unittest.main()
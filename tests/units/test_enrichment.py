@@ -0,0 +1,243 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import solcx
+
+from solc_ast_parser.enrichment import (
+    extract_type_name,
+    restore_contract_storages,
+    restore_function_definitions,
+    restore_storages,
+)
+from solc_ast_parser.models.base_ast_models import NodeType
+from solc_ast_parser.utils import create_ast_with_standart_input
+
+SOURCE = """
+pragma solidity ^0.8.0;
+
+contract Pool {
+    uint256 total;
+
+    function refund(address account) public {
+        credit(account);
+        notify(account);
+        require(total > 0);
+    }
+
+    function deposit(address account, uint256 amount) public {
+        credit(account, amount);
+        total = total + amount;
+    }
+}
+"""
+
+
+UNIT_SOURCE = """
+pragma solidity ^0.8.0;
+
+interface IToken {
+    function transfer(address to, uint256 amount) external;
+}
+
+contract Registry {
+    function register(address account) public {}
+}
+
+contract Vault {
+    address token;
+
+    function sweep(address account, uint256 amount) public {
+        register(account);
+        this.settle(amount);
+        bytes32 digest = keccak256(abi.encode(account, amount));
+        IToken(token).transfer(account, amount);
+        payable(account).transfer(amount);
+    }
+}
+
+contract Member is Registry {
+    function join() public {
+        register(msg.sender);
+    }
+}
+"""
+
+
+class RestoreFunctionDefinitionsTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        solcx.install_solc()
+
+    def test_one_stub_per_missing_function(self):
+        ast = create_ast_with_standart_input(SOURCE)
+        restored = [
+            (
+                function.name,
+                [
+                    (parameter.name, parameter.type_name.name)
+                    for parameter in function.parameters.parameters
+                ],
+            )
+            for function in restore_function_definitions(ast)
+        ]
+
+        # Both calls to credit make one stub, with the parameters of both.
+        self.assertEqual(
+            restored,
+            [
+                ("credit", [("account", "address"), ("amount", "uint256")]),
+                ("notify", [("account", "address")]),
+            ],
+        )
+
+    def test_stubs_per_contract(self):
+        ast = create_ast_with_standart_input(UNIT_SOURCE)
+        contracts = {node.id: node.name for node in ast.nodes}
+        restored = [
+            (
+                contracts[function.scope],
+                function.name,
+                [
+                    (parameter.name, parameter.type_name.name)
+                    for parameter in function.parameters.parameters
+                ],
+            )
+            for function in restore_function_definitions(ast)
+        ]
+
+        # Registry's register doesn't count for Vault, which doesn't inherit
+        # it; member calls other than through this and globals are skipped.
+        self.assertEqual(
+            restored,
+            [
+                ("Vault", "register", [("account", "address")]),
+                ("Vault", "settle", [("amount", "uint256")]),
+            ],
+        )
+
+
+STORAGES_SOURCE = """
+pragma solidity ^0.8.0;
+
+contract Vault {
+    function deposit(uint256 amount) public {
+        balances[amount] = amount;
+        account.balance = amount;
+        account.balance += amount;
+        orders[amount].price = amount;
+        owner.transfer(amount);
+        emit Deposited(owner, amount);
+        total = total + amount;
+    }
+}
+"""
+
+
+class RestoreStoragesTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        solcx.install_solc()
+
+    def test_restored_declarations(self):
+        ast = restore_storages(create_ast_with_standart_input(STORAGES_SOURCE))
+        contract = ast.nodes[-1]
+        restored = {}
+        for node in contract.nodes:
+            if node.node_type == NodeType.VARIABLE_DECLARATION:
+                restored[node.name] = extract_type_name(node.type_name)
+            elif node.node_type == NodeType.STRUCT_DEFINITION:
+                restored[node.name] = [member.name for member in node.members]
+            elif node.node_type == NodeType.EVENT_DEFINITION:
+                restored[node.name] = [
+                    extract_type_name(parameter.type_name)
+                    for parameter in node.parameters.parameters
+                ]
+
+        self.assertEqual(
+            restored,
+            {
+                "balances": "uint256[]",
+                # Accessed twice, declared once.
+                "Account": ["balance"],
+                "account": "Account",
+                "Orders": ["price"],
+                "orders": "Orders[]",
+                "owner": "address",
+                "Deposited": ["uint256", "uint256"],
+                "total": "uint256",
+            },
+        )
+        self.assertEqual(
+            [node.name for node in contract.nodes],
+            [
+                "Orders",
+                "Account",
+                "balances",
+                "Deposited",
+                "orders",
+                "owner",
+                "total",
+                "account",
+                "deposit",
+            ],
+        )
+
+
+CONTRACTS_SOURCE = """
+pragma solidity ^0.8.0;
+
+contract Base {
+    uint256 shared;
+}
+
+contract Vault is Base {
+    function deposit() public {
+        balance = balance + shared;
+    }
+}
+
+contract Token {
+    function mint() public {
+        supply = supply + 1;
+    }
+}
+"""
+
+
+class RestoreContractStoragesTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        solcx.install_solc()
+
+    def restored_names(self, ast):
+        return {
+            contract.name: [
+                node.name
+                for node in contract.nodes
+                if node.node_type == NodeType.VARIABLE_DECLARATION
+            ]
+            for contract in ast.nodes
+            if contract.node_type == NodeType.CONTRACT_DEFINITION
+        }
+
+    def test_each_contract_gets_its_declarations(self):
+        ast = restore_contract_storages(
+            create_ast_with_standart_input(CONTRACTS_SOURCE)
+        )
+
+        self.assertEqual(
+            self.restored_names(ast),
+            {"Base": ["shared"], "Vault": ["balance"], "Token": ["supply"]},
+        )
+
+    def test_executor_does_not_change_the_result(self):
+        serial = restore_contract_storages(
+            create_ast_with_standart_input(CONTRACTS_SOURCE)
+        )
+        with ThreadPoolExecutor(2) as executor:
+            threaded = restore_contract_storages(
+                create_ast_with_standart_input(CONTRACTS_SOURCE), executor
+            )
+
+        self.assertEqual(threaded.to_solidity(), serial.to_solidity())
+        self.assertEqual(threaded, serial)
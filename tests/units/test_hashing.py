@@ -0,0 +1,106 @@
+from os.path import join, dirname
+import unittest
+
+import solcx
+
+from solc_ast_parser.hashing import structurally_equal, subtree_hash, unique_nodes
+from solc_ast_parser.models.base_ast_models import NodeType, SolidityConfig
+from solc_ast_parser.utils import (
+    create_ast_with_standart_input,
+    find_node_with_properties,
+    remove_node,
+    update_node_fields,
+)
+
+CONTRACT_PATH = join(dirname(__file__), "..", "examples", "comments")
+
+
+class SubtreeHashTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        solcx.install_solc()
+        with open(join(CONTRACT_PATH, "GalacticHub.example.sol")) as f:
+            cls.source_code = f.read()
+
+    def setUp(self):
+        self.ast = create_ast_with_standart_input(
+            self.source_code, "GalacticHub.example.sol"
+        )
+        self.other = create_ast_with_standart_input(
+            self.source_code, "GalacticHub.example.sol"
+        )
+
+    def find_function(self, ast, name):
+        return find_node_with_properties(
+            ast, node_type=NodeType.FUNCTION_DEFINITION, name=name
+        )[0]
+
+    def test_ignores_ids_and_src(self):
+        deposit = self.find_function(self.other, "deposit")
+        deposit.id += 1000
+        deposit.src = "0:0:0"
+
+        self.assertTrue(structurally_equal(self.ast, self.other))
+        self.assertFalse(
+            structurally_equal(
+                self.find_function(self.ast, "deposit"),
+                self.find_function(self.ast, "withdraw"),
+            )
+        )
+
+    def test_ignore_names(self):
+        update_node_fields(
+            self.other,
+            {"node_type": NodeType.IDENTIFIER, "name": "owner"},
+            {"name": "admin"},
+        )
+
+        self.assertFalse(structurally_equal(self.ast, self.other))
+        self.assertTrue(structurally_equal(self.ast, self.other, ignore_names=True))
+
+    def test_edit_invalidates_ancestor_path(self):
+        withdraw = self.find_function(self.other, "withdraw")
+        deposit = self.find_function(self.other, "deposit")
+        root_hash = subtree_hash(self.other)
+        withdraw_hash = subtree_hash(withdraw)
+        deposit_hash = subtree_hash(deposit)
+
+        self.assertTrue(remove_node(self.other, withdraw.body.statements[0].id))
+
+        self.assertNotEqual(subtree_hash(self.other), root_hash)
+        self.assertNotEqual(subtree_hash(withdraw), withdraw_hash)
+        self.assertIn(("subtree_hash", False), deposit._cache)
+        self.assertEqual(subtree_hash(deposit), deposit_hash)
+
+    def test_cache_does_not_affect_equality(self):
+        subtree_hash(self.ast)
+
+        self.assertEqual(self.ast, self.other)
+
+    def test_copies_do_not_share_cache(self):
+        config = SolidityConfig(render_cache=True)
+        deposit = self.find_function(self.ast, "deposit")
+        deposit_hash = subtree_hash(deposit)
+        rendered = deposit.to_solidity(config=config)
+
+        renamed = deposit.model_copy(update={"name": "renamed"})
+        copied_ast = self.ast.model_copy()
+
+        self.assertNotEqual(subtree_hash(renamed), deposit_hash)
+        self.assertFalse(structurally_equal(deposit, renamed))
+        self.assertIn("function renamed", renamed.to_solidity(config=config))
+        self.assertEqual(deposit.to_solidity(config=config), rendered)
+        self.assertIsNot(copied_ast._id_allocator, self.ast._id_allocator)
+
+    def test_unique_nodes(self):
+        functions = find_node_with_properties(
+            self.ast, node_type=NodeType.FUNCTION_DEFINITION
+        )
+        duplicate = functions[1].model_copy(deep=True)
+        duplicate.id = -1
+
+        self.assertEqual(unique_nodes(functions + [duplicate]), functions)
+
+
+if __name__ == "__main__":
+    unittest.main()
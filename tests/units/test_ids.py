@@ -0,0 +1,131 @@
+from concurrent.futures import ThreadPoolExecutor
+from os.path import join, dirname
+import unittest
+
+import solcx
+
+from solc_ast_parser.comments import insert_comments_into_ast
+from solc_ast_parser.emitter import render_with_source_map
+from solc_ast_parser.enrichment import create_elementary_type, create_storage_declaration
+from solc_ast_parser.ids import id_allocator, max_node_id, new_id, renumber_ids
+from solc_ast_parser.models.base_ast_models import NodeType, SolidityConfig
+from solc_ast_parser.utils import (
+    create_ast_with_standart_input,
+    find_node_with_properties,
+    insert_node,
+    traverse_ast,
+)
+
+CONTRACT_PATH = join(dirname(__file__), "..", "examples", "comments")
+
+
+class IdAllocatorTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        solcx.install_solc()
+        with open(join(CONTRACT_PATH, "GalacticHub.example.sol")) as f:
+            cls.source_code = f.read()
+
+    def setUp(self):
+        self.ast = create_ast_with_standart_input(
+            self.source_code, "GalacticHub.example.sol"
+        )
+
+    def collect_ids(self, ast):
+        ids = []
+        traverse_ast(
+            ast,
+            lambda node, parent: ids.append(node.id)
+            if isinstance(getattr(node, "id", None), int) and node.id >= 0
+            else None,
+        )
+        return ids
+
+    def test_allocator_is_seeded_from_max_id(self):
+        highest = max_node_id(self.ast)
+        ids = id_allocator(self.ast)
+
+        self.assertIs(id_allocator(self.ast), ids)
+        self.assertEqual(ids.allocate(), highest + 1)
+        self.assertEqual(ids.allocate(), highest + 2)
+
+    def test_builders_do_not_collide(self):
+        ids = id_allocator(self.ast)
+        existing = set(self.collect_ids(self.ast))
+        declaration = create_storage_declaration(
+            "counter", create_elementary_type("uint256", ids=ids), ids=ids
+        )
+
+        self.assertNotIn(declaration.id, existing)
+        self.assertNotIn(declaration.type_name.id, existing)
+
+    def test_insert_reserves_ids(self):
+        ids = id_allocator(self.ast)
+        contract = self.ast.nodes[-1]
+        declaration = create_storage_declaration(
+            "counter", create_elementary_type("uint256")
+        )
+        declaration.id = ids.next_id + 100
+
+        self.assertTrue(insert_node(self.ast, contract.nodes[0].id, declaration))
+        self.assertGreater(ids.allocate(), declaration.id)
+
+    def test_comments_use_allocator(self):
+        existing = set(self.collect_ids(self.ast))
+        ast = insert_comments_into_ast(self.source_code, self.ast)
+        comment_ids = [
+            node.id
+            for node in find_node_with_properties(ast, node_type=NodeType.COMMENT)
+        ]
+
+        self.assertTrue(comment_ids)
+        self.assertFalse(existing & set(comment_ids))
+        self.assertEqual(len(comment_ids), len(set(comment_ids)))
+
+    def test_renumber_ids(self):
+        contract = self.ast.nodes[-1]
+        identifier = find_node_with_properties(
+            self.ast, node_type=NodeType.IDENTIFIER, name="owner"
+        )[0]
+        owner = find_node_with_properties(
+            self.ast, node_type=NodeType.VARIABLE_DECLARATION, name="owner"
+        )[0]
+        # Parsing-only output carries no references, so add a couple.
+        identifier.referenced_declaration = owner.id
+        contract.nodes[0].scope = contract.id
+        old_owner_id = owner.id
+
+        mapping = renumber_ids(self.ast)
+
+        ids = self.collect_ids(self.ast)
+        self.assertEqual(sorted(ids), list(range(len(ids))))
+        self.assertEqual(mapping[old_owner_id], owner.id)
+        self.assertEqual(identifier.referenced_declaration, owner.id)
+        self.assertEqual(contract.nodes[0].scope, contract.id)
+        self.assertEqual(id_allocator(self.ast).allocate(), len(ids))
+
+    def test_renumber_ids_refreshes_cached_source_maps(self):
+        cached = SolidityConfig(render_cache=True)
+        render_with_source_map(self.ast, config=cached)
+
+        renumber_ids(self.ast, start=1000)
+
+        _, source_map = render_with_source_map(self.ast, config=cached)
+        self.assertEqual(source_map, render_with_source_map(self.ast)[1])
+        # Yul nodes keep their negative ids, everything else was renumbered.
+        self.assertTrue(
+            all(node_id >= 1000 or node_id < 0 for node_id in source_map[2::3])
+        )
+
+    def test_detached_ids_across_threads(self):
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            batches = list(
+                executor.map(lambda _: [new_id() for _ in range(500)], range(16))
+            )
+        ids = [node_id for batch in batches for node_id in batch]
+
+        self.assertEqual(len(ids), len(set(ids)))
+
+
+if __name__ == "__main__":
+    unittest.main()
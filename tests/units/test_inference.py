@@ -0,0 +1,134 @@
+import unittest
+
+import solcx
+
+from solc_ast_parser.enrichment import (
+    TypeInference,
+    extract_expression_type,
+    infer_types,
+    type_inference,
+)
+from solc_ast_parser.models.base_ast_models import NodeType
+from solc_ast_parser.utils import (
+    create_ast_from_source,
+    create_ast_with_standart_input,
+    find_node_with_properties,
+    traverse_ast,
+    update_node_fields,
+)
+
+SOURCE = """
+pragma solidity ^0.8.0;
+
+contract Ledger {
+    struct Entry {
+        uint256 amount;
+        address owner;
+    }
+
+    mapping(address => uint256) balances;
+    uint256[] history;
+    Entry[] entries;
+    mapping(address => Entry) latest;
+    bytes data;
+
+    function record(address account, uint256 amount) public {
+        balances[account] += amount * 2;
+        history.push(amount);
+        entries.push(Entry(amount, msg.sender));
+        latest[account] = entries[entries.length - 1];
+        uint256 last = latest[account].amount + history[0];
+        address owner = entries[0].owner;
+        bytes1 first = data[0];
+        balances[owner] = last + uint8(first);
+    }
+}
+"""
+
+
+class TypeInferenceTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        solcx.install_solc()
+
+    def test_type_descriptions(self):
+        ast = create_ast_from_source(SOURCE)
+        types = infer_types(ast)
+        index_access = find_node_with_properties(
+            ast, node_type=NodeType.INDEX_ACCESS
+        )[0]
+        literal = find_node_with_properties(ast, node_type=NodeType.LITERAL)[0]
+        history = find_node_with_properties(
+            ast, node_type=NodeType.IDENTIFIER, name="history"
+        )[0]
+
+        self.assertEqual(types[index_access.id], "uint256")
+        self.assertEqual(types[literal.id], "uint256")
+        self.assertEqual(types[history.id], "uint256[]")
+
+    def test_declaration_fallback(self):
+        # Parsed-only ASTs carry no type descriptions.
+        ast = create_ast_with_standart_input(SOURCE)
+        inference = TypeInference(ast)
+        operation = find_node_with_properties(
+            ast, node_type=NodeType.BINARY_OPERATION
+        )[0]
+        index_access = find_node_with_properties(
+            ast, node_type=NodeType.INDEX_ACCESS
+        )[0]
+
+        self.assertEqual(inference.infer(operation), "uint256")
+        self.assertEqual(inference.infer(index_access), "uint256")
+
+    def test_engine_is_shared_until_edited(self):
+        ast = create_ast_with_standart_input(SOURCE)
+        inference = type_inference(ast)
+        identifiers = find_node_with_properties(ast, node_type=NodeType.IDENTIFIER)
+
+        types = [extract_expression_type(ast, node) for node in identifiers]
+
+        self.assertIs(type_inference(ast), inference)
+        self.assertEqual(types, [inference.infer(node) for node in identifiers])
+        self.assertEqual(infer_types(ast, inference=inference), infer_types(ast))
+
+        update_node_fields(
+            ast,
+            {"node_type": NodeType.VARIABLE_DECLARATION, "name": "last"},
+            {"name": "total"},
+        )
+        self.assertIsNot(type_inference(ast), inference)
+
+    def test_fallback_agrees_with_type_descriptions(self):
+        compiled = self.types_by_src(create_ast_from_source(SOURCE))
+        fallback = self.types_by_src(create_ast_with_standart_input(SOURCE))
+        shared = compiled.keys() & fallback.keys()
+
+        self.assertEqual(
+            {key: fallback[key] for key in shared},
+            {key: compiled[key] for key in shared},
+        )
+        accesses = {
+            key
+            for key in shared
+            if key[1] in (NodeType.INDEX_ACCESS, NodeType.MEMBER_ACCESS)
+        }
+        self.assertEqual(
+            sorted(compiled[key] for key in accesses),
+            sorted(
+                ["uint256"] * 5
+                + ["address"] * 2
+                + ["Ledger.Entry"] * 4
+                + ["bytes1"]
+            ),
+        )
+
+    def types_by_src(self, ast):
+        # Compiled and parsed-only nodes are matched by their source span.
+        types = infer_types(ast)
+        nodes = []
+        traverse_ast(ast, lambda node, parent: nodes.append(node))
+        return {
+            (node.src, node.node_type): types[node.id]
+            for node in nodes
+            if getattr(node, "id", None) in types
+        }
@@ -0,0 +1,96 @@
+import unittest
+
+import solcx
+
+from solc_ast_parser.models.base_ast_models import NodeType
+from solc_ast_parser.natspec import NatSpecIndex, natspec, parse_natspec
+from solc_ast_parser.utils import (
+    create_ast_with_standart_input,
+    find_node_with_properties,
+    update_node_fields,
+)
+
+SOURCE = """
+pragma solidity ^0.8.0;
+
+/// @title Vault
+/// @author ReinforcedAI
+contract Vault {
+    /// @notice Emitted on every deposit
+    event Deposited(address from, uint256 amount);
+
+    /**
+     * @notice Deposit funds
+     * into the vault
+     * @dev Emits Deposited
+     * @param amount The amount to deposit
+     * @return ok Whether it succeeded
+     */
+    function deposit(uint256 amount) public returns (bool ok) {
+        emit Deposited(msg.sender, amount);
+        return true;
+    }
+}
+"""
+
+
+class NatSpecTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        solcx.install_solc()
+
+    def setUp(self):
+        self.ast = create_ast_with_standart_input(SOURCE)
+
+    def test_parse_natspec(self):
+        spec = parse_natspec(
+            "Untagged notice\n@param to The receiver\n@custom:risk low"
+        )
+
+        self.assertEqual(spec.notice, "Untagged notice")
+        self.assertEqual(spec.params, {"to": "The receiver"})
+        self.assertEqual(spec.custom, {"risk": "low"})
+
+    def test_documented_nodes(self):
+        contract = find_node_with_properties(
+            self.ast, node_type=NodeType.CONTRACT_DEFINITION
+        )[0]
+        function = find_node_with_properties(
+            self.ast, node_type=NodeType.FUNCTION_DEFINITION, name="deposit"
+        )[0]
+
+        self.assertEqual(natspec(contract).title, "Vault")
+        spec = natspec(function)
+        self.assertIs(natspec(function), spec)
+        self.assertEqual(spec.notice, "Deposit funds\ninto the vault")
+        self.assertEqual(spec.dev, "Emits Deposited")
+        self.assertEqual(spec.params, {"amount": "The amount to deposit"})
+        self.assertEqual(spec.returns, ["ok Whether it succeeded"])
+
+    def test_index(self):
+        index = NatSpecIndex([self.ast])
+
+        self.assertEqual(
+            [node.node_type for node in index.nodes("notice")],
+            [NodeType.EVENT_DEFINITION, NodeType.FUNCTION_DEFINITION],
+        )
+        self.assertEqual(index.nodes("param", name="amount")[0].name, "deposit")
+        self.assertEqual(index.nodes("param", name="missing"), [])
+
+    def test_edit_reparses(self):
+        function = find_node_with_properties(
+            self.ast, node_type=NodeType.FUNCTION_DEFINITION, name="deposit"
+        )[0]
+        natspec(function)
+
+        update_node_fields(
+            self.ast,
+            {"id": function.documentation.id},
+            {"text": "@notice Changed"},
+        )
+
+        self.assertEqual(natspec(function).notice, "Changed")
+
+
+if __name__ == "__main__":
+    unittest.main()
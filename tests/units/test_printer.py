@@ -0,0 +1,73 @@
+from os.path import join, dirname
+import unittest
+
+import solcx
+
+from solc_ast_parser.ids import id_allocator
+from solc_ast_parser.models.base_ast_models import NodeType
+from solc_ast_parser.printer import SourcePrinter
+from solc_ast_parser.utils import (
+    create_ast_with_standart_input,
+    find_node_with_properties,
+    insert_node,
+    remove_node,
+    update_node_fields,
+)
+
+CONTRACT_PATH = join(dirname(__file__), "..", "examples", "comments")
+
+
+class SourcePrinterTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        solcx.install_solc()
+        with open(join(CONTRACT_PATH, "GalacticHub.example.sol")) as f:
+            cls.source_code = f.read()
+
+    def setUp(self):
+        self.ast = create_ast_with_standart_input(
+            self.source_code, "GalacticHub.example.sol"
+        )
+        self.printer = SourcePrinter(self.ast, self.source_code)
+
+    def _function(self, name):
+        return find_node_with_properties(
+            self.ast, node_type=NodeType.FUNCTION_DEFINITION, name=name
+        )[0]
+
+    def test_unchanged_source(self):
+        self.assertEqual(self.printer.to_solidity(), self.source_code)
+
+    def test_rename_keeps_formatting(self):
+        statement = self._function("setFeePercentage").body.statements[-1]
+        identifier = statement.expression.left_hand_side
+        update_node_fields(self.ast, {"id": identifier.id}, {"name": "platformFee"})
+
+        self.assertEqual(
+            self.printer.to_solidity(),
+            self.source_code.replace("feePercentage = newFee", "platformFee = newFee"),
+        )
+
+    def test_insert_and_remove_statements(self):
+        body = self._function("deposit").body
+        statement = body.statements[-1]
+        copy = statement.model_copy(deep=True)
+        copy.id = id_allocator(self.ast).allocate()
+        insert_node(self.ast, statement.id, copy, "after")
+        line = "        totalSupply += msg.value;\n"
+
+        self.assertEqual(
+            self.printer.to_solidity(),
+            self.source_code.replace(line, line + line),
+        )
+
+        remove_node(self.ast, copy.id)
+        remove_node(self.ast, statement.id)
+
+        self.assertEqual(
+            self.printer.to_solidity(), self.source_code.replace(line, "", 1)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
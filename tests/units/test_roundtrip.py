@@ -0,0 +1,53 @@
+from os.path import join, dirname
+import unittest
+
+import solcx
+
+from solc_ast_parser.models.base_ast_models import NodeType
+from solc_ast_parser.roundtrip import (
+    check_file,
+    compile_source_unit,
+    find_contracts,
+    mismatched_node_types,
+    run_round_trip,
+)
+from solc_ast_parser.utils import find_node_with_properties, update_node_fields
+
+CONTRACT_PATH = join(dirname(__file__), "..", "examples")
+
+
+class RoundTripTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        solcx.install_solc()
+
+    def test_simple_storage_round_trip(self):
+        result = check_file(join(CONTRACT_PATH, "SimpleStorage.example.sol"))
+
+        self.assertEqual(result.status, "ok", result.error)
+        self.assertEqual(result.mismatched_node_types, [])
+
+    def test_mismatch_reports_node_type(self):
+        with open(join(CONTRACT_PATH, "GalacticHub.example.sol")) as f:
+            source_code = f.read()
+        original = compile_source_unit(source_code, "GalacticHub.example.sol")
+        changed = compile_source_unit(source_code, "GalacticHub.example.sol")
+        identifier = find_node_with_properties(
+            changed, node_type=NodeType.IDENTIFIER, name="feePercentage"
+        )[0]
+        update_node_fields(changed, {"id": identifier.id}, {"name": "platformFee"})
+
+        self.assertEqual(mismatched_node_types(original, original), [])
+        self.assertEqual(mismatched_node_types(original, changed), ["Identifier"])
+
+    def test_run_over_examples(self):
+        paths = find_contracts([CONTRACT_PATH])
+        report = run_round_trip(paths, max_workers=2)
+
+        self.assertEqual(len(report.results), len(paths))
+        self.assertEqual(report.statuses["render_error"], 0)
+        self.assertIn("files/s", report.summary())
+
+
+if __name__ == "__main__":
+    unittest.main()
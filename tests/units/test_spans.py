@@ -0,0 +1,88 @@
+from os.path import join, dirname
+import unittest
+
+import solcx
+
+from solc_ast_parser.models.base_ast_models import NodeType
+from solc_ast_parser.spans import SourceIndex, parse_src
+from solc_ast_parser.utils import create_ast_with_standart_input
+
+CONTRACT_PATH = join(dirname(__file__), "..", "examples", "comments")
+
+
+class SourceIndexTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        solcx.install_solc()
+        with open(join(CONTRACT_PATH, "GalacticHub.example.sol")) as f:
+            cls.source_code = f.read()
+
+    def setUp(self):
+        self.ast = create_ast_with_standart_input(
+            self.source_code, "GalacticHub.example.sol"
+        )
+        self.index = SourceIndex(self.ast)
+
+    def test_node_at(self):
+        offset = self.source_code.index("feePercentage = newFee")
+
+        node = self.index.node_at(offset)
+
+        self.assertEqual(node.node_type, NodeType.IDENTIFIER)
+        self.assertEqual(node.name, "feePercentage")
+        self.assertEqual(
+            [n.node_type for n in self.index.ancestors(node)][:3],
+            [NodeType.ASSIGNMENT, NodeType.EXPRESSION_STATEMENT, NodeType.BLOCK],
+        )
+        self.assertIs(self.index.node_at(len(self.source_code) + 10), None)
+
+    def test_nodes_in_range(self):
+        start = self.source_code.index("function deposit")
+        end = self.source_code.index("/* Withdraw")
+
+        nodes = self.index.nodes_in_range(start, end)
+
+        self.assertEqual(nodes[0].node_type, NodeType.FUNCTION_DEFINITION)
+        self.assertEqual(nodes[0].name, "deposit")
+        for node in nodes:
+            node_start, length, _ = parse_src(node.src)
+            self.assertGreaterEqual(node_start, start)
+            self.assertLessEqual(node_start + length, end)
+
+    def test_next_node(self):
+        offset = self.source_code.index("// Deposit funds")
+
+        node = self.index.next_node(offset)
+
+        self.assertEqual(node.node_type, NodeType.FUNCTION_DEFINITION)
+        self.assertEqual(node.name, "deposit")
+
+    def test_next_nodes_matches_next_node(self):
+        offsets = sorted(
+            {self.source_code.index(text) for text in ("// Deposit", "/* Withdraw")}
+            | set(range(0, len(self.source_code), 37))
+        )
+
+        for by_end in (False, True):
+            self.assertEqual(
+                self.index.next_nodes(offsets, by_end=by_end),
+                [self.index.next_node(offset, by_end=by_end) for offset in offsets],
+            )
+        with self.assertRaises(ValueError):
+            self.index.next_nodes([10, 5])
+
+    def test_add_and_remove(self):
+        contract = self.ast.nodes[-1]
+        function = contract.nodes[-1]
+        size = len(self.index)
+
+        self.assertTrue(self.index.remove(function))
+        self.assertNotIn(function, self.index)
+        self.assertEqual(len(self.index), size - 1)
+        self.index.add(function, contract)
+        self.assertIs(self.index.parent(function), contract)
+        self.assertEqual(len(self.index), size)
+
+
+if __name__ == "__main__":
+    unittest.main()
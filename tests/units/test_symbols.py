@@ -0,0 +1,103 @@
+import unittest
+
+import solcx
+
+from solc_ast_parser.enrichment import extract_expression_type
+from solc_ast_parser.models.base_ast_models import NodeType
+from solc_ast_parser.symbols import ReferenceResolver, SymbolTable
+from solc_ast_parser.utils import (
+    create_ast_from_source,
+    create_ast_with_standart_input,
+    find_node_with_properties,
+)
+
+SOURCE = """
+pragma solidity ^0.8.0;
+
+contract Base {
+    uint256 inherited;
+}
+
+contract Shadowing is Base {
+    address owner;
+    uint256 total;
+
+    function run(uint8 total) public returns (uint256) {
+        uint256 before = total;
+        {
+            bool total = true;
+            before += total ? 1 : 0;
+        }
+        address admin = owner;
+        uint256 owner = 1;
+        return before + inherited + owner;
+    }
+}
+"""
+
+
+class SymbolTableTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        solcx.install_solc()
+
+    def setUp(self):
+        self.ast = create_ast_with_standart_input(SOURCE)
+        self.symbols = SymbolTable(self.ast)
+
+    def identifiers(self, name):
+        return find_node_with_properties(
+            self.ast, node_type=NodeType.IDENTIFIER, name=name
+        )
+
+    def test_innermost_declaration_wins(self):
+        parameter, local = self.identifiers("total")
+
+        self.assertEqual(
+            self.symbols.lookup("total", parameter).type_name.name, "uint8"
+        )
+        self.assertEqual(self.symbols.lookup("total", local).type_name.name, "bool")
+        self.assertEqual(extract_expression_type(self.ast, local, self.symbols), "bool")
+
+    def test_locals_are_visible_after_their_statement(self):
+        state_variable, local = self.identifiers("owner")
+
+        self.assertEqual(
+            self.symbols.lookup("owner", state_variable).type_name.name, "address"
+        )
+        self.assertEqual(self.symbols.lookup("owner", local).type_name.name, "uint256")
+
+    def test_inherited_and_global_names(self):
+        identifier = self.identifiers("inherited")[0]
+        declaration = self.symbols.lookup("inherited", identifier)
+
+        self.assertEqual(declaration.node_type, NodeType.VARIABLE_DECLARATION)
+        self.assertEqual(
+            self.symbols.lookup("Base").node_type, NodeType.CONTRACT_DEFINITION
+        )
+        self.assertEqual(len(self.symbols.declarations("total")), 3)
+        self.assertIsNone(self.symbols.lookup("missing", identifier))
+
+    def test_referenced_declarations(self):
+        self.ast = create_ast_from_source(SOURCE)
+        resolver = ReferenceResolver(self.ast)
+        _, local = self.identifiers("total")
+        specifier = find_node_with_properties(
+            self.ast, node_type=NodeType.INHERITANCE_SPECIFIER
+        )[0]
+
+        self.assertEqual(resolver.resolve(local).type_name.name, "bool")
+        self.assertEqual(resolver.resolve(specifier.base_name).name, "Base")
+        # Compiled references never need the name lookup.
+        self.assertIsNone(resolver._symbols)
+
+    def test_name_fallback(self):
+        # Parsed-only ASTs carry no referenced declarations.
+        resolver = ReferenceResolver(self.ast)
+        _, local = self.identifiers("owner")
+        specifier = find_node_with_properties(
+            self.ast, node_type=NodeType.INHERITANCE_SPECIFIER
+        )[0]
+
+        self.assertEqual(resolver.resolve(local).type_name.name, "uint256")
+        self.assertEqual(resolver.resolve(specifier.base_name).name, "Base")
@@ -0,0 +1,153 @@
+import random
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import solcx
+
+from solc_ast_parser.models.base_ast_models import NodeType, SolidityConfig
+from solc_ast_parser.utils import (
+    create_ast_with_standart_input,
+    shuffle_all_nodes_randomly,
+    shuffle_functions_and_storages,
+)
+from solc_ast_parser.variants import generate_variants, variant_rng
+
+SOURCE = """
+pragma solidity ^0.8.0;
+
+contract Vault {
+    address owner;
+    uint256 total;
+    mapping(address => uint256) balances;
+
+    event Deposited(address from, uint256 amount);
+
+    function deposit(uint256 amount) public {
+        balances[msg.sender] += amount;
+        total += amount;
+    }
+
+    function withdraw(uint256 amount) public {
+        balances[msg.sender] -= amount;
+        total -= amount;
+    }
+
+    function balance() public view returns (uint256) {
+        return balances[msg.sender];
+    }
+}
+"""
+
+
+class GenerateVariantsTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        solcx.install_solc()
+
+    def setUp(self):
+        self.ast = create_ast_with_standart_input(SOURCE)
+
+    def member_ids(self, ast):
+        contract = ast.nodes[-1]
+        self.assertEqual(contract.node_type, NodeType.CONTRACT_DEFINITION)
+        return [node.id for node in contract.nodes]
+
+    def test_original_is_untouched(self):
+        source = self.ast.to_solidity()
+        ids = self.member_ids(self.ast)
+
+        variants = list(
+            generate_variants(self.ast, 5, ops=["shuffle_all_nodes"], seed=1)
+        )
+
+        self.assertEqual(len(variants), 5)
+        self.assertEqual(self.ast.to_solidity(), source)
+        self.assertEqual(self.member_ids(self.ast), ids)
+        for variant in variants:
+            self.assertEqual(sorted(self.member_ids(variant)), sorted(ids))
+
+    def test_members_are_shared(self):
+        variant = next(generate_variants(self.ast, 1, seed=1))
+        contract, original = variant.nodes[-1], self.ast.nodes[-1]
+
+        self.assertIsNot(contract, original)
+        self.assertEqual(
+            {id(node) for node in contract.nodes},
+            {id(node) for node in original.nodes},
+        )
+
+    def test_seeded_streams(self):
+        first = [
+            self.member_ids(variant)
+            for variant in generate_variants(
+                self.ast, 4, ops=["shuffle_all_nodes"], seed="dataset"
+            )
+        ]
+        second = [
+            self.member_ids(variant)
+            for variant in generate_variants(
+                self.ast, 4, ops=["shuffle_all_nodes"], seed="dataset"
+            )
+        ]
+        self.assertEqual(first, second)
+
+        # Each variant only depends on its own stream.
+        shuffle_all_nodes_randomly(self.ast, rng=variant_rng("dataset", 2))
+        self.assertEqual(self.member_ids(self.ast), first[2])
+
+    def test_rendered_variants(self):
+        config = SolidityConfig(render_cache=True)
+        variants = generate_variants(self.ast, 3, seed=1)
+        sources = generate_variants(self.ast, 3, seed=1, render=True, config=config)
+
+        for variant, source in zip(variants, sources):
+            self.assertEqual(variant.to_solidity(), source)
+        self.assertEqual(self.ast.to_solidity(config=config), self.ast.to_solidity())
+
+    def test_custom_operations(self):
+        def drop_functions(ast, rng):
+            contract = ast.nodes[-1]
+            contract.nodes = [
+                node
+                for node in contract.nodes
+                if node.node_type != NodeType.FUNCTION_DEFINITION
+            ]
+
+        variant = next(generate_variants(self.ast, 1, ops=[drop_functions]))
+
+        self.assertNotIn("function", variant.to_solidity())
+        self.assertIn("function", self.ast.to_solidity())
+
+
+class ShuffleThreadSafetyTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        solcx.install_solc()
+        cls.ast = create_ast_with_standart_input(SOURCE)
+
+    def shuffled(self, seed):
+        ast = self.ast.model_copy(deep=True)
+        shuffle_all_nodes_randomly(ast, seed=seed)
+        return [node.id for node in ast.nodes[-1].nodes]
+
+    def test_seed_leaves_global_state_alone(self):
+        state = random.getstate()
+        shuffle_functions_and_storages(self.ast.model_copy(deep=True), seed=3)
+
+        self.assertEqual(random.getstate(), state)
+
+    def test_seed_matches_global_seeding(self):
+        ast = self.ast.model_copy(deep=True)
+        random.seed(5)
+        random.shuffle(ast.nodes[-1].nodes)
+
+        self.assertEqual(self.shuffled(5), [node.id for node in ast.nodes[-1].nodes])
+
+    def test_threads(self):
+        expected = [self.shuffled(seed) for seed in range(32)]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            self.assertEqual(list(executor.map(self.shuffled, range(32))), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,195 @@
+from os.path import join, dirname
+import unittest
+
+import solcx
+
+from solc_ast_parser.models.base_ast_models import NodeType
+from solc_ast_parser.utils import (
+    create_ast_with_standart_input,
+    find_node_with_properties,
+)
+from solc_ast_parser.visitor import (
+    FusedVisitor,
+    NodeTransformer,
+    NodeVisitor,
+    visit_fused,
+)
+
+CONTRACT_PATH = join(dirname(__file__), "..", "examples", "comments")
+
+
+class FunctionNameCollector(NodeVisitor):
+    def __init__(self):
+        self.names = []
+
+    def visit_FunctionDefinition(self, node):
+        self.names.append(node.name)
+        self.generic_visit(node)
+
+
+class IdentifierCounter(NodeVisitor):
+    def __init__(self):
+        self.count = 0
+
+    def visit_Identifier(self, node):
+        self.count += 1
+
+
+class PrunedIdentifierCollector(NodeVisitor):
+    # Only looks inside the body of withdraw.
+    def __init__(self):
+        self.names = []
+
+    def visit_FunctionDefinition(self, node):
+        if node.name == "withdraw":
+            self.generic_visit(node)
+
+    def visit_Identifier(self, node):
+        self.names.append(node.name)
+
+
+class ParameterCollector(NodeVisitor):
+    # Walks a single child by hand instead of calling generic_visit().
+    def __init__(self):
+        self.names = []
+
+    def visit_FunctionDefinition(self, node):
+        self.visit(node.parameters)
+
+    def visit_VariableDeclaration(self, node):
+        self.names.append(node.name)
+        self.generic_visit(node)
+
+
+class AssignmentDepthRecorder(NodeVisitor):
+    # Does work after generic_visit(), once the children have been visited.
+    def __init__(self):
+        self.depth = 0
+        self.depths = []
+
+    def visit_Block(self, node):
+        self.depth += 1
+        self.generic_visit(node)
+        self.depth -= 1
+
+    def visit_Assignment(self, node):
+        self.depths.append(self.depth)
+
+
+class OwnerRenamer(NodeTransformer):
+    def visit_Identifier(self, node):
+        if node.name == "owner":
+            node.name = "admin"
+        return node
+
+    def visit_VariableDeclaration(self, node):
+        if node.name == "owner":
+            node.name = "admin"
+        return self.generic_visit(node)
+
+
+class RequireRemover(NodeTransformer):
+    def visit_ExpressionStatement(self, node):
+        expression = node.expression
+        if (
+            expression.node_type == NodeType.FUNCTION_CALL
+            and getattr(expression.expression, "name", None) == "require"
+        ):
+            return None
+        return node
+
+
+class VisitorTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        solcx.install_solc()
+        with open(join(CONTRACT_PATH, "GalacticHub.example.sol")) as f:
+            cls.source_code = f.read()
+
+    def setUp(self):
+        self.ast = create_ast_with_standart_input(
+            self.source_code, "GalacticHub.example.sol"
+        )
+
+    def test_visitor_dispatch(self):
+        collector = FunctionNameCollector()
+        collector.visit(self.ast)
+
+        self.assertEqual(
+            collector.names,
+            ["", "deposit", "withdraw", "transfer", "setFeePercentage"],
+        )
+
+    def test_dispatch_table_is_per_class(self):
+        self.assertIsNotNone(
+            FunctionNameCollector._dispatch[NodeType.FUNCTION_DEFINITION]
+        )
+        self.assertIsNone(IdentifierCounter._dispatch[NodeType.FUNCTION_DEFINITION])
+
+    def test_transformer_replaces_and_removes(self):
+        OwnerRenamer().visit(self.ast)
+        RequireRemover().visit(self.ast)
+
+        generated = self.ast.to_solidity()
+        self.assertNotIn("owner", generated)
+        self.assertIn("address private admin", generated)
+        self.assertNotIn("require(", generated)
+
+    def test_fused_visitors(self):
+        expected_names = FunctionNameCollector()
+        expected_names.visit(self.ast)
+        expected_count = IdentifierCounter()
+        expected_count.visit(self.ast)
+
+        collector = FunctionNameCollector()
+        counter = IdentifierCounter()
+        visit_fused(self.ast, [collector, counter])
+
+        self.assertEqual(collector.names, expected_names.names)
+        self.assertEqual(counter.count, expected_count.count)
+        self.assertEqual(
+            counter.count,
+            len(find_node_with_properties(self.ast, node_type=NodeType.IDENTIFIER)),
+        )
+
+    def test_fused_visitors_prune_like_sequential(self):
+        expected = []
+        for visitor_class in (PrunedIdentifierCollector, ParameterCollector):
+            visitor = visitor_class()
+            visitor.visit(self.ast)
+            expected.append(visitor.names)
+
+        pruned, parameters = PrunedIdentifierCollector(), ParameterCollector()
+        visit_fused(self.ast, [pruned, parameters, IdentifierCounter()])
+
+        self.assertEqual([pruned.names, parameters.names], expected)
+        self.assertNotIn("generic_visit", pruned.__dict__)
+        all_names = [
+            node.name
+            for node in find_node_with_properties(
+                self.ast, node_type=NodeType.IDENTIFIER
+            )
+        ]
+        self.assertLess(len(pruned.names), len(all_names))
+
+    def test_fused_visitors_run_code_after_generic_visit(self):
+        expected = AssignmentDepthRecorder()
+        expected.visit(self.ast)
+
+        recorder = AssignmentDepthRecorder()
+        visit_fused(
+            self.ast, [IdentifierCounter(), recorder, AssignmentDepthRecorder()]
+        )
+
+        self.assertEqual(recorder.depths, expected.depths)
+        self.assertEqual(recorder.depth, 0)
+        self.assertTrue(expected.depths)
+        self.assertNotIn(0, expected.depths)
+
+    def test_transformers_cannot_be_fused(self):
+        with self.assertRaises(TypeError):
+            FusedVisitor(OwnerRenamer())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+from os.path import join, dirname
+import unittest
+
+import solcx
+
+from solc_ast_parser.cursor import ParentMap
+from solc_ast_parser.models.base_ast_models import YulNodeType, yul_node_id
+from solc_ast_parser.utils import (
+    create_ast_with_standart_input,
+    find_node_with_properties,
+    remove_node,
+    replace_node,
+    update_node_fields,
+)
+
+CONTRACT_PATH = join(dirname(__file__), "..", "examples")
+
+
+class YulNodesTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        solcx.install_solc()
+        with open(join(CONTRACT_PATH, "InlineAssembly.example.sol")) as f:
+            cls.source_code = f.read()
+
+    def setUp(self):
+        self.ast = create_ast_with_standart_input(
+            self.source_code, "InlineAssembly.example.sol"
+        )
+        self.assembly_block = find_node_with_properties(
+            self.ast, node_type=YulNodeType.YUL_BLOCK
+        )[0]
+
+    def yul_nodes(self):
+        return [
+            node
+            for node_type in YulNodeType
+            for node in find_node_with_properties(self.ast, node_type=node_type)
+        ]
+
+    def test_synthetic_ids_are_stable_and_unique(self):
+        nodes = self.yul_nodes()
+        ids = [node.id for node in nodes]
+
+        self.assertTrue(nodes)
+        self.assertTrue(all(node_id is not None and node_id < 0 for node_id in ids))
+        self.assertEqual(len(ids), len(set(ids)))
+
+        reparsed = create_ast_with_standart_input(
+            self.source_code, "InlineAssembly.example.sol"
+        )
+        self.assertEqual(
+            ids,
+            [
+                node.id
+                for node_type in YulNodeType
+                for node in find_node_with_properties(reparsed, node_type=node_type)
+            ],
+        )
+
+    def test_same_span_different_type(self):
+        self.assertNotEqual(
+            yul_node_id("10:5:0", YulNodeType.YUL_EXPRESSION_STATEMENT),
+            yul_node_id("10:5:0", YulNodeType.YUL_FUNCTION_CALL),
+        )
+        self.assertIsNone(yul_node_id("-1:-1:-1", YulNodeType.YUL_IDENTIFIER))
+
+    def test_parent_map_indexes_yul_nodes(self):
+        call = find_node_with_properties(
+            self.ast, node_type=YulNodeType.YUL_FUNCTION_CALL
+        )[0]
+        parent_map = ParentMap(self.ast)
+
+        self.assertIs(parent_map.get(call.id), call)
+        self.assertEqual(parent_map.parent(call).node_type, YulNodeType.YUL_ASSIGNMENT)
+
+    def test_replace_and_remove_yul_nodes(self):
+        call = find_node_with_properties(
+            self.ast, node_type=YulNodeType.YUL_FUNCTION_CALL
+        )[0]
+        replacement = call.model_copy(deep=True)
+        replacement.function_name.name = "extcodehash"
+
+        self.assertTrue(replace_node(self.ast, call.id, replacement))
+        self.assertIn("extcodehash(account)", self.ast.to_solidity())
+
+        statement = self.assembly_block.statements[0]
+        self.assertTrue(remove_node(self.ast, statement.id))
+        self.assertEqual(self.assembly_block.statements, [])
+
+    def test_update_yul_node_fields(self):
+        updated = update_node_fields(
+            self.ast,
+            {"node_type": YulNodeType.YUL_IDENTIFIER, "name": "account"},
+            {"name": "target"},
+        )
+
+        self.assertTrue(updated)
+        self.assertIn("extcodesize(target)", self.ast.to_solidity())
+
+
+if __name__ == "__main__":
+    unittest.main()